@@ -0,0 +1,172 @@
+"""
+Single-file serving bundle: LightGBM booster text, feature names, metadata,
+decision threshold, the flattened tree arrays of backend/tree_engine.py and
+the pickled SHAP explainer.
+
+Loading it imports neither sklearn's estimator stack, mlflow nor shap;
+lightgbm is imported when the booster is rebuilt and shap only when the
+first explanation is requested.
+
+The file is laid out to be memory-mapped read-only: each section is a
+pickle-5 header plus its NumPy buffers written out of band at aligned
+offsets, so the scorer's and the SHAP explainer's tree arrays are views into
+the mapping rather than copies. Every uvicorn worker maps the same file, and those pages
+are shared through the page cache instead of being duplicated per process.
+Bundles are replaced with os.replace, so a mapping always sees the complete
+file it opened.
+
+The booster itself is still rebuilt in every worker: the native explainer and
+large batches need it, and it can't be loaded in the gunicorn parent instead,
+because constructing it starts LightGBM's OpenMP pool and a forked child that
+uses that pool hangs.
+
+Build it from the artifacts train.py saved:
+    python -m backend.artifact_bundle
+"""
+import logging
+import mmap
+import os
+import pickle
+import struct
+
+import numpy as np
+
+from backend.scoring import ARTIFACTS_DIR, load_local_artifacts, decision_threshold
+from backend.tree_engine import ArrayTreeModel
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_FORMAT_VERSION = 2
+MAPPED_MAGIC = b"CHURNMM\x02"
+BUFFER_ALIGNMENT = 64
+DEFAULT_BUNDLE_PATH = os.path.join(ARTIFACTS_DIR, "churn_bundle.pkl")
+DEFAULT_EXPLAINER_PATH = os.path.join(ARTIFACTS_DIR, "shap_explainer.pkl")
+
+
+class BoosterModel:
+    """Minimal predict_proba adapter around a raw lightgbm.Booster."""
+
+    def __init__(self, booster):
+        self.booster_ = booster
+        self.n_features_in_ = booster.num_feature()
+
+    def predict_proba(self, X):
+        p = self.booster_.predict(X)
+        return np.column_stack([1.0 - p, p])
+
+
+def write_mapped(path: str, sections: dict):
+    """
+    Write objects as named sections of a mappable file, atomically.
+
+    Layout: magic | aligned header and buffer blobs | pickled index | index offset (u64).
+    The index maps each section name to its header span and buffer spans.
+    """
+    tmp_path = f"{path}.tmp"
+    index = {}
+    with open(tmp_path, "wb") as f:
+        f.write(MAPPED_MAGIC)
+
+        def write_blob(data) -> tuple:
+            f.write(b"\0" * (-f.tell() % BUFFER_ALIGNMENT))
+            offset = f.tell()
+            view = memoryview(data).cast("B")
+            f.write(view)
+            return offset, view.nbytes
+
+        for name, obj in sections.items():
+            buffers = []
+            header = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+            index[name] = {
+                "header": write_blob(header),
+                "buffers": [write_blob(buffer.raw()) for buffer in buffers]
+            }
+        index_offset = f.tell()
+        f.write(pickle.dumps(index, protocol=5))
+        f.write(struct.pack("<Q", index_offset))
+    os.replace(tmp_path, path)
+
+
+class MappedArtifacts:
+    """Read-only mapping of a file written by write_mapped; sections are unpickled on demand."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAPPED_MAGIC)] != MAPPED_MAGIC:
+            raise ValueError(f"{path} is not a memory-mappable bundle")
+        (index_offset,) = struct.unpack("<Q", self._map[-8:])
+        self.index = pickle.loads(self._map[index_offset:-8])
+
+    def load(self, name: str):
+        """Unpickle a section; its NumPy buffers are zero-copy, read-only views into the mapping."""
+        section = self.index[name]
+        view = memoryview(self._map)
+        offset, size = section["header"]
+        buffers = [view[start:start + length] for start, length in section["buffers"]]
+        return pickle.loads(view[offset:offset + size], buffers=buffers)
+
+
+def export_bundle(model, feature_names, metadata, explainer=None, path: str = DEFAULT_BUNDLE_PATH):
+    """Write the serving bundle atomically (so a watching server never reads half a file)."""
+    booster = getattr(model, "booster_", model)
+    model_str = booster.model_to_string()
+    try:
+        tree_model = ArrayTreeModel(model_str)
+    except ValueError as e:
+        logger.warning(f"⚠️ Bundle written without tree arrays, the array scorer will build them: {e}")
+        tree_model = None
+    payload = {
+        "format_version": BUNDLE_FORMAT_VERSION,
+        "booster": model_str,
+        "feature_names": list(feature_names),
+        "metadata": metadata,
+        "threshold": decision_threshold(metadata),
+        "has_tree_model": tree_model is not None,
+        "has_shap_explainer": explainer is not None
+    }
+    sections = {"payload": payload}
+    if tree_model is not None:
+        sections["tree_model"] = tree_model
+    if explainer is not None:
+        sections["shap_explainer"] = explainer
+    write_mapped(path, sections)
+    logger.info(f"✅ Serving bundle written to {path}")
+    return path
+
+
+def load_bundle(path: str = DEFAULT_BUNDLE_PATH) -> dict:
+    """
+    Map a serving bundle; returns the model adapter plus the payload fields.
+    "tree_model" is an unbound ArrayTreeModel over the mapping (None in
+    bundles written without one). "shap_explainer" is a zero-argument loader (None without an explainer), so
+    shap is only imported when it is called.
+    """
+    artifacts = MappedArtifacts(path)
+    payload = artifacts.load("payload")
+    if payload.get("format_version") != BUNDLE_FORMAT_VERSION:
+        raise ValueError(f"Unsupported bundle format {payload.get('format_version')} in {path}")
+
+    import lightgbm as lgb
+    payload["model"] = BoosterModel(lgb.Booster(model_str=payload.pop("booster")))
+    payload["tree_model"] = artifacts.load("tree_model") if payload.pop("has_tree_model", False) else None
+    payload["shap_explainer"] = (
+        (lambda: artifacts.load("shap_explainer")) if payload.pop("has_shap_explainer") else None
+    )
+    return payload
+
+
+def export_from_local_artifacts(artifacts_dir: str = ARTIFACTS_DIR, path: str = DEFAULT_BUNDLE_PATH):
+    import joblib
+    artifacts = load_local_artifacts(artifacts_dir)
+    if artifacts is None:
+        raise FileNotFoundError(f"No model found in {artifacts_dir}; run train.py first")
+
+    explainer_path = os.path.join(artifacts_dir, "shap_explainer.pkl")
+    explainer = joblib.load(explainer_path) if os.path.exists(explainer_path) else None
+    return export_bundle(artifacts["model"], artifacts["feature_names"], artifacts["metadata"], explainer, path)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    export_from_local_artifacts()
@@ -0,0 +1,134 @@
+import asyncio
+import logging
+from collections import Counter
+
+from backend.executor import ExecutorSaturated
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-item requests into one vectorized call.
+
+    Items wait in a bounded queue until either `max_batch_size` of them have
+    arrived or `max_wait_ms` has passed since the first one; the whole batch
+    is then handed to `process_batch` on the inference executor and each
+    caller receives its own result. At most one batch per executor worker is
+    in flight, so while the pool is busy new requests pile up into larger
+    batches instead of more jobs.
+    """
+
+    def __init__(self, process_batch, executor, max_batch_size: int = 64,
+                 max_wait_ms: float = 2.0, max_queue_size: int = 1024):
+        self.process_batch = process_batch
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.max_queue_size = max_queue_size
+
+        self._queue = None
+        self._slots = None
+        self._dispatcher = None
+        # The loop only keeps weak references to tasks; hold running batches until they finish
+        self._running = set()
+
+        # Metrics
+        self.batches = 0
+        self.rows = 0
+        self.rejected = 0
+        self.last_batch_size = 0
+        self.batch_sizes = Counter()
+
+    async def start(self):
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._slots = asyncio.Semaphore(self.executor.max_workers)
+        self._dispatcher = asyncio.create_task(self._dispatch_loop())
+        logger.info(f"✅ Micro-batching enabled (max {self.max_batch_size} rows / {self.max_wait_ms} ms)")
+
+    async def stop(self):
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            try:
+                await self._dispatcher
+            except asyncio.CancelledError:
+                pass
+            self._dispatcher = None
+        # Let dispatched batches finish so their callers get results
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+        # Fail anything still waiting so callers don't hang on shutdown
+        while self._queue is not None and not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Micro-batcher stopped"))
+
+    async def submit(self, item):
+        """Queue one item and wait for its individual result."""
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((item, future))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise ExecutorSaturated(f"Micro-batch queue full ({self.max_queue_size})")
+        return await future
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait_ms / 1000
+
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _dispatch_loop(self):
+        while True:
+            await self._slots.acquire()
+            try:
+                batch = await self._collect()
+            except BaseException:
+                self._slots.release()
+                raise
+            task = asyncio.create_task(self._run(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch):
+        try:
+            results = await self.executor.run(self.process_batch, [item for item, _ in batch])
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            self._slots.release()
+            self.batches += 1
+            self.rows += len(batch)
+            self.last_batch_size = len(batch)
+            self.batch_sizes[len(batch)] += 1
+
+    def stats(self):
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "batches": self.batches,
+            "rows": self.rows,
+            "rejected": self.rejected,
+            "avg_batch_size": self.rows / self.batches if self.batches else 0.0,
+            "last_batch_size": self.last_batch_size,
+            "batch_size_counts": dict(sorted(self.batch_sizes.items()))
+        }
@@ -0,0 +1,233 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from backend.feature_plan import RAW_FIELDS
+from backend.models import CustomerData, PredictionResponse
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(customer: CustomerData, model_version) -> str:
+    """
+    Hash of the canonical raw feature vector plus the model version.
+    Values are normalised to float64, so 38 and 38.0 map to the same entry.
+    """
+    raw = np.fromiter((getattr(customer, field) for field in RAW_FIELDS), dtype=np.float64, count=len(RAW_FIELDS))
+    digest = hashlib.blake2b(raw.tobytes(), digest_size=16)
+    digest.update(str(model_version).encode())
+    return digest.hexdigest()
+
+
+class PredictionCache:
+    """Common counters and model-version bookkeeping for prediction caches."""
+
+    backend = "none"
+    # Lookups do file I/O, so the API runs them in a thread instead of on the event loop
+    blocking = False
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.model_version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.errors = 0
+
+    def _expires_at(self):
+        return time.time() + self.ttl_seconds if self.ttl_seconds else None
+
+    def set_model_version(self, version):
+        """Drop entries computed by any other model version."""
+        if version != self.model_version:
+            self.model_version = version
+            self.invalidate()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend,
+            "model_version": self.model_version,
+            "size": self.size(),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "errors": self.errors
+        }
+
+
+class MemoryPredictionCache(PredictionCache):
+    """In-process LRU cache with optional TTL (one per uvicorn worker)."""
+
+    backend = "memory"
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = None):
+        super().__init__(max_entries, ttl_seconds)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value: PredictionResponse):
+        with self._lock:
+            self._entries[key] = (self._expires_at(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+
+    def size(self):
+        return len(self._entries)
+
+
+class SQLitePredictionCache(PredictionCache):
+    """
+    LRU cache in a local SQLite file shared by every worker on the host.
+
+    Uses WAL mode so readers don't block each other; put the file on tmpfs
+    (e.g. /dev/shm) to keep lookups in memory. Hits only read: their access
+    times are buffered and written with the next insert, so the write lock is
+    taken once per miss rather than on every lookup. SQLite errors (such as
+    "database is locked" under contention) count as a miss or a skipped
+    insert instead of failing the request. Hit/miss counters are per worker.
+    """
+
+    backend = "sqlite"
+    blocking = True
+    EVICT_EVERY = 64
+
+    def __init__(self, path: str, max_entries: int = 10000, ttl_seconds: float = None):
+        super().__init__(max_entries, ttl_seconds)
+        self.path = path
+        self._lock = threading.Lock()
+        self._inserts = 0
+        self._accessed = {}
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=1.0, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=OFF")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS predictions ("
+            "key TEXT PRIMARY KEY, model_version TEXT, value TEXT, expires_at REAL, last_access REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS predictions_last_access ON predictions (last_access)")
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            try:
+                row = self._conn.execute("SELECT value, expires_at FROM predictions WHERE key = ?", (key,)).fetchone()
+            except sqlite3.Error as e:
+                self._failed("lookup", e)
+                self.misses += 1
+                return None
+            if row is None:
+                self.misses += 1
+                return None
+            value, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                # Left in place (no write on lookups): the re-computed entry replaces it
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._accessed[key] = now
+            self.hits += 1
+        return PredictionResponse.model_validate_json(value)
+
+    def set(self, key, value: PredictionResponse):
+        now = time.time()
+        with self._lock:
+            try:
+                with self._conn:
+                    self._conn.execute("BEGIN IMMEDIATE")
+                    self._conn.executemany(
+                        "UPDATE predictions SET last_access = ? WHERE key = ?",
+                        [(at, k) for k, at in self._accessed.items()]
+                    )
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO predictions VALUES (?, ?, ?, ?, ?)",
+                        (key, str(self.model_version), value.model_dump_json(), self._expires_at(), now)
+                    )
+                    self._inserts += 1
+                    # Counting rows is O(n) in SQLite, so only trim periodically
+                    if self._inserts % self.EVICT_EVERY == 0:
+                        self._evict()
+                self._accessed.clear()
+            except sqlite3.Error as e:
+                self._failed("insert", e)
+
+    def _failed(self, operation: str, error: Exception):
+        self.errors += 1
+        logger.warning(f"⚠️ Prediction cache {operation} skipped: {error}")
+
+    def _evict(self):
+        excess = self.size() - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM predictions WHERE key IN "
+                "(SELECT key FROM predictions ORDER BY last_access LIMIT ?)", (excess,)
+            )
+            self.evictions += excess
+
+    def invalidate(self):
+        # Other workers may already be on the new version; only drop other versions
+        with self._lock:
+            try:
+                self._conn.execute("DELETE FROM predictions WHERE model_version != ?", (str(self.model_version),))
+            except sqlite3.Error as e:
+                self._failed("invalidation", e)
+
+    def size(self):
+        return self._conn.execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+
+
+def build_prediction_cache(config: dict):
+    """Create the cache described by the serving.cache config section, or None if disabled."""
+    if not config.get("enabled", False):
+        return None
+
+    backend = config.get("backend", "memory")
+    max_entries = config.get("max_entries", 10000)
+    ttl_seconds = config.get("ttl_seconds")
+
+    if backend == "sqlite":
+        cache = SQLitePredictionCache(config.get("sqlite_path", "/tmp/churn_prediction_cache.db"), max_entries, ttl_seconds)
+    elif backend == "memory":
+        cache = MemoryPredictionCache(max_entries, ttl_seconds)
+    else:
+        raise ValueError(f"Unknown prediction cache backend '{backend}'")
+
+    logger.info(f"✅ Prediction cache enabled ({backend}, {max_entries} entries, ttl={ttl_seconds})")
+    return cache
@@ -0,0 +1,138 @@
+"""
+Columnar batch scoring: one array per feature in, one array per output back.
+
+Rows are never materialised as Python objects; the CustomerData constraints
+are enforced with the same vectorized rules the data-quality monitor uses.
+JSON columns, Arrow IPC and Parquet bodies all become the same raw matrix.
+"""
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from backend.data_quality import QualityRules
+from backend.feature_plan import COLUMN_MAPPING, RAW_COLUMNS, RAW_FIELDS
+from backend.scoring import RISK_LEVELS, get_risk_codes
+
+# Binary bulk formats: name -> media type (the request Content-Type selects the input format)
+BINARY_FORMATS = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "arrow-file": "application/vnd.apache.arrow.file",
+    "parquet": "application/vnd.apache.parquet",
+}
+MEDIA_TYPE_FORMATS = {media_type: name for name, media_type in BINARY_FORMATS.items()}
+MEDIA_TYPE_FORMATS["application/x-parquet"] = "parquet"
+
+CHECK_MESSAGES = {
+    "missing": "value is missing or NaN",
+    "below_min": "value is below the allowed minimum",
+    "above_max": "value is above the allowed maximum",
+    "not_integer": "value must be a whole number",
+}
+
+_rules = QualityRules(RAW_COLUMNS)
+
+
+def columns_to_raw(columns) -> np.ndarray:
+    """(n_rows, 13) float64 matrix ordered as RAW_COLUMNS from a ColumnarBatchRequest."""
+    return np.column_stack([np.asarray(getattr(columns, field), dtype=np.float64) for field in RAW_FIELDS])
+
+
+def validation_errors(raw: np.ndarray) -> list:
+    """422-style error entries (one per field and check) for rows violating the CustomerData constraints."""
+    errors = []
+    for check, mask in _rules.masks(raw).items():
+        bad_columns = np.flatnonzero(mask.any(axis=0))
+        for j in bad_columns:
+            rows = np.flatnonzero(mask[:, j])
+            errors.append({
+                "type": check,
+                "loc": ["body", RAW_FIELDS[j], int(rows[0])],
+                "msg": f"{CHECK_MESSAGES[check]} ({len(rows)} rows)",
+                "rows": len(rows)
+            })
+    return errors
+
+
+class ColumnarValidationError(ValueError):
+    def __init__(self, errors: list):
+        super().__init__(f"{len(errors)} validation errors")
+        self.errors = errors
+
+
+def read_table(body: bytes, input_format: str):
+    """Decode an Arrow IPC (stream or file) or Parquet body into a pyarrow Table."""
+    buffer = pa.py_buffer(body)
+    if input_format == "parquet":
+        return pq.read_table(pa.BufferReader(buffer))
+    if input_format == "arrow-file":
+        return pa.ipc.open_file(buffer).read_all()
+    return pa.ipc.open_stream(buffer).read_all()
+
+
+def table_to_raw(table) -> np.ndarray:
+    """
+    (n_rows, 13) float64 matrix ordered as RAW_COLUMNS. Columns may use the API
+    field names or the dataset names. Each Arrow column is written straight into
+    the matrix (nulls become NaN), so this is the only copy of the input.
+    """
+    names = set(table.column_names)
+    raw = np.empty((table.num_rows, len(RAW_COLUMNS)), dtype=np.float64)
+    missing = []
+    for j, (field, column) in enumerate(COLUMN_MAPPING.items()):
+        name = field if field in names else column if column in names else None
+        if name is None:
+            missing.append(field)
+            continue
+        values = table.column(name)
+        if values.null_count:
+            values = values.cast("float64").fill_null(float("nan"))
+        raw[:, j] = values.to_numpy()
+    if missing:
+        raise ValueError(f"Missing required columns: {missing}")
+    return raw
+
+
+def scores_to_table(row_ids, probabilities: np.ndarray, predictions: np.ndarray):
+    """Result table: row_id, churn_probability, churn_prediction, dictionary-encoded risk_level."""
+    risk_level = pa.DictionaryArray.from_arrays(pa.array(get_risk_codes(probabilities)), pa.array(RISK_LEVELS))
+    return pa.table({
+        "row_id": row_ids,
+        "churn_probability": probabilities,
+        "churn_prediction": predictions.astype(np.int8),
+        "risk_level": risk_level
+    })
+
+
+def write_table(table, output_format: str) -> bytes:
+    sink = pa.BufferOutputStream()
+    if output_format == "parquet":
+        pq.write_table(table, sink)
+    elif output_format == "arrow-file":
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    else:
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def score_binary_payload(body: bytes, input_format: str, output_format: str, score_fn, id_column: str = None):
+    """
+    Decode, validate, score and re-encode one binary bulk request.
+    `score_fn(raw)` returns (probabilities, predictions).
+    """
+    table = read_table(body, input_format)
+    raw = table_to_raw(table)
+    errors = validation_errors(raw)
+    if errors:
+        raise ColumnarValidationError(errors)
+
+    if id_column is not None:
+        if id_column not in table.column_names:
+            raise ValueError(f"id_column '{id_column}' not found in input")
+        row_ids = table.column(id_column)
+    else:
+        row_ids = np.arange(table.num_rows, dtype=np.int64)
+
+    probabilities, predictions = score_fn(raw)
+    return write_table(scores_to_table(row_ids, probabilities, predictions), output_format), len(raw)
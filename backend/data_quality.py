@@ -0,0 +1,190 @@
+"""
+Asynchronous data-quality checks on raw scoring inputs.
+
+Request handlers only copy their raw input rows into a bounded ring buffer.
+A background task periodically drains it and runs vectorized range and
+missing-value checks over the whole block at once, accumulating violation
+counts that /monitoring reports.
+"""
+import asyncio
+import logging
+import threading
+import time
+from enum import IntEnum
+
+import numpy as np
+
+from backend.feature_plan import COLUMN_MAPPING, RAW_COLUMNS
+from backend.models import CustomerData
+
+logger = logging.getLogger(__name__)
+
+
+def field_constraints() -> dict:
+    """
+    (minimum, maximum, integer) per raw column, read from the CustomerData validators
+    so columnar validation and quality checks can never drift from the API schema.
+    Enum fields (all contiguous code ranges) become their min/max code.
+    """
+    constraints = {}
+    for field, column in COLUMN_MAPPING.items():
+        info = CustomerData.model_fields[field]
+        annotation = info.annotation
+        if isinstance(annotation, type) and issubclass(annotation, IntEnum):
+            codes = [member.value for member in annotation]
+            constraints[column] = (min(codes), max(codes), True)
+        else:
+            minimum = next((m.ge for m in info.metadata if hasattr(m, "ge")), -np.inf)
+            maximum = next((m.le for m in info.metadata if hasattr(m, "le")), np.inf)
+            constraints[column] = (minimum, maximum, annotation is int)
+    return constraints
+
+
+FIELD_CONSTRAINTS = field_constraints()
+VALUE_RANGES = {column: (lo, hi) for column, (lo, hi, _) in FIELD_CONSTRAINTS.items()}
+# Columns that must hold whole numbers (counts and category codes)
+INTEGER_COLUMNS = [column for column, (_, _, integer) in FIELD_CONSTRAINTS.items() if integer]
+
+CHECKS = ("missing", "below_min", "above_max", "not_integer")
+
+
+class QualityRules:
+    """Vectorized checks over an (n_rows, n_columns) block of raw inputs."""
+
+    def __init__(self, columns=RAW_COLUMNS):
+        self.columns = list(columns)
+        ranges = [VALUE_RANGES.get(col, (-np.inf, np.inf)) for col in self.columns]
+        self.minimum = np.array([lo for lo, _ in ranges], dtype=np.float64)
+        self.maximum = np.array([hi for _, hi in ranges], dtype=np.float64)
+        self.integer_mask = np.isin(self.columns, INTEGER_COLUMNS)
+
+    def masks(self, block: np.ndarray) -> dict:
+        """Boolean (n_rows, n_columns) violation mask per check."""
+        missing = np.isnan(block)
+        # NaN compares False, so missing values are only counted once
+        return {
+            "missing": missing,
+            "below_min": block < self.minimum,
+            "above_max": block > self.maximum,
+            "not_integer": (block != np.floor(block)) & self.integer_mask & ~missing
+        }
+
+    def check(self, block: np.ndarray):
+        """Return per-check, per-column violation counts and the number of rows with any issue."""
+        masks = self.masks(block)
+        violations = {name: mask.sum(axis=0) for name, mask in masks.items()}
+        rows_with_issues = int(np.logical_or.reduce(list(masks.values())).any(axis=1).sum())
+        return violations, rows_with_issues
+
+
+class DataQualityMonitor:
+    """
+    Bounded ring buffer of raw input rows plus the background task that checks them.
+
+    If traffic outpaces the checker the oldest unchecked rows are overwritten
+    and counted as dropped, so memory stays at `buffer_rows` rows.
+    """
+
+    def __init__(self, buffer_rows: int = 65536, check_interval: float = 5.0, columns=RAW_COLUMNS):
+        self.rules = QualityRules(columns)
+        self.buffer_rows = buffer_rows
+        self.check_interval = check_interval
+        self._buffer = np.empty((buffer_rows, len(self.rules.columns)), dtype=np.float64)
+        self._write = 0
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._task = None
+
+        self.rows_checked = 0
+        self.rows_with_issues = 0
+        self.dropped_rows = 0
+        self.last_check = None
+        self._violations = {name: np.zeros(len(self.rules.columns), dtype=np.int64) for name in CHECKS}
+
+    def enqueue(self, raw: np.ndarray):
+        """Copy raw rows (ordered as RAW_COLUMNS) into the buffer. This is all the request path pays."""
+        raw = np.asarray(raw, dtype=np.float64)
+        if raw.ndim == 1:
+            raw = raw.reshape(1, -1)
+        n = len(raw)
+
+        with self._lock:
+            if n > self.buffer_rows:
+                self.dropped_rows += n - self.buffer_rows
+                raw = raw[-self.buffer_rows:]
+                n = self.buffer_rows
+            end = self._write + n
+            if end <= self.buffer_rows:
+                self._buffer[self._write:end] = raw
+            else:
+                split = self.buffer_rows - self._write
+                self._buffer[self._write:] = raw[:split]
+                self._buffer[:n - split] = raw[split:]
+            self._write = end % self.buffer_rows
+            overflow = self._pending + n - self.buffer_rows
+            if overflow > 0:
+                self.dropped_rows += overflow
+            self._pending = min(self._pending + n, self.buffer_rows)
+
+    def _drain(self) -> np.ndarray:
+        with self._lock:
+            n = self._pending
+            start = (self._write - n) % self.buffer_rows
+            if start + n <= self.buffer_rows:
+                block = self._buffer[start:start + n].copy()
+            else:
+                block = np.concatenate([self._buffer[start:], self._buffer[:self._write]])
+            self._pending = 0
+        return block
+
+    def process_pending(self) -> int:
+        """Check every buffered row; returns how many were checked."""
+        block = self._drain()
+        self.last_check = time.time()
+        if len(block) == 0:
+            return 0
+        violations, rows_with_issues = self.rules.check(block)
+        for name, counts in violations.items():
+            self._violations[name] += counts
+        self.rows_checked += len(block)
+        self.rows_with_issues += rows_with_issues
+        return len(block)
+
+    async def start(self):
+        self._task = asyncio.create_task(self._check_loop())
+        logger.info(f"✅ Data quality checks every {self.check_interval}s ({self.buffer_rows} row buffer)")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _check_loop(self):
+        while True:
+            await asyncio.sleep(self.check_interval)
+            try:
+                await asyncio.to_thread(self.process_pending)
+            except Exception as e:
+                logger.error(f"❌ Data quality check failed: {e}")
+
+    def stats(self):
+        violations = {}
+        for i, column in enumerate(self.rules.columns):
+            counts = {name: int(self._violations[name][i]) for name in CHECKS if self._violations[name][i]}
+            if counts:
+                counts["rate"] = sum(counts.values()) / self.rows_checked
+                violations[column] = counts
+        return {
+            "status": "warning" if self.rows_with_issues else "passed",
+            "rows_checked": self.rows_checked,
+            "rows_with_issues": self.rows_with_issues,
+            "issue_rate": self.rows_with_issues / self.rows_checked if self.rows_checked else 0.0,
+            "pending_rows": self._pending,
+            "dropped_rows": self.dropped_rows,
+            "last_check": self.last_check,
+            "violations": violations
+        }
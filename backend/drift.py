@@ -0,0 +1,134 @@
+"""
+Histogram sketches for feature drift monitoring.
+
+train.py stores one quantile-binned histogram per model feature in the model
+metadata. At serving time a RollingSketch counts live feature vectors into the
+same bins, so PSI and KS can be computed from bin counts in O(bins) no matter
+how much traffic has been scored.
+"""
+import threading
+
+import numpy as np
+
+DEFAULT_BINS = 10
+PSI_THRESHOLD = 0.2  # common rule of thumb: < 0.1 stable, 0.1-0.2 moderate, > 0.2 significant
+KS_COEFFICIENT = 1.358  # two-sample KS critical value coefficient for alpha = 0.05
+SMOOTHING = 1e-6  # keeps PSI finite for empty bins
+
+
+def build_reference_sketches(X, n_bins: int = DEFAULT_BINS) -> dict:
+    """Quantile-binned histogram of every column of the training feature matrix."""
+    features = {}
+    for column in X.columns:
+        values = np.asarray(X[column], dtype=np.float64)
+        values = values[np.isfinite(values)]
+        # Discrete features repeat quantiles; unique edges give fewer, non-empty bins
+        edges = np.unique(np.quantile(values, np.linspace(0, 1, n_bins + 1)[1:-1]))
+        counts = np.bincount(np.searchsorted(edges, values, side="right"), minlength=len(edges) + 1)
+        features[column] = {"edges": edges.tolist(), "counts": counts.tolist()}
+    return {"n_rows": int(len(X)), "n_bins": n_bins, "features": features}
+
+
+class RollingSketch:
+    """
+    Constant-memory histogram of the most recent live traffic.
+
+    Counts go into a ring of `window_buckets` buckets of about `bucket_rows`
+    rows each; when the current bucket is full the oldest one is cleared and
+    reused, so the window always covers the last
+    (window_buckets - 1) * bucket_rows to window_buckets * bucket_rows rows.
+    A batch fills buckets exactly and spills into the next ones, so one large
+    batch can't outweigh the rest of the window.
+    """
+
+    def __init__(self, reference: dict, window_buckets: int = 12, bucket_rows: int = 5000):
+        self.feature_names = list(reference["features"])
+        self.edges = [np.asarray(f["edges"], dtype=np.float64) for f in reference["features"].values()]
+        sizes = np.array([len(e) + 1 for e in self.edges])
+        self.offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+        self.bounds = np.cumsum(sizes)
+        self.total_bins = int(sizes.sum())
+        self.reference_counts = np.concatenate(
+            [np.asarray(f["counts"], dtype=np.float64) for f in reference["features"].values()]
+        )
+        self.reference_rows = reference["n_rows"]
+        self.window_buckets = window_buckets
+        self.bucket_rows = bucket_rows
+        self._counts = np.zeros((window_buckets, self.total_bins), dtype=np.int64)
+        self._rows = np.zeros(window_buckets, dtype=np.int64)
+        self._current = 0
+        self._lock = threading.Lock()
+        self.rows_seen = 0
+
+    def update(self, X):
+        """Add a scored feature matrix (rows in model feature order) to the window."""
+        if hasattr(X, "columns"):
+            X = X[self.feature_names]
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if len(X) == 0:
+            return
+
+        n_rows = len(X)
+        # Rows older than a full window would be cleared again before this call returns
+        X = X[-self.window_buckets * self.bucket_rows:]
+        bins = np.empty(X.shape, dtype=np.intp)
+        for j, edges in enumerate(self.edges):
+            bins[:, j] = np.searchsorted(edges, X[:, j], side="right")
+        # The reference holds finite values only; searchsorted would put NaN in the top bin
+        bins = np.where(np.isfinite(X), bins + self.offsets, -1)
+
+        with self._lock:
+            start = 0
+            while start < len(bins):
+                if self._rows[self._current] >= self.bucket_rows:
+                    self._current = (self._current + 1) % self.window_buckets
+                    self._counts[self._current] = 0
+                    self._rows[self._current] = 0
+                take = min(len(bins) - start, self.bucket_rows - self._rows[self._current])
+                chunk = bins[start:start + take]
+                self._counts[self._current] += np.bincount(chunk[chunk >= 0], minlength=self.total_bins)
+                self._rows[self._current] += take
+                start += take
+            self.rows_seen += n_rows
+
+    def window(self):
+        """Summed live bin counts and row count over the window."""
+        with self._lock:
+            return self._counts.sum(axis=0), int(self._rows.sum())
+
+    def compare(self, psi_threshold: float = PSI_THRESHOLD, min_rows: int = 500) -> dict:
+        """PSI and binned KS statistic of the live window against the reference, per feature."""
+        live_counts, live_rows = self.window()
+        report = {
+            "window_rows": live_rows,
+            "rows_seen": self.rows_seen,
+            "reference_rows": self.reference_rows,
+        }
+        if live_rows < min_rows:
+            return {"status": "insufficient_data", "drift_detected": False, **report}
+
+        ks_critical = KS_COEFFICIENT * np.sqrt((self.reference_rows + live_rows) / (self.reference_rows * live_rows))
+        features = {}
+        drifted = []
+        for name, start, end in zip(self.feature_names, self.offsets, self.bounds):
+            # Each side as a distribution over its finite values
+            expected = self.reference_counts[start:end] / max(self.reference_counts[start:end].sum(), 1)
+            actual = live_counts[start:end] / max(live_counts[start:end].sum(), 1)
+            psi = float(np.sum((actual - expected) * np.log((actual + SMOOTHING) / (expected + SMOOTHING))))
+            ks = float(np.max(np.abs(np.cumsum(actual) - np.cumsum(expected))))
+            drift = psi >= psi_threshold
+            if drift:
+                drifted.append(name)
+            features[name] = {"psi": psi, "ks": ks, "drift_detected": drift}
+
+        return {
+            "status": "drift" if drifted else "ok",
+            "drift_detected": bool(drifted),
+            **report,
+            "psi_threshold": psi_threshold,
+            "ks_critical": float(ks_critical),
+            "drifted_features": drifted,
+            "features": features
+        }
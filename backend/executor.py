@@ -0,0 +1,90 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutorSaturated(Exception):
+    """Raised when the inference executor has no free slot for a new job."""
+
+
+class InferenceExecutor:
+    """
+    Bounded thread pool for CPU-bound scoring and SHAP work.
+
+    LightGBM and SHAP release the GIL inside their native code, so a small
+    thread pool keeps the event loop free (e.g. for /health) while sharing
+    the loaded model. At most `max_workers + max_queue_size` jobs are
+    accepted at once; anything beyond that is rejected with ExecutorSaturated
+    so the caller can answer 429 instead of queueing without bound.
+    """
+
+    def __init__(self, max_workers: int = 2, max_queue_size: int = 32):
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        self.capacity = max_workers + max_queue_size
+        self.in_flight = 0
+        self.rejected = 0
+        self._capacity_waiters = []
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="inference")
+        logger.info(f"✅ Inference executor started ({max_workers} workers, queue {max_queue_size})")
+
+    async def run(self, fn, *args, **kwargs):
+        """Run `fn` on the pool and await its result without blocking the event loop."""
+        # Only touched from the event loop thread, so a plain counter is enough
+        if self.in_flight >= self.capacity:
+            self.rejected += 1
+            raise ExecutorSaturated(f"Inference queue full ({self.in_flight}/{self.capacity})")
+
+        loop = asyncio.get_running_loop()
+        job = self._pool.submit(partial(fn, *args, **kwargs))
+        self.in_flight += 1
+        # Released when the job itself ends: a cancelled caller (client disconnect)
+        # must not free the slot of work that is still running on the pool
+        job.add_done_callback(lambda _: self._release_from_thread(loop))
+        return await asyncio.wrap_future(job)
+
+    def _release_from_thread(self, loop):
+        try:
+            loop.call_soon_threadsafe(self._release)
+        except RuntimeError:
+            # Loop already closed (shutdown); nobody is waiting any more
+            self.in_flight -= 1
+
+    def _release(self):
+        self.in_flight -= 1
+        waiters, self._capacity_waiters = self._capacity_waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    async def wait_for_capacity(self, timeout: float) -> bool:
+        """Wait until a job slot is free; False if none frees up within `timeout` seconds."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while self.in_flight >= self.capacity:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return False
+            waiter = loop.create_future()
+            self._capacity_waiters.append(waiter)
+            try:
+                await asyncio.wait_for(waiter, remaining)
+            except asyncio.TimeoutError:
+                return False
+        return True
+
+    def stats(self):
+        return {
+            "max_workers": self.max_workers,
+            "max_queue_size": self.max_queue_size,
+            "in_flight": self.in_flight,
+            "queue_depth": max(0, self.in_flight - self.max_workers),
+            "rejected": self.rejected
+        }
+
+    def shutdown(self):
+        """Drop queued jobs and wait for running ones; blocking, so call it off the event loop."""
+        self._pool.shutdown(wait=True, cancel_futures=True)
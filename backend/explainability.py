@@ -1,70 +1,164 @@
 import joblib
+import pickle
+import threading
 import pandas as pd
 import numpy as np
-import shap
 import logging
 
+from backend.tree_engine import raw_to_proba
+
 logger = logging.getLogger(__name__)
 
 class ExplainerService:
-    def __init__(self, explainer_path='backend/shap_explainer.pkl'):
-        self.explainer = None
-        try:
-            self.explainer = joblib.load(explainer_path)
-            logger.info("✅ SHAP explainer loaded successfully.")
-        except Exception as e:
-            logger.error(f"❌ Error loading SHAP explainer: {e}")
+    def __init__(self, explainer_path='backend/shap_explainer.pkl', payload=None, lazy: bool = False):
+        """
+        Load the pickled shap.TreeExplainer from `explainer_path`, or from
+        `payload`: pickled bytes, or a serving bundle's loader callable. With
+        lazy=True nothing (including the shap import) happens until the first
+        explanation is requested.
+        """
+        self._explainer_path = explainer_path
+        self._payload = payload
+        self._explainer = None
+        self._loaded = False
+        self._lock = threading.Lock()
+        if not lazy:
+            self._load()
+
+    def _load(self):
+        with self._lock:
+            if self._loaded:
+                return
+            try:
+                if self._payload is not None:
+                    self._explainer = self._payload() if callable(self._payload) else pickle.loads(self._payload)
+                    self._payload = None
+                else:
+                    self._explainer = joblib.load(self._explainer_path)
+                logger.info("✅ SHAP explainer loaded successfully.")
+            except Exception as e:
+                logger.error(f"❌ Error loading SHAP explainer: {e}")
+            self._loaded = True
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    @property
+    def explainer(self):
+        if not self._loaded:
+            self._load()
+        return self._explainer
+
+    def _positive_class_shap(self, data):
+        """
+        Return SHAP values for the churn class as a [samples, features] matrix.
+        """
+        # TreeExplainer for LightGBM returns matrix [samples, features]
+        # For binary classification, it might return [samples, features] (log odds for class 1)
+        # or [samples, features, 2] depending on version/model.
+        # LightGBM binary usually returns just for class 1.
+        shap_values = self.explainer.shap_values(data)
+        
+        # Handle different return shapes
+        if isinstance(shap_values, list):
+            # Multiclass or binary with 2 outputs
+            # For binary, usually index 1 is the positive class
+            return np.asarray(shap_values[1])
+        shap_values = np.asarray(shap_values)
+        if shap_values.ndim == 3:
+            return shap_values[:, :, 1]
+        return shap_values
 
-    def get_explanation(self, data: pd.DataFrame, top_k=3):
+    @staticmethod
+    def top_contributions(shap_matrix: np.ndarray, top_k: int):
+        """
+        Pick the top_k features by |SHAP| for every row at once.
+        Uses argpartition (O(features) per row) and only sorts the k winners.
+        Returns (indices, values), both of shape [samples, k].
+        """
+        k = min(top_k, shap_matrix.shape[1])
+        abs_values = np.abs(shap_matrix)
+        if k < shap_matrix.shape[1]:
+            top = np.argpartition(-abs_values, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(k), abs_values.shape).copy()
+        order = np.argsort(-np.take_along_axis(abs_values, top, axis=1), axis=1, kind="stable")
+        indices = np.take_along_axis(top, order, axis=1)
+        return indices, np.take_along_axis(shap_matrix, indices, axis=1)
+
+    @staticmethod
+    def _to_factors(indices, values, feature_names):
+        return [
+            [{"feature": feature_names[i], "impact": v} for i, v in zip(row_idx, row_val)]
+            for row_idx, row_val in zip(indices.tolist(), values.tolist())
+        ]
+
+    def get_explanation(self, data, top_k=3, feature_names=None):
         """
         Generate SHAP values for a single instance and return top k features.
+        `data` is a DataFrame, or a NumPy row together with `feature_names`.
         """
         if self.explainer is None:
             return []
 
         try:
-            # Calculate SHAP values
-            # TreeExplainer for LightGBM returns matrix [samples, features]
-            # For binary classification, it might return [samples, features] (log odds for class 1)
-            # or [samples, features, 2] depending on version/model.
-            # LightGBM binary usually returns just for class 1.
-            
-            shap_values = self.explainer.shap_values(data)
-            
-            # Handle different return shapes
-            if isinstance(shap_values, list):
-                # Multiclass or binary with 2 outputs
-                # For binary, usually index 1 is the positive class
-                sv = shap_values[1][0]
-            elif len(shap_values.shape) == 2:
-                sv = shap_values[0]
-            else:
-                sv = shap_values[0] # Fallback
-
-            feature_names = data.columns.tolist()
-            
-            # Create list of (feature, impact)
-            impacts = []
-            for name, value in zip(feature_names, sv):
-                impacts.append({
-                    "feature": name,
-                    "impact": float(value),
-                    "abs_impact": abs(value)
-                })
-            
-            # Sort by absolute impact
-            impacts.sort(key=lambda x: x['abs_impact'], reverse=True)
-            
-            # Return top k
-            return [
-                {"feature": item["feature"], "impact": item["impact"]}
-                for item in impacts[:top_k]
-            ]
+            return self.get_batch_explanations(data[:1], top_k, feature_names, raise_errors=True)[0]
             
         except Exception as e:
             logger.error(f"Error generating explanation: {e}")
             return []
 
+    def get_batch_explanations(self, data, top_k=3, feature_names=None, raise_errors=False):
+        """
+        Explain every row of `data` with a single SHAP call.
+        Returns one top-k list per row (empty lists if SHAP is unavailable).
+        """
+        n_rows = len(data)
+        if self.explainer is None:
+            return [[] for _ in range(n_rows)]
+
+        try:
+            if feature_names is None:
+                feature_names = data.columns.tolist()
+            shap_matrix = self._positive_class_shap(data)
+            indices, values = self.top_contributions(shap_matrix, top_k)
+            return self._to_factors(indices, values, feature_names)
+            
+        except Exception as e:
+            if raise_errors:
+                raise
+            logger.error(f"Error generating batch explanations: {e}")
+            return [[] for _ in range(n_rows)]
+
+class NativeExplainerService(ExplainerService):
+    """
+    Explanations from LightGBM's own TreeSHAP (`pred_contrib=True`) instead of
+    a pickled shap.TreeExplainer: same values and top_risk_factors shape,
+    no shap import. The contribution row also sums to the raw score, so
+    score_and_explain returns probabilities from the same pass.
+    """
+
+    def __init__(self, booster, sigmoid: float = 1.0):
+        super().__init__(explainer_path=None, payload=lambda: booster)
+        self.sigmoid = sigmoid
+
+    def _contributions(self, data):
+        """[samples, features + 1] log-odds contributions; the last column is the expected value."""
+        return self.explainer.predict(data, pred_contrib=True)
+
+    def _positive_class_shap(self, data):
+        return self._contributions(data)[:, :-1]
+
+    def score_and_explain(self, data, top_k=3, feature_names=None):
+        """Churn probabilities and top-k risk factors per row from one contribution pass."""
+        if feature_names is None:
+            feature_names = data.columns.tolist()
+        contributions = self._contributions(data)
+        probabilities = raw_to_proba(contributions.sum(axis=1), self.sigmoid)
+        indices, values = self.top_contributions(contributions[:, :-1], top_k)
+        return probabilities, self._to_factors(indices, values, feature_names)
+
 # Singleton instance
 _service = None
 
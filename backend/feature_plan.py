@@ -0,0 +1,143 @@
+import numpy as np
+import logging
+from typing import List, Sequence
+
+from backend.models import CustomerData
+
+logger = logging.getLogger(__name__)
+
+# API field name -> UCI dataset column name (the names preprocess_data works on)
+COLUMN_MAPPING = {
+    "Call_Failure": "Call  Failure",
+    "Complains": "Complains",
+    "Subscription_Length": "Subscription  Length",
+    "Charge_Amount": "Charge  Amount",
+    "Seconds_of_Use": "Seconds of Use",
+    "Frequency_of_use": "Frequency of use",
+    "Frequency_of_SMS": "Frequency of SMS",
+    "Distinct_Called_Numbers": "Distinct Called Numbers",
+    "Age_Group": "Age Group",
+    "Tariff_Plan": "Tariff Plan",
+    "Status": "Status",
+    "Age": "Age",
+    "Customer_Value": "Customer Value"
+}
+
+RAW_FIELDS = list(COLUMN_MAPPING.keys())
+RAW_COLUMNS = list(COLUMN_MAPPING.values())
+
+# These mirror training/feature_engineering.py; test_feature_plan.py checks parity.
+RATIO_EPSILON = 1e-5
+RATIO_FEATURES = {
+    "Usage_Per_Month": ("Seconds of Use", "Subscription  Length"),
+    "Complains_Per_Month": ("Complains", "Subscription  Length"),
+    "Value_Per_Second": ("Customer Value", "Seconds of Use"),
+}
+LOG_PREFIX = "Log_"
+AGE_BIN_FEATURE = "Age_Bin"
+AGE_BIN_EDGES = np.array([0, 18, 30, 45, 60, 100], dtype=np.float64)
+
+
+class FeaturePlan:
+    """
+    Precompiled version of preprocess_data for online inference.
+
+    Built once from feature_names.pkl; every output column is resolved to an
+    index-based NumPy operation over the 13 raw inputs, so scoring a customer
+    never touches pandas.
+    """
+
+    def __init__(self, feature_names: Sequence[str]):
+        self.feature_names = list(feature_names)
+        raw_index = {col: i for i, col in enumerate(RAW_COLUMNS)}
+
+        copy_src, copy_dst = [], []
+        num_src, den_src, ratio_dst = [], [], []
+        log_src, log_dst = [], []
+        age_src, age_dst = [], []
+        unknown = []
+
+        for dst, name in enumerate(self.feature_names):
+            if name in raw_index:
+                copy_src.append(raw_index[name])
+                copy_dst.append(dst)
+            elif name in RATIO_FEATURES:
+                num, den = RATIO_FEATURES[name]
+                num_src.append(raw_index[num])
+                den_src.append(raw_index[den])
+                ratio_dst.append(dst)
+            elif name.startswith(LOG_PREFIX) and name[len(LOG_PREFIX):] in raw_index:
+                log_src.append(raw_index[name[len(LOG_PREFIX):]])
+                log_dst.append(dst)
+            elif name == AGE_BIN_FEATURE:
+                age_src.append(raw_index["Age"])
+                age_dst.append(dst)
+            else:
+                # Same behaviour as the serving code: unknown columns are zero-filled
+                unknown.append(name)
+
+        if unknown:
+            logger.warning(f"⚠️ Feature plan has no rule for {unknown}; they will be zero-filled")
+
+        as_idx = lambda values: np.asarray(values, dtype=np.intp)
+        self._copy_src, self._copy_dst = as_idx(copy_src), as_idx(copy_dst)
+        self._num_src, self._den_src, self._ratio_dst = as_idx(num_src), as_idx(den_src), as_idx(ratio_dst)
+        self._log_src, self._log_dst = as_idx(log_src), as_idx(log_dst)
+        self._age_src, self._age_dst = as_idx(age_src), as_idx(age_dst)
+        self._age_inner_edges = AGE_BIN_EDGES[1:-1]
+
+    @property
+    def n_features(self) -> int:
+        return len(self.feature_names)
+
+    def transform_raw(self, raw: np.ndarray) -> np.ndarray:
+        """
+        Map an (n_rows, 13) array of raw inputs, ordered as RAW_COLUMNS,
+        to the model's float32 feature matrix.
+        """
+        raw = np.asarray(raw, dtype=np.float64)
+        out = np.zeros((raw.shape[0], self.n_features), dtype=np.float32)
+
+        out[:, self._copy_dst] = raw[:, self._copy_src]
+        out[:, self._ratio_dst] = raw[:, self._num_src] / (raw[:, self._den_src] + RATIO_EPSILON)
+        out[:, self._log_dst] = np.log1p(raw[:, self._log_src])
+        # pd.cut with right-closed bins: the category code is the number of inner edges below the value,
+        # and ages outside (0, 100] (or missing) get NaN
+        age = raw[:, self._age_src]
+        in_range = (age > AGE_BIN_EDGES[0]) & (age <= AGE_BIN_EDGES[-1])
+        out[:, self._age_dst] = np.where(
+            in_range, np.searchsorted(self._age_inner_edges, age, side="left"), np.nan
+        )
+        return out
+
+    def transform_frame(self, df) -> np.ndarray:
+        """Build the feature matrix from a DataFrame that uses the dataset column names."""
+        missing = [col for col in RAW_COLUMNS if col not in df.columns]
+        if missing:
+            raise ValueError(f"Missing required columns: {missing}")
+        return self.transform_raw(df[RAW_COLUMNS].to_numpy(dtype=np.float64))
+
+    def transform(self, customers: Sequence[CustomerData]) -> np.ndarray:
+        """Build the feature matrix for a list of validated customers."""
+        return self.transform_raw(raw_matrix(customers))
+
+    def transform_one(self, customer: CustomerData) -> np.ndarray:
+        """Build the (1, n_features) row for a single customer."""
+        return self.transform_raw(raw_row(customer))
+
+
+def raw_matrix(customers: Sequence[CustomerData]) -> np.ndarray:
+    """(n_rows, 13) float64 raw inputs ordered as RAW_COLUMNS."""
+    return np.array([[getattr(c, field) for field in RAW_FIELDS] for c in customers], dtype=np.float64)
+
+
+def raw_row(customer: CustomerData) -> np.ndarray:
+    """(1, 13) float64 raw inputs for a single customer."""
+    raw = np.fromiter((getattr(customer, field) for field in RAW_FIELDS), dtype=np.float64, count=len(RAW_FIELDS))
+    return raw.reshape(1, -1)
+
+
+def build_feature_plan(feature_names: List[str]) -> FeaturePlan:
+    plan = FeaturePlan(feature_names)
+    logger.info(f"✅ Feature plan compiled for {plan.n_features} features")
+    return plan
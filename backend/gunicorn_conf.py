@@ -0,0 +1,26 @@
+"""
+gunicorn settings for the API container: uvicorn workers forked from one
+preloaded parent.
+
+The parent imports the app (NumPy, pandas, LightGBM, FastAPI) before forking,
+so workers share those pages copy-on-write instead of each importing them.
+When serving the bundle (serving.artifact_bundle), each worker maps the same
+file in its lifespan, including the array scorer's tree arrays. The LightGBM
+booster is not loaded here: it starts an OpenMP thread pool that forked
+workers would inherit and hang on. See backend/artifact_bundle.py.
+
+    gunicorn backend.main:app -c backend/gunicorn_conf.py
+"""
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WORKERS", "4"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+
+
+def child_exit(server, worker):
+    # Drop the dead worker's live gauges from the shared Prometheus directory
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -1,26 +1,55 @@
-from fastapi import FastAPI, HTTPException, Request, UploadFile, File
+from fastapi import FastAPI, HTTPException, Request, UploadFile, File, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse, Response
 from contextlib import asynccontextmanager
+import asyncio
+import io
 import joblib
 import pandas as pd
 import time
 import logging
 import os
 from typing import List, Optional
-import mlflow
-import mlflow.pyfunc
+import yaml
 
 from backend.models import (
     CustomerData, 
     PredictionResponse, 
     BatchPredictionRequest, 
     BatchPredictionResponse, 
+    ColumnarBatchRequest,
+    ColumnarBatchResponse,
     HealthResponse
 )
-from backend.explainability import get_explainer_service
+from backend.columnar import (
+    BINARY_FORMATS, MEDIA_TYPE_FORMATS, ColumnarValidationError, columns_to_raw, score_binary_payload, validation_errors
+)
+from backend.explainability import ExplainerService, NativeExplainerService
 from backend.monitoring import get_monitoring_service
+from backend.feature_plan import COLUMN_MAPPING, RAW_COLUMNS, raw_matrix, raw_row
+from backend.executor import InferenceExecutor, ExecutorSaturated
+from backend.batching import MicroBatcher
+from backend.cache import build_prediction_cache, cache_key
+from backend.model_reload import ModelBundle, ModelWatcher
+from backend.artifact_bundle import BoosterModel, load_bundle
+from backend.metrics import (
+    CACHE_LOOKUPS, CACHE_SIZE, finish_request, instrumented, mark_serialization_start, observe_batch,
+    render_metrics, set_model_info, stage_timer, start_request, update_queue_gauges, worker_memory
+)
+from backend.serialization import encode_batch_response, encode_columnar_response, encode_ndjson_rows
+from backend.scoring import (
+    ARTIFACTS_DIR,
+    MODEL_FILE,
+    FEATURES_FILE,
+    METADATA_FILE,
+    load_local_artifacts,
+    predict_scores,
+    get_risk_level,
+    get_risk_codes,
+    RISK_LEVELS,
+    get_risk_levels
+)
 from training.feature_engineering import preprocess_data
 
 # Configure logging
@@ -31,17 +60,41 @@ logger = logging.getLogger(__name__)
 MLFLOW_TRACKING_URI = os.getenv("MLFLOW_TRACKING_URI", "file:./mlruns")
 MLFLOW_MODEL_NAME = "ChurnPredictionModel"
 
+# Serving configuration (the "serving" section of config.yaml)
+CONFIG_PATH = os.getenv("CONFIG_PATH", "backend/config.yaml")
+
 # Global variables for model artifacts
 model = None
 feature_names = None
 model_metadata = None
-model_source = "local"  # "mlflow" or "local"
+feature_plan = None
+model_source = "local"  # "bundle", "mlflow" or "local"
 model_version = None
+inference_executor = None
+micro_batcher = None
+prediction_cache = None
+model_watcher = None
+artifact_bundle_path = None  # serving.artifact_bundle; set in lifespan
+scorer_config = {}  # serving.scorer; set in lifespan
+explainer_backend = "shap"  # serving.explainer; set in lifespan
+active_bundle = None  # ModelBundle currently serving; handlers take one snapshot per request
+
+def load_serving_config() -> dict:
+    """Read the serving section of config.yaml; missing file or keys mean defaults."""
+    try:
+        with open(CONFIG_PATH) as f:
+            return (yaml.safe_load(f) or {}).get("serving") or {}
+    except Exception as e:
+        logger.warning(f"⚠️ Could not read serving config from {CONFIG_PATH}: {e}")
+        return {}
 
 def load_model_from_mlflow():
     """Attempt to load model from MLflow Model Registry (Production stage)."""
-    global model, model_source, model_version
     try:
+        # Imported here: mlflow is slow to import and only needed once a model is loaded
+        import mlflow
+        import mlflow.pyfunc
+        
         mlflow.set_tracking_uri(MLFLOW_TRACKING_URI)
         
         # Try to load the Production stage model
@@ -55,64 +108,187 @@ def load_model_from_mlflow():
         versions = client.get_latest_versions(MLFLOW_MODEL_NAME, stages=["Production"])
         
         if versions:
-            model_version = versions[0].version
-            model = loaded_model._model_impl.lgb_model  # Get underlying LightGBM model
-            model_source = "mlflow"
-            logger.info(f"✅ Loaded MLflow model v{model_version} from Production stage")
-            return True
+            # Even if MLflow model loaded, load feature names and metadata from local
+            features_path = "backend/feature_names.pkl"
+            metadata_path = "backend/model_metadata.pkl"
+            # Get underlying LightGBM model; train.py logs a raw Booster
+            model = loaded_model._model_impl.lgb_model
+            if not hasattr(model, "predict_proba"):
+                model = BoosterModel(model)
+            bundle = ModelBundle(
+                model=model,
+                feature_names=joblib.load(features_path) if os.path.exists(features_path) else None,
+                metadata=joblib.load(metadata_path) if os.path.exists(metadata_path) else None,
+                source="mlflow",
+                version=versions[0].version,
+                explainer=ExplainerService()
+            )
+            logger.info(f"✅ Loaded MLflow model v{bundle.version} from Production stage")
+            return bundle
     except Exception as e:
         logger.warning(f"⚠️ Could not load from MLflow Registry: {e}")
-    return False
+    return None
 
 def load_model_from_local():
     """Load model from local pickle file (fallback)."""
-    global model, feature_names, model_metadata, model_source, model_version
     try:
-        model_path = "backend/churn_model.pkl"
-        features_path = "backend/feature_names.pkl"
-        metadata_path = "backend/model_metadata.pkl"
-        
-        if os.path.exists(model_path):
-            model = joblib.load(model_path)
-            feature_names = joblib.load(features_path)
-            model_metadata = joblib.load(metadata_path)
-            model_source = "local"
-            model_version = model_metadata.get("run_id", "unknown")[:8] if model_metadata else "unknown"
+        artifacts = load_local_artifacts()
+        if artifacts is not None:
+            metadata = artifacts["metadata"]
+            bundle = ModelBundle(
+                model=artifacts["model"],
+                feature_names=artifacts["feature_names"],
+                metadata=metadata,
+                source="local",
+                version=metadata.get("run_id", "unknown")[:8] if metadata else "unknown",
+                explainer=ExplainerService()
+            )
             logger.info("✅ Loaded model from local files (fallback)")
-            return True
+            return bundle
     except Exception as e:
         logger.error(f"❌ Error loading local model: {e}")
-    return False
+    return None
+
+def load_model_from_bundle(path: str):
+    """Load the single-file serving bundle (no mlflow, shap loaded on first explanation)."""
+    try:
+        if os.path.exists(path):
+            payload = load_bundle(path)
+            metadata = payload["metadata"]
+            bundle = ModelBundle(
+                model=payload["model"],
+                feature_names=payload["feature_names"],
+                metadata=metadata,
+                source="bundle",
+                version=metadata.get("run_id", "unknown")[:8] if metadata else "unknown",
+                explainer=ExplainerService(payload=payload["shap_explainer"], lazy=True),
+                tree_model=payload["tree_model"]
+            )
+            logger.info(f"✅ Loaded serving bundle from {path}")
+            return bundle
+    except Exception as e:
+        logger.error(f"❌ Error loading serving bundle: {e}")
+    return None
+
+def load_model_bundle():
+    """MLflow Production model first, then the serving bundle if configured, then local files."""
+    bundle = load_model_from_mlflow()
+    if bundle is None and artifact_bundle_path:
+        bundle = load_model_from_bundle(artifact_bundle_path)
+    bundle = bundle or load_model_from_local()
+    if bundle is not None:
+        try:
+            bundle.use_explainer(explainer_backend)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not build the {explainer_backend} explainer, using shap: {e}")
+        try:
+            bundle.use_scorer(scorer_config.get("engine", "lightgbm"), scorer_config.get("array_max_rows"))
+        except Exception as e:
+            logger.warning(f"⚠️ Could not build the {scorer_config.get('engine')} scorer, using LightGBM: {e}")
+    return bundle
+
+def current_model_signature():
+    """Changes whenever a new Production version is registered or the local artifacts are rewritten."""
+    registry_version = None
+    try:
+        import mlflow
+        mlflow.set_tracking_uri(MLFLOW_TRACKING_URI)
+        versions = mlflow.tracking.MlflowClient().get_latest_versions(MLFLOW_MODEL_NAME, stages=["Production"])
+        if versions:
+            registry_version = versions[0].version
+    except Exception:
+        pass
+    
+    local_files = []
+    paths = [os.path.join(ARTIFACTS_DIR, name) for name in (MODEL_FILE, FEATURES_FILE, METADATA_FILE, "shap_explainer.pkl")]
+    if artifact_bundle_path:
+        paths.append(artifact_bundle_path)
+    for path in paths:
+        if os.path.exists(path):
+            stat = os.stat(path)
+            local_files.append((os.path.basename(path), stat.st_mtime_ns, stat.st_size))
+    return registry_version, tuple(local_files)
+
+def install_bundle(bundle: ModelBundle):
+    """Make `bundle` the active model. Runs on the event loop, so the swap is atomic for handlers."""
+    global active_bundle, model, feature_names, model_metadata, feature_plan, model_source, model_version
+    set_model_info(bundle.version, bundle.source, model_version, model_source)
+    active_bundle = bundle
+    model = bundle.model
+    feature_names = bundle.feature_names
+    model_metadata = bundle.metadata
+    feature_plan = bundle.feature_plan
+    model_source = bundle.source
+    model_version = bundle.version
+    if prediction_cache is not None:
+        prediction_cache.set_model_version(model_version)
+    get_monitoring_service().set_reference((bundle.metadata or {}).get("reference_sketches"))
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Load model artifacts on startup."""
-    global model, feature_names, model_metadata
+    global model, inference_executor, micro_batcher, prediction_cache, model_watcher, artifact_bundle_path
+    global scorer_config, explainer_backend
     
-    logger.info("Loading model artifacts...")
+    serving_config = load_serving_config()
+    artifact_bundle_path = serving_config.get("artifact_bundle")
+    scorer_config = serving_config.get("scorer", {})
+    explainer_backend = serving_config.get("explainer", "shap")
+    executor_config = serving_config.get("executor", {})
+    inference_executor = InferenceExecutor(
+        max_workers=executor_config.get("max_workers", 2),
+        max_queue_size=executor_config.get("max_queue_size", 32)
+    )
+    reload_config = serving_config.get("reload", {})
+    monitor = get_monitoring_service(serving_config.get("monitoring", {}))
+    await monitor.data_quality.start()
     
-    # Try MLflow first, fallback to local
-    if not load_model_from_mlflow():
-        load_model_from_local()
-    else:
-        # Even if MLflow model loaded, load feature names and metadata from local
-        features_path = "backend/feature_names.pkl"
-        metadata_path = "backend/model_metadata.pkl"
-        if os.path.exists(features_path):
-            feature_names = joblib.load(features_path)
-        if os.path.exists(metadata_path):
-            model_metadata = joblib.load(metadata_path)
+    logger.info("Loading model artifacts...")
+    signature = current_model_signature()
+    bundle = load_model_bundle()
     
-    if model is None:
+    if bundle is None:
         logger.error("❌ No model loaded!")
     else:
-        # Initialize services
-        get_explainer_service()
-        get_monitoring_service()
+        bundle.warm_up(reload_config.get("warmup_rows", 64))
+        install_bundle(bundle)
+        
+        batching_config = serving_config.get("batching", {})
+        if batching_config.get("enabled", False):
+            micro_batcher = MicroBatcher(
+                predict_customers_explained,
+                inference_executor,
+                max_batch_size=batching_config.get("max_batch_size", 64),
+                max_wait_ms=batching_config.get("max_wait_ms", 2.0),
+                max_queue_size=batching_config.get("max_queue_size", 1024)
+            )
+            await micro_batcher.start()
+        
+        prediction_cache = build_prediction_cache(serving_config.get("cache", {}))
+        if prediction_cache is not None:
+            prediction_cache.set_model_version(model_version)
+    
+    if reload_config.get("enabled", False):
+        model_watcher = ModelWatcher(
+            current_model_signature,
+            load_model_bundle,
+            install_bundle,
+            poll_interval=reload_config.get("poll_interval_seconds", 30),
+            warmup_rows=reload_config.get("warmup_rows", 64)
+        )
+        model_watcher.start(signature)
     
     yield
     
     # Clean up on shutdown
+    if model_watcher is not None:
+        await model_watcher.stop()
+        model_watcher = None
+    if micro_batcher is not None:
+        await micro_batcher.stop()
+        micro_batcher = None
+    await monitor.data_quality.stop()
+    await asyncio.to_thread(inference_executor.shutdown)
     model = None
 
 app = FastAPI(
@@ -137,21 +313,36 @@ app.mount("/static", StaticFiles(directory="frontend"), name="static")
 @app.middleware("http")
 async def add_process_time_header(request: Request, call_next):
     start_time = time.time()
+    timing = start_request()
     response = await call_next(request)
     process_time = time.time() - start_time
     
+    # Label by route template, not raw path, to keep metric cardinality bounded
+    route = request.scope.get("route")
+    finish_request(timing, route.path if route else "unmatched", request.method, response.status_code, model_version)
+    update_queue_gauges(inference_executor, micro_batcher)
+    
     if process_time > 0.05:
         logger.warning(f"⚠️ High latency: {process_time:.4f}s for {request.url.path}")
         
     response.headers["X-Process-Time"] = str(process_time)
     return response
 
-def get_risk_level(prob: float) -> str:
-    if prob >= 0.7:
-        return "High"
-    elif prob >= 0.4:
-        return "Medium"
-    return "Low"
+def get_decision_threshold(bundle: ModelBundle = None) -> float:
+    """Return the F1-tuned cutoff saved by train.py, or 0.5 if unavailable."""
+    bundle = bundle or active_bundle
+    return bundle.threshold if bundle else 0.5
+
+def score(processed_data: pd.DataFrame, bundle: ModelBundle = None):
+    """Score a feature matrix in a single pass.
+    
+    Returns churn probabilities and the labels derived from the saved threshold.
+    """
+    bundle = bundle or active_bundle
+    with stage_timer("predict", bundle.version):
+        probabilities, predictions = predict_scores(bundle.model, processed_data, bundle.threshold)
+    get_monitoring_service().observe(processed_data)
+    return probabilities, predictions
 
 @app.get("/", tags=["Root"])
 async def root():
@@ -172,139 +363,393 @@ async def health_check():
         "model_name": MLFLOW_MODEL_NAME,
         "model_version": model_version,
         "source": model_source,
+        "scorer": type(model).__name__,
         "accuracy": accuracy,
-        "features": len(feature_names) if feature_names else 0
+        "features": len(feature_names) if feature_names else 0,
+        "loaded_at": active_bundle.loaded_at if active_bundle else None,
+        "reload": model_watcher.stats() if model_watcher else None,
+        "worker": worker_memory()
     }
 
+def score_explained(features, bundle: ModelBundle = None, top_k: int = 3):
+    """score() plus the top_k risk factors of every row.
+    
+    The native explainer's contributions sum to the raw score, so it scores
+    and explains in one pass (timed as the "explain" stage); the shap
+    explainer runs after a normal score().
+    """
+    bundle = bundle or active_bundle
+    if isinstance(bundle.explainer, NativeExplainerService):
+        with stage_timer("explain", bundle.version):
+            probabilities, risk_factors = bundle.explainer.score_and_explain(
+                features, top_k=top_k, feature_names=bundle.feature_names
+            )
+        predictions = (probabilities >= bundle.threshold).astype(int)
+        get_monitoring_service().observe(features)
+        return probabilities, predictions, risk_factors
+    
+    probabilities, predictions = score(features, bundle)
+    with stage_timer("explain", bundle.version):
+        risk_factors = bundle.explainer.get_batch_explanations(
+            features, top_k=top_k, feature_names=bundle.feature_names
+        )
+    return probabilities, predictions, risk_factors
+
+def predict_one(customer: CustomerData) -> PredictionResponse:
+    """Score and explain a single customer (CPU-bound; runs on the inference executor)."""
+    bundle = active_bundle
+    raw = raw_row(customer)
+    # Quality checks run later in the background; the request only pays for the copy
+    get_monitoring_service().enqueue_inputs(raw)
+    
+    with stage_timer("preprocess", bundle.version):
+        if bundle.feature_plan is not None:
+            # Compiled NumPy path: no DataFrame copies for a single customer
+            processed_data = bundle.feature_plan.transform_raw(raw)
+        else:
+            data_dict = customer.model_dump(mode='json')
+            mapped_data = {COLUMN_MAPPING.get(k, k): v for k, v in data_dict.items()}
+            processed_data = preprocess_data(pd.DataFrame([mapped_data]))
+        
+    probabilities, predictions, risk_factors = score_explained(processed_data, bundle)
+    probability = probabilities[0]
+    prediction = predictions[0]
+    top_risk_factors = risk_factors[0]
+    
+    return PredictionResponse(
+        churn_prediction=int(prediction),
+        churn_probability=float(probability),
+        risk_level=get_risk_level(probability),
+        confidence=float(probability if prediction == 1 else 1 - probability),
+        top_risk_factors=top_risk_factors
+    )
+
+def build_prediction_responses(probabilities, predictions, risk_factors=None):
+    """Turn score() output into response rows plus the high-risk count."""
+    response_list = []
+    high_risk_count = 0
+    if risk_factors is None:
+        risk_factors = [[] for _ in range(len(probabilities))]
+    
+    for pred, prob, factors in zip(predictions, probabilities, risk_factors):
+        risk = get_risk_level(prob)
+        if risk == "High":
+            high_risk_count += 1
+            
+        response_list.append(PredictionResponse(
+            churn_prediction=int(pred),
+            churn_probability=float(prob),
+            risk_level=risk,
+            confidence=float(prob if pred == 1 else 1 - prob),
+            top_risk_factors=factors
+        ))
+    return response_list, high_risk_count
+
+def score_customers(customers: List[CustomerData], explain: bool = False, top_k: int = 3):
+    """Score validated customers; returns (probabilities, predictions, risk_factors or None)."""
+    bundle = active_bundle
+    raw = raw_matrix(customers)
+    get_monitoring_service().enqueue_inputs(raw)
+    with stage_timer("preprocess", bundle.version):
+        if bundle.feature_plan is not None:
+            processed_df = bundle.feature_plan.transform_raw(raw)
+        else:
+            batch_data = []
+            for c in customers:
+                data_dict = c.model_dump(mode='json')
+                batch_data.append({COLUMN_MAPPING.get(k, k): v for k, v in data_dict.items()})
+            processed_df = preprocess_data(pd.DataFrame(batch_data))
+    
+    if explain:
+        return score_explained(processed_df, bundle, top_k)
+    probabilities, predictions = score(processed_df, bundle)
+    return probabilities, predictions, None
+
+def predict_customers_explained(customers: List[CustomerData]) -> List[PredictionResponse]:
+    """Micro-batch handler: one scoring pass and one SHAP call for many /predict requests."""
+    observe_batch("micro_batch", len(customers))
+    response_list, _ = build_prediction_responses(*score_customers(customers, explain=True))
+    return response_list
+
+def predict_csv(csv_file, explain: bool = False, top_k: int = 3):
+    """Score an uploaded CSV; returns (probabilities, predictions, risk_factors or None)."""
+    bundle = active_bundle
+    
+    # Read CSV
+    df = pd.read_csv(csv_file)
+    
+    # Rename columns based on mapping
+    # First, handle cases where CSV might already have the mapped names
+    # or needs to be mapped from the Pydantic field names
+    df_mapped = df.rename(columns=COLUMN_MAPPING)
+    
+    # Preprocess data
+    processed_df = prepare_frame(df_mapped, bundle)
+    observe_batch("csv", len(df))
+        
+    # Predictions
+    if explain:
+        return score_explained(processed_df, bundle, top_k)
+    probabilities, predictions = score(processed_df, bundle)
+    return probabilities, predictions, None
+
+# Streaming CSV scoring: media type per output format
+STREAM_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv"
+}
+# How long a started stream waits for a free executor slot before it aborts
+STREAM_CAPACITY_TIMEOUT_S = 30.0
+
+def prepare_frame(df_mapped: pd.DataFrame, bundle: ModelBundle):
+    """Feature matrix for a DataFrame that already uses the dataset column names."""
+    with stage_timer("preprocess", bundle.version):
+        if all(col in df_mapped.columns for col in RAW_COLUMNS):
+            raw = df_mapped[RAW_COLUMNS].to_numpy(dtype="float64")
+            get_monitoring_service().enqueue_inputs(raw)
+            if bundle.feature_plan is not None:
+                return bundle.feature_plan.transform_raw(raw)
+        if bundle.feature_plan is not None:
+            # Raises a ValueError naming the missing columns
+            return bundle.feature_plan.transform_frame(df_mapped)
+        
+        processed_df = preprocess_data(df_mapped)
+        if bundle.feature_names:
+            for col in bundle.feature_names:
+                if col not in processed_df.columns:
+                    processed_df[col] = 0
+            processed_df = processed_df[bundle.feature_names]
+        return processed_df
+
+def score_raw(raw, bundle: ModelBundle = None):
+    """Score an (n_rows, 13) raw matrix ordered as RAW_COLUMNS; returns (probabilities, predictions)."""
+    bundle = bundle or active_bundle
+    processed = prepare_frame(pd.DataFrame(raw, columns=RAW_COLUMNS, copy=False), bundle)
+    return score(processed, bundle)
+
+def score_columnar(request: ColumnarBatchRequest):
+    """Stack, validate and score a columnar batch (runs on the inference executor)."""
+    raw = columns_to_raw(request)
+    errors = validation_errors(raw)
+    if errors:
+        raise ColumnarValidationError(errors)
+    return score_raw(raw)
+
+def encode_stream_chunk(row_ids, probabilities, predictions, output_format: str, header: bool) -> bytes:
+    risk_levels = get_risk_levels(probabilities)
+    if output_format == "csv":
+        buffer = io.StringIO()
+        pd.DataFrame({
+            "row_id": row_ids,
+            "churn_probability": probabilities,
+            "churn_prediction": predictions,
+            "risk_level": risk_levels
+        }).to_csv(buffer, index=False, header=header)
+        return buffer.getvalue().encode()
+    
+    return encode_ndjson_rows(row_ids, probabilities, predictions, risk_levels.tolist())
+
+def score_next_csv_chunk(reader, first_row: int, output_format: str, id_column: Optional[str],
+                         bundle: ModelBundle):
+    """
+    Read, score and encode the next chunk of a streaming CSV upload.
+    Returns (payload, rows) or (None, 0) once the reader is exhausted.
+    """
+    try:
+        chunk = next(reader)
+    except StopIteration:
+        return None, 0
+    
+    if id_column is not None:
+        if id_column not in chunk.columns:
+            raise ValueError(f"id_column '{id_column}' not found in CSV")
+        row_ids = chunk[id_column].tolist()
+    else:
+        row_ids = range(first_row, first_row + len(chunk))
+        
+    processed = prepare_frame(chunk.rename(columns=COLUMN_MAPPING), bundle)
+    observe_batch("stream", len(chunk))
+    probabilities, predictions = score(processed, bundle)
+    payload = encode_stream_chunk(row_ids, probabilities, predictions, output_format, header=first_row == 0)
+    return payload, len(chunk)
+
+async def stream_csv_scores(upload, reader, first_payload: bytes, first_rows: int,
+                            output_format: str, id_column: Optional[str], bundle: ModelBundle):
+    """Yield encoded chunks; each chunk is scored on the inference executor."""
+    row = first_rows
+    try:
+        yield first_payload
+        while True:
+            try:
+                payload, rows = await inference_executor.run(
+                    score_next_csv_chunk, reader, row, output_format, id_column, bundle
+                )
+            except ExecutorSaturated:
+                # Headers are already sent, so wait for a slot instead of answering 429
+                if not await inference_executor.wait_for_capacity(STREAM_CAPACITY_TIMEOUT_S):
+                    raise RuntimeError(f"No inference capacity within {STREAM_CAPACITY_TIMEOUT_S:.0f} s")
+                continue
+            if payload is None:
+                break
+            row += rows
+            yield payload
+    except Exception as e:
+        logger.error(f"Streaming CSV prediction error after {row} rows: {e}")
+        raise
+    finally:
+        reader.close()
+        upload.close()
+
+async def run_inference(fn, *args):
+    """Run CPU-bound work off the event loop; a saturated executor becomes a 429."""
+    try:
+        return await inference_executor.run(fn, *args)
+    except ExecutorSaturated as e:
+        raise too_many_requests(e)
+
+def too_many_requests(e: ExecutorSaturated) -> HTTPException:
+    logger.warning(f"⚠️ Rejecting request: {e}")
+    return HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
+
+async def cache_io(fn, *args):
+    """Call a prediction cache method, in a thread if its backend does blocking I/O."""
+    if prediction_cache.blocking:
+        return await asyncio.to_thread(fn, *args)
+    return fn(*args)
+
 @app.post("/predict", response_model=PredictionResponse, tags=["Prediction"])
+@instrumented(lambda: model_version)
 async def predict(customer: CustomerData):
     if model is None:
         raise HTTPException(status_code=503, detail="Model not loaded")
     
     try:
-        data_dict = customer.model_dump(mode='json')
+        key = None
+        if prediction_cache is not None:
+            key = cache_key(customer, model_version)
+            cached = await cache_io(prediction_cache.get, key)
+            CACHE_LOOKUPS.labels("miss" if cached is None else "hit").inc()
+            if cached is not None:
+                return cached
         
-        mapping = {
-            "Call_Failure": "Call  Failure",
-            "Complains": "Complains",
-            "Subscription_Length": "Subscription  Length",
-            "Charge_Amount": "Charge  Amount",
-            "Seconds_of_Use": "Seconds of Use",
-            "Frequency_of_use": "Frequency of use",
-            "Frequency_of_SMS": "Frequency of SMS",
-            "Distinct_Called_Numbers": "Distinct Called Numbers",
-            "Age_Group": "Age Group",
-            "Tariff_Plan": "Tariff Plan",
-            "Status": "Status",
-            "Age": "Age",
-            "Customer_Value": "Customer Value"
-        }
-        
-        mapped_data = {mapping.get(k, k): v for k, v in data_dict.items()}
-        input_data = pd.DataFrame([mapped_data])
-        
-        processed_data = preprocess_data(input_data)
-        
-        if feature_names:
-            for col in feature_names:
-                if col not in processed_data.columns:
-                    processed_data[col] = 0
-            processed_data = processed_data[feature_names]
-            
-        prediction = model.predict(processed_data)[0]
-        probability = model.predict_proba(processed_data)[0][1]
+        if micro_batcher is not None:
+            result = await micro_batcher.submit(customer)
+        else:
+            result = await run_inference(predict_one, customer)
         
-        explainer = get_explainer_service()
-        top_risk_factors = explainer.get_explanation(processed_data)
-        
-        monitor = get_monitoring_service()
-        monitor.check_data_quality(input_data)
-        
-        return PredictionResponse(
-            churn_prediction=int(prediction),
-            churn_probability=float(probability),
-            risk_level=get_risk_level(probability),
-            confidence=float(probability if prediction == 1 else 1 - probability),
-            top_risk_factors=top_risk_factors
-        )
+        if key is not None:
+            await cache_io(prediction_cache.set, key, result)
+        return result
+    except ExecutorSaturated as e:
+        raise too_many_requests(e)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Prediction error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/predict/batch", response_model=BatchPredictionResponse, tags=["Prediction"])
+@instrumented(lambda: model_version)
 async def predict_batch(request: BatchPredictionRequest):
     if model is None:
         raise HTTPException(status_code=503, detail="Model not loaded")
     
     start_time = time.time()
+    observe_batch("batch", len(request.customers))
     try:
-        customers = request.customers
-        
-        mapping = {
-            "Call_Failure": "Call  Failure",
-            "Complains": "Complains",
-            "Subscription_Length": "Subscription  Length",
-            "Charge_Amount": "Charge  Amount",
-            "Seconds_of_Use": "Seconds of Use",
-            "Frequency_of_use": "Frequency of use",
-            "Frequency_of_SMS": "Frequency of SMS",
-            "Distinct_Called_Numbers": "Distinct Called Numbers",
-            "Age_Group": "Age Group",
-            "Tariff_Plan": "Tariff Plan",
-            "Status": "Status",
-            "Age": "Age",
-            "Customer_Value": "Customer Value"
-        }
-        
-        batch_data = []
-        for c in customers:
-            data_dict = c.model_dump(mode='json')
-            mapped_data = {mapping.get(k, k): v for k, v in data_dict.items()}
-            batch_data.append(mapped_data)
-            
-        input_df = pd.DataFrame(batch_data)
-        processed_df = preprocess_data(input_df)
-        
-        if feature_names:
-            for col in feature_names:
-                if col not in processed_df.columns:
-                    processed_df[col] = 0
-            processed_df = processed_df[feature_names]
-            
-        predictions = model.predict(processed_df)
-        probabilities = model.predict_proba(processed_df)[:, 1]
-        
-        response_list = []
-        high_risk_count = 0
-        
-        for pred, prob in zip(predictions, probabilities):
-            risk = get_risk_level(prob)
-            if risk == "High":
-                high_risk_count += 1
-                
-            response_list.append(PredictionResponse(
-                churn_prediction=int(pred),
-                churn_probability=float(prob),
-                risk_level=risk,
-                confidence=float(prob if pred == 1 else 1 - prob),
-                top_risk_factors=[]
-            ))
-            
+        probabilities, predictions, risk_factors = await run_inference(
+            score_customers, request.customers, request.explain, request.top_k
+        )
         processing_time = (time.time() - start_time) * 1000
         
-        return BatchPredictionResponse(
-            predictions=response_list,
-            total_customers=len(customers),
-            high_risk_count=high_risk_count,
-            processing_time_ms=processing_time
+        # Encode the BatchPredictionResponse JSON straight from the score arrays
+        mark_serialization_start()
+        return Response(
+            content=encode_batch_response(probabilities, predictions, risk_factors, processing_time),
+            media_type="application/json"
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Batch prediction error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/predict/batch/columnar", response_model=ColumnarBatchResponse, tags=["Prediction"])
+@instrumented(lambda: model_version)
+async def predict_batch_columnar(request: ColumnarBatchRequest):
+    """
+    High-volume scoring: one array per feature (up to 50k rows), checked with
+    vectorized range rules instead of per-row models, answered with one array per output.
+    """
+    if model is None:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+    
+    start_time = time.time()
+    try:
+        probabilities, predictions = await run_inference(score_columnar, request)
+        observe_batch("columnar", len(probabilities))
+        processing_time = (time.time() - start_time) * 1000
+        
+        mark_serialization_start()
+        # 50k-row responses: encode off the event loop, straight from the arrays
+        content = await run_inference(encode_columnar_response, probabilities, predictions, processing_time)
+    except ColumnarValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Columnar batch prediction error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    return Response(content=content, media_type="application/json")
+
+@app.post("/predict/batch/arrow", tags=["Prediction"], response_class=Response)
+@instrumented(lambda: model_version)
+async def predict_batch_arrow(
+    request: Request,
+    format: Optional[str] = Query(None, description="Output format: arrow, arrow-file or parquet (default: same as input)"),
+    id_column: Optional[str] = Query(None, description="Input column echoed back as row_id (default: row number)")
+):
+    """
+    Bulk scoring for warehouse exports without any text step. Send an Arrow IPC
+    stream/file or Parquet body with the matching Content-Type
+    (application/vnd.apache.arrow.stream, application/vnd.apache.arrow.file,
+    application/vnd.apache.parquet); the result comes back as Arrow or Parquet.
+    """
+    if model is None:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+    
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    input_format = MEDIA_TYPE_FORMATS.get(content_type)
+    if input_format is None:
+        raise HTTPException(status_code=415, detail=f"Unsupported Content-Type '{content_type}'; use one of {list(MEDIA_TYPE_FORMATS)}")
+    output_format = format or input_format
+    if output_format not in BINARY_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format '{output_format}'; use one of {list(BINARY_FORMATS)}")
+    
+    body = await request.body()
+    try:
+        payload, rows = await run_inference(
+            score_binary_payload, body, input_format, output_format, score_raw, id_column
+        )
+    except ColumnarValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Arrow batch prediction error: {e}")
+        raise HTTPException(status_code=400, detail=f"Error processing {input_format} input: {str(e)}")
+    
+    observe_batch("arrow", rows)
+    return Response(content=payload, media_type=BINARY_FORMATS[output_format])
+
 @app.post("/predict/batch/csv", response_model=BatchPredictionResponse, tags=["Prediction"])
-async def predict_batch_csv(file: UploadFile = File(...)):
+@instrumented(lambda: model_version)
+async def predict_batch_csv(
+    file: UploadFile = File(...),
+    explain: bool = Query(False, description="Include top_risk_factors for every row"),
+    top_k: int = Query(3, ge=1, le=20, description="Risk factors per row when explain is true")
+):
     if model is None:
         raise HTTPException(status_code=503, detail="Model not loaded")
     
@@ -313,86 +758,91 @@ async def predict_batch_csv(file: UploadFile = File(...)):
     
     start_time = time.time()
     try:
-        # Read CSV
-        df = pd.read_csv(file.file)
-        
-        # Mapping for column names if they differ from internal names
-        mapping = {
-            "Call_Failure": "Call  Failure",
-            "Complains": "Complains",
-            "Subscription_Length": "Subscription  Length",
-            "Charge_Amount": "Charge  Amount",
-            "Seconds_of_Use": "Seconds of Use",
-            "Frequency_of_use": "Frequency of use",
-            "Frequency_of_SMS": "Frequency of SMS",
-            "Distinct_Called_Numbers": "Distinct Called Numbers",
-            "Age_Group": "Age Group",
-            "Tariff_Plan": "Tariff Plan",
-            "Status": "Status",
-            "Age": "Age",
-            "Customer_Value": "Customer Value"
-        }
-        
-        # Rename columns based on mapping
-        # First, handle cases where CSV might already have the mapped names
-        # or needs to be mapped from the Pydantic field names
-        df_mapped = df.rename(columns=mapping)
-        
-        # Preprocess data
-        processed_df = preprocess_data(df_mapped)
-        
-        # Ensure all required features are present
-        if feature_names:
-            for col in feature_names:
-                if col not in processed_df.columns:
-                    processed_df[col] = 0
-            processed_df = processed_df[feature_names]
-            
-        # Predictions
-        predictions = model.predict(processed_df)
-        probabilities = model.predict_proba(processed_df)[:, 1]
-        
-        response_list = []
-        high_risk_count = 0
-        
-        for pred, prob in zip(predictions, probabilities):
-            risk = get_risk_level(prob)
-            if risk == "High":
-                high_risk_count += 1
-                
-            response_list.append(PredictionResponse(
-                churn_prediction=int(pred),
-                churn_probability=float(prob),
-                risk_level=risk,
-                confidence=float(prob if pred == 1 else 1 - prob),
-                top_risk_factors=[]
-            ))
-            
+        probabilities, predictions, risk_factors = await run_inference(predict_csv, file.file, explain, top_k)
         processing_time = (time.time() - start_time) * 1000
         
-        return BatchPredictionResponse(
-            predictions=response_list,
-            total_customers=len(df),
-            high_risk_count=high_risk_count,
-            processing_time_ms=processing_time
-        )
+        mark_serialization_start()
+        # Large uploads produce large responses, so encode off the event loop
+        content = await run_inference(encode_batch_response, probabilities, predictions, risk_factors, processing_time)
+        return Response(content=content, media_type="application/json")
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"CSV Batch prediction error: {e}")
         raise HTTPException(status_code=500, detail=f"Error processing CSV: {str(e)}")
     finally:
         file.file.close()
 
+@app.post("/predict/batch/csv/stream", tags=["Prediction"])
+@instrumented(lambda: model_version)
+async def predict_batch_csv_stream(
+    file: UploadFile = File(...),
+    format: str = Query("ndjson", description="Output format: ndjson or csv"),
+    chunk_size: int = Query(10000, ge=1, le=1000000, description="Rows read and scored per chunk"),
+    id_column: Optional[str] = Query(None, description="CSV column echoed back as row_id (default: row number)")
+):
+    """
+    Score a CSV of any size in fixed-size chunks and stream the results back.
+    Memory stays bounded by chunk_size, and the first rows are sent before the last are read.
+    """
+    if model is None:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+    
+    if not file.filename.endswith('.csv'):
+        raise HTTPException(status_code=400, detail="Only CSV files are supported")
+    
+    if format not in STREAM_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format '{format}'; use one of {list(STREAM_FORMATS)}")
+    
+    # FastAPI closes the UploadFile as soon as this handler returns, but the
+    # stream keeps reading from it, so take ownership of the spooled file.
+    upload = file.file
+    file.file = io.BytesIO()
+    
+    reader = None
+    try:
+        reader = pd.read_csv(upload, chunksize=chunk_size)
+        # Score the first chunk before responding so bad input still gets a proper status code
+        # The whole stream is scored by the model that was active when it started
+        bundle = active_bundle
+        first_payload, first_rows = await run_inference(score_next_csv_chunk, reader, 0, format, id_column, bundle)
+    except Exception as e:
+        if reader is not None:
+            reader.close()
+        upload.close()
+        if isinstance(e, HTTPException):
+            raise
+        logger.error(f"Streaming CSV prediction error: {e}")
+        raise HTTPException(status_code=400, detail=f"Error processing CSV: {str(e)}")
+    
+    return StreamingResponse(
+        stream_csv_scores(upload, reader, first_payload or b"", first_rows, format, id_column, bundle),
+        media_type=STREAM_FORMATS[format]
+    )
+
 @app.get("/monitoring", tags=["Monitoring"])
 async def monitoring_status():
     return {
         "status": "active",
         "model_version": model_version,
         "model_source": model_source,
-        "drift_status": "No drift detected",
-        "data_quality": "All checks passed"
+        "drift_status": get_monitoring_service().drift_status(),
+        "data_quality": get_monitoring_service().data_quality_status(),
+        "executor": inference_executor.stats() if inference_executor else None,
+        "batching": micro_batcher.stats() if micro_batcher else None,
+        "cache": prediction_cache.stats() if prediction_cache else None
     }
 
+@app.get("/metrics", tags=["Monitoring"])
+async def metrics():
+    """Prometheus metrics (aggregated across workers when PROMETHEUS_MULTIPROC_DIR is set)."""
+    if prediction_cache is not None:
+        CACHE_SIZE.set(prediction_cache.size())
+    update_queue_gauges(inference_executor, micro_batcher)
+    payload, content_type = render_metrics()
+    return Response(content=payload, media_type=content_type)
+
 @app.get("/model/info", tags=["Model"])
 async def model_info():
     if model_metadata is None:
@@ -0,0 +1,168 @@
+"""
+Prometheus metrics for the serving pipeline.
+
+Per-endpoint request latency plus per-stage latency for validation,
+preprocessing, LightGBM scoring, SHAP and response serialization, batch sizes,
+queue depths and the active model version.
+
+With several uvicorn workers set PROMETHEUS_MULTIPROC_DIR to an empty
+directory before starting; every worker then writes its samples to mmap'd
+files there and /metrics aggregates all of them.
+"""
+import contextvars
+import functools
+import os
+import time
+from contextlib import contextmanager
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest, multiprocess
+)
+
+MULTIPROC_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1000, 5000, 10000, 50000)
+
+REQUEST_LATENCY = Histogram(
+    "churn_request_latency_seconds", "End-to-end request latency",
+    ["endpoint", "method", "status"], buckets=LATENCY_BUCKETS
+)
+STAGE_LATENCY = Histogram(
+    "churn_stage_latency_seconds", "Latency of one pipeline stage",
+    ["stage", "model_version"], buckets=LATENCY_BUCKETS
+)
+BATCH_SIZE = Histogram(
+    "churn_batch_size_rows", "Rows scored per model call", ["path"], buckets=BATCH_SIZE_BUCKETS
+)
+CACHE_LOOKUPS = Counter("churn_cache_lookups_total", "Prediction cache lookups", ["result"])
+EXECUTOR_IN_FLIGHT = Gauge(
+    "churn_executor_in_flight", "Inference jobs running or queued", multiprocess_mode="livesum"
+)
+EXECUTOR_QUEUE_DEPTH = Gauge(
+    "churn_executor_queue_depth", "Inference jobs waiting for a worker thread", multiprocess_mode="livesum"
+)
+BATCHER_QUEUE_DEPTH = Gauge(
+    "churn_batcher_queue_depth", "/predict requests waiting to be micro-batched", multiprocess_mode="livesum"
+)
+CACHE_SIZE = Gauge("churn_cache_entries", "Prediction cache entries", multiprocess_mode="livemax")
+MODEL_INFO = Gauge(
+    "churn_model_info", "Active model (value 1)", ["model_version", "source"], multiprocess_mode="livemax"
+)
+
+# Per-request timing shared between the HTTP middleware and the endpoint wrapper
+_request_timing = contextvars.ContextVar("request_timing", default=None)
+
+
+class RequestTiming:
+    __slots__ = ("start", "handler_done")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.handler_done = None
+
+
+def start_request() -> RequestTiming:
+    timing = RequestTiming()
+    _request_timing.set(timing)
+    return timing
+
+
+def finish_request(timing: RequestTiming, endpoint: str, method: str, status: int, model_version=None):
+    """Record end-to-end latency and, for instrumented endpoints, serialization time."""
+    end = time.perf_counter()
+    REQUEST_LATENCY.labels(endpoint, method, str(status)).observe(end - timing.start)
+    if timing.handler_done is not None:
+        STAGE_LATENCY.labels("serialize", str(model_version)).observe(end - timing.handler_done)
+
+
+def instrumented(model_version_fn):
+    """
+    Endpoint decorator: time from the middleware to the handler body is body
+    parsing plus Pydantic validation; whatever happens after the handler
+    returns, until the middleware sees the response, is serialization.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            timing = _request_timing.get()
+            if timing is not None:
+                STAGE_LATENCY.labels("validation", str(model_version_fn())).observe(time.perf_counter() - timing.start)
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                if timing is not None and timing.handler_done is None:
+                    timing.handler_done = time.perf_counter()
+        return wrapper
+    return decorator
+
+
+def mark_serialization_start():
+    """For handlers that encode their own response body: count the rest of the request as serialization."""
+    timing = _request_timing.get()
+    if timing is not None:
+        timing.handler_done = time.perf_counter()
+
+
+@contextmanager
+def stage_timer(stage: str, model_version):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_LATENCY.labels(stage, str(model_version)).observe(time.perf_counter() - start)
+
+
+def observe_batch(path: str, rows: int):
+    BATCH_SIZE.labels(path).observe(rows)
+
+
+def set_model_info(version, source, previous_version=None, previous_source=None):
+    if previous_version is not None:
+        MODEL_INFO.labels(str(previous_version), str(previous_source)).set(0)
+    MODEL_INFO.labels(str(version), str(source)).set(1)
+
+
+def update_queue_gauges(executor=None, batcher=None):
+    if executor is not None:
+        stats = executor.stats()
+        EXECUTOR_IN_FLIGHT.set(stats["in_flight"])
+        EXECUTOR_QUEUE_DEPTH.set(stats["queue_depth"])
+    if batcher is not None:
+        BATCHER_QUEUE_DEPTH.set(batcher.stats()["queue_depth"])
+
+
+def worker_memory() -> dict:
+    """
+    This process's memory in MB. RSS counts pages shared with other workers
+    (mapped bundle, preloaded modules) in full; PSS splits them between the
+    processes sharing them and private is what this worker alone holds.
+    """
+    memory = {"pid": os.getpid()}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            fields = dict(line.split(":", 1) for line in f.readlines()[1:])
+        kb = {key: int(value.split()[0]) for key, value in fields.items()}
+        memory.update({
+            "rss_mb": kb["Rss"] / 1024,
+            "pss_mb": kb["Pss"] / 1024,
+            "shared_mb": (kb["Shared_Clean"] + kb["Shared_Dirty"]) / 1024,
+            "private_mb": (kb["Private_Clean"] + kb["Private_Dirty"]) / 1024
+        })
+    except (OSError, KeyError, ValueError):
+        # Not Linux: peak RSS is all getrusage offers (kB on Linux, bytes on macOS)
+        import resource
+        import sys
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        memory["max_rss_mb"] = peak / (2**20 if sys.platform == "darwin" else 1024)
+    return memory
+
+
+def render_metrics():
+    """Prometheus text exposition for this worker, or for all workers in multiprocess mode."""
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
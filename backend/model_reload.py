@@ -0,0 +1,157 @@
+import asyncio
+import logging
+import time
+
+from backend.explainability import NativeExplainerService
+from backend.feature_plan import build_feature_plan
+from backend.models import CustomerData
+from backend.scoring import decision_threshold
+from backend.tree_engine import ArrayTreeModel
+
+logger = logging.getLogger(__name__)
+
+
+class ModelBundle:
+    """
+    Everything one model version needs to serve requests.
+
+    Request handlers take a reference to the active bundle once and use it
+    for the whole request, so swapping in a new bundle never mixes artifacts
+    from two versions and never disturbs requests already in flight.
+    """
+
+    def __init__(self, model, feature_names, metadata, source: str, version, explainer=None, tree_model=None):
+        self.model = model
+        self.feature_names = feature_names
+        self.metadata = metadata
+        self.source = source
+        self.version = version
+        self.explainer = explainer
+        # Prebuilt ArrayTreeModel from a serving bundle, used by use_scorer("array")
+        self.tree_model = tree_model
+        self.feature_plan = build_feature_plan(feature_names) if feature_names else None
+        self.threshold = decision_threshold(metadata)
+        self.loaded_at = time.time()
+
+    def use_explainer(self, backend: str = "shap"):
+        """Explain with LightGBM's native contributions (serving.explainer: native) instead of shap."""
+        if backend == "native":
+            self.explainer = NativeExplainerService(self.model.booster_, sigmoid=self.sigmoid())
+        elif backend != "shap":
+            raise ValueError(f"Unknown explainer backend '{backend}'; use shap or native")
+
+    def sigmoid(self) -> float:
+        """The binary objective's sigmoid scale, without dumping the model to text."""
+        tree_model = self.tree_model if self.tree_model is not None else self.model
+        if isinstance(tree_model, ArrayTreeModel):
+            return tree_model.sigmoid
+        # Trained and file-loaded boosters carry their params; Booster(model_str=...) has none
+        params = self.model.booster_.params
+        if not params:
+            raise ValueError("The booster has no parameters to read its sigmoid from")
+        return float(params.get("sigmoid", 1.0))
+
+    def use_scorer(self, engine: str = "lightgbm", array_max_rows: int = None):
+        """Swap in the flat-array tree evaluator (serving.scorer.engine: array); "lightgbm" keeps the model as is."""
+        if engine == "array" and self.tree_model is not None:
+            self.model = self.tree_model.bind(self.model, max_rows=array_max_rows)
+        elif engine == "array":
+            self.model = ArrayTreeModel.from_model(self.model, max_rows=array_max_rows)
+        elif engine != "lightgbm":
+            raise ValueError(f"Unknown scorer engine '{engine}'; use lightgbm or array")
+
+    def warm_up(self, rows: int = 64):
+        """Run synthetic rows through scoring and SHAP so the first real request isn't cold."""
+        if self.feature_plan is None:
+            return
+        example = CustomerData(**CustomerData.model_config["json_schema_extra"]["example"])
+        features = self.feature_plan.transform([example] * rows)
+        self.model.predict_proba(features[:1])
+        self.model.predict_proba(features)
+        # A lazily loaded explainer stays unloaded until a request needs it
+        if self.explainer is not None and self.explainer.loaded:
+            self.explainer.get_batch_explanations(features[:1], feature_names=self.feature_names)
+
+
+class ModelWatcher:
+    """
+    Background task that polls for a new model and hot-swaps it in.
+
+    `signature_fn` returns something that changes whenever a new model is
+    published (registry version, file mtimes); `load_fn` builds a ModelBundle
+    and `install_fn` makes it active. Polling, loading and warm-up all run in
+    worker threads, so neither the event loop nor the inference executor is
+    blocked; if anything fails the current model keeps serving.
+    """
+
+    def __init__(self, signature_fn, load_fn, install_fn, poll_interval: float = 30.0, warmup_rows: int = 64):
+        self.signature_fn = signature_fn
+        self.load_fn = load_fn
+        self.install_fn = install_fn
+        self.poll_interval = poll_interval
+        self.warmup_rows = warmup_rows
+        self.signature = None
+        self.reloads = 0
+        self.failures = 0
+        self.last_check = None
+        self.last_error = None
+        self._task = None
+
+    def start(self, signature):
+        self.signature = signature
+        self._task = asyncio.create_task(self._poll_loop())
+        logger.info(f"✅ Model watcher polling every {self.poll_interval}s")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _load_and_warm(self):
+        bundle = self.load_fn()
+        if bundle is not None:
+            bundle.warm_up(self.warmup_rows)
+        return bundle
+
+    async def check(self):
+        """Reload if the published model changed. Returns True if a new model was installed."""
+        self.last_check = time.time()
+        try:
+            signature = await asyncio.to_thread(self.signature_fn)
+            if signature == self.signature:
+                return False
+
+            logger.info("🔄 New model detected, loading in the background...")
+            bundle = await asyncio.to_thread(self._load_and_warm)
+            if bundle is None:
+                raise RuntimeError("No model could be loaded")
+
+            self.install_fn(bundle)
+            self.signature = signature
+            self.reloads += 1
+            self.last_error = None
+            logger.info(f"✅ Hot-swapped model to {bundle.source} v{bundle.version}")
+            return True
+        except Exception as e:
+            self.failures += 1
+            self.last_error = str(e)
+            logger.error(f"❌ Model reload failed, keeping current model: {e}")
+            return False
+
+    async def _poll_loop(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            await self.check()
+
+    def stats(self):
+        return {
+            "poll_interval_seconds": self.poll_interval,
+            "reloads": self.reloads,
+            "failures": self.failures,
+            "last_check": self.last_check,
+            "last_error": self.last_error
+        }
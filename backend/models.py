@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, validator, model_validator
 from typing import List, Optional
 from enum import IntEnum
 
@@ -64,6 +64,8 @@ class PredictionResponse(BaseModel):
 
 class BatchPredictionRequest(BaseModel):
     customers: List[CustomerData] = Field(..., min_items=1, max_items=100, description="List of customer data (1-100 items)")
+    explain: bool = Field(default=False, description="Include top_risk_factors for every customer (one batched SHAP pass)")
+    top_k: int = Field(default=3, ge=1, le=20, description="Risk factors returned per customer when explain is true")
 
 class BatchPredictionResponse(BaseModel):
     predictions: List[PredictionResponse]
@@ -71,6 +73,44 @@ class BatchPredictionResponse(BaseModel):
     high_risk_count: int
     processing_time_ms: float
 
+# Columnar batches skip per-row object validation, so they can be much larger
+MAX_COLUMNAR_ROWS = 50000
+
+class ColumnarBatchRequest(BaseModel):
+    """One array per CustomerData field; value constraints are checked vectorized in the handler."""
+    Call_Failure: List[float] = Field(..., description="Number of call failures (integer, >= 0)")
+    Complains: List[float] = Field(..., description="0: No, 1: Yes")
+    Subscription_Length: List[float] = Field(..., description="Months subscribed (>= 0)")
+    Charge_Amount: List[float] = Field(..., description="Charge category (integer, 0-9)")
+    Seconds_of_Use: List[float] = Field(..., description="Usage seconds (>= 0)")
+    Frequency_of_use: List[float] = Field(..., description="Usage frequency (>= 0)")
+    Frequency_of_SMS: List[float] = Field(..., description="SMS frequency (>= 0)")
+    Distinct_Called_Numbers: List[float] = Field(..., description="Unique numbers called (integer, >= 0)")
+    Age_Group: List[float] = Field(..., description="Age category (1-5)")
+    Tariff_Plan: List[float] = Field(..., description="1: Pay as you go, 2: Contractual")
+    Status: List[float] = Field(..., description="1: Active, 2: Non-active")
+    Age: List[float] = Field(..., description="Customer age (integer, 0-120)")
+    Customer_Value: List[float] = Field(..., description="Customer value score (>= 0)")
+
+    @model_validator(mode="after")
+    def check_lengths(self):
+        lengths = {len(values) for values in self.__dict__.values()}
+        if len(lengths) != 1:
+            raise ValueError("All feature arrays must have the same length")
+        rows = lengths.pop()
+        if not 1 <= rows <= MAX_COLUMNAR_ROWS:
+            raise ValueError(f"Batch must contain 1-{MAX_COLUMNAR_ROWS} rows, got {rows}")
+        return self
+
+class ColumnarBatchResponse(BaseModel):
+    churn_probability: List[float]
+    churn_prediction: List[int] = Field(..., description="0: Non-churn, 1: Churn")
+    risk_code: List[int] = Field(..., description="Index into risk_levels")
+    risk_levels: List[str] = Field(default=["Low", "Medium", "High"])
+    total_customers: int
+    high_risk_count: int
+    processing_time_ms: float
+
 class HealthResponse(BaseModel):
     status: str
     model_loaded: bool
@@ -1,29 +1,64 @@
 import pandas as pd
 import numpy as np
-from scipy.stats import ks_2samp
 import joblib
 import logging
 
+from backend.data_quality import DataQualityMonitor, QualityRules
+from backend.drift import PSI_THRESHOLD, RollingSketch
+from backend.feature_plan import RAW_COLUMNS
+
 logger = logging.getLogger(__name__)
 
 class MonitoringService:
-    def __init__(self, reference_data_path='backend/feature_names.pkl'):
-        # In a real system, we'd load the actual training data distribution
-        # For this simplified version, we'll assume we have access to some stats
-        # or we just check for schema validity and basic range checks.
-        # To do drift properly, we need the training data.
-        # Let's try to load the training data if available, or just skip drift if not.
-        self.reference_data = None
-        try:
-            # Ideally we would save a sample of training data
-            pass 
-        except Exception:
-            pass
+    def __init__(self, config: dict = None):
+        # Drift is tracked on the model's feature vectors against the reference
+        # histograms train.py stores in the model metadata (see backend/drift.py)
+        config = config or {}
+        drift_config = config.get("drift", {})
+        self.window_buckets = drift_config.get("window_buckets", 12)
+        self.bucket_rows = drift_config.get("bucket_rows", 5000)
+        self.min_rows = drift_config.get("min_rows", 500)
+        self.psi_threshold = drift_config.get("psi_threshold", PSI_THRESHOLD)
+        self.sketch = None
+        
+        quality_config = config.get("data_quality", {})
+        self.data_quality = DataQualityMonitor(
+            buffer_rows=quality_config.get("buffer_rows", 65536),
+            check_interval=quality_config.get("check_interval_seconds", 5.0)
+        )
+
+    def set_reference(self, reference_sketches: dict = None):
+        """Start a fresh live window against a new model's reference histograms."""
+        if not reference_sketches:
+            self.sketch = None
+            return
+        self.sketch = RollingSketch(reference_sketches, self.window_buckets, self.bucket_rows)
+
+    def observe(self, features):
+        """Count a scored feature matrix into the live window (cheap; called on every scoring pass)."""
+        sketch = self.sketch
+        if sketch is not None:
+            sketch.update(features)
+
+    def drift_status(self):
+        sketch = self.sketch
+        if sketch is None:
+            return {"status": "unknown", "drift_detected": False, "details": "No reference sketches in model metadata"}
+        return sketch.compare(self.psi_threshold, self.min_rows)
+
+    def enqueue_inputs(self, raw):
+        """Queue raw input rows (ordered as RAW_COLUMNS) for the background quality checks."""
+        self.data_quality.enqueue(raw)
+
+    def data_quality_status(self):
+        return self.data_quality.stats()
 
     def check_drift(self, current_data: pd.DataFrame, reference_data: pd.DataFrame = None):
         """
         Check for prediction drift using KS test.
         """
+        from scipy.stats import ks_2samp
+        
         drift_report = {}
         drift_detected = False
         
@@ -48,20 +83,16 @@ class MonitoringService:
 
     def check_data_quality(self, data: pd.DataFrame):
         """
-        Basic data quality checks.
+        Synchronous quality checks on a DataFrame with the dataset column names.
+        Serving uses the buffered background checks instead (enqueue_inputs).
         """
-        issues = []
-        
-        # Check for missing values
-        if data.isnull().any().any():
-            issues.append("Missing values detected")
-            
-        # Check for negative values in strictly positive columns
-        positive_cols = ['Seconds of Use', 'Subscription  Length', 'Age']
-        for col in positive_cols:
-            if col in data.columns and (data[col] < 0).any():
-                issues.append(f"Negative values in {col}")
-                
+        columns = [col for col in RAW_COLUMNS if col in data.columns]
+        violations, _ = QualityRules(columns).check(data[columns].to_numpy(dtype=np.float64))
+        issues = [
+            f"{check.replace('_', ' ').capitalize()} values in {col}"
+            for check, counts in violations.items()
+            for col, count in zip(columns, counts) if count
+        ]
         return {
             "status": "passed" if not issues else "warning",
             "issues": issues
@@ -70,8 +101,8 @@ class MonitoringService:
 # Singleton
 _monitor = None
 
-def get_monitoring_service():
+def get_monitoring_service(config: dict = None):
     global _monitor
     if _monitor is None:
-        _monitor = MonitoringService()
+        _monitor = MonitoringService(config)
     return _monitor
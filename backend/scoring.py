@@ -0,0 +1,73 @@
+import joblib
+import logging
+import os
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Artifacts written by train.py
+ARTIFACTS_DIR = "backend"
+MODEL_FILE = "churn_model.pkl"
+FEATURES_FILE = "feature_names.pkl"
+METADATA_FILE = "model_metadata.pkl"
+
+
+def load_local_artifacts(artifacts_dir: str = ARTIFACTS_DIR):
+    """
+    Load the model, feature names and metadata saved by train.py.
+    Returns None if there is no model in `artifacts_dir`.
+
+    The model file holds a lightgbm.Booster (older runs saved an
+    LGBMClassifier); a Booster is wrapped to get predict_proba.
+    """
+    model_path = os.path.join(artifacts_dir, MODEL_FILE)
+    if not os.path.exists(model_path):
+        return None
+
+    model = joblib.load(model_path)
+    if not hasattr(model, "predict_proba"):
+        from backend.artifact_bundle import BoosterModel  # artifact_bundle imports this module
+        model = BoosterModel(model)
+    return {
+        "model": model,
+        "feature_names": joblib.load(os.path.join(artifacts_dir, FEATURES_FILE)),
+        "metadata": joblib.load(os.path.join(artifacts_dir, METADATA_FILE))
+    }
+
+
+def decision_threshold(metadata) -> float:
+    """Return the F1-tuned cutoff saved by train.py, or 0.5 if unavailable."""
+    if metadata and metadata.get("optimal_threshold") is not None:
+        return float(metadata["optimal_threshold"])
+    return 0.5
+
+
+def predict_scores(model, features, threshold: float):
+    """
+    Score a feature matrix in a single pass.
+    Returns churn probabilities and the labels derived from `threshold`.
+    """
+    probabilities = model.predict_proba(features)[:, 1]
+    predictions = (probabilities >= threshold).astype(int)
+    return probabilities, predictions
+
+
+def get_risk_level(prob: float) -> str:
+    if prob >= 0.7:
+        return "High"
+    elif prob >= 0.4:
+        return "Medium"
+    return "Low"
+
+
+RISK_LEVELS = ["Low", "Medium", "High"]
+
+
+def get_risk_codes(probabilities: np.ndarray) -> np.ndarray:
+    """Vectorized get_risk_level as indices into RISK_LEVELS."""
+    return np.searchsorted([0.4, 0.7], probabilities, side="right").astype(np.int8)
+
+
+def get_risk_levels(probabilities: np.ndarray) -> np.ndarray:
+    """Vectorized get_risk_level."""
+    return np.where(probabilities >= 0.7, "High", np.where(probabilities >= 0.4, "Medium", "Low"))
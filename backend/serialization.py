@@ -0,0 +1,88 @@
+"""
+Fast JSON encoding of batch prediction results.
+
+Builds the exact BatchPredictionResponse JSON straight from the NumPy score
+arrays with orjson, instead of constructing, validating and dumping one
+PredictionResponse model per row.
+"""
+import math
+
+import numpy as np
+import orjson
+
+from backend.scoring import RISK_LEVELS, get_risk_codes
+
+HIGH_RISK_CODE = RISK_LEVELS.index("High")
+
+
+def prediction_rows(probabilities: np.ndarray, predictions: np.ndarray, risk_factors=None) -> list:
+    """One dict per row, keys in PredictionResponse field order."""
+    probabilities = np.asarray(probabilities, dtype=np.float64)
+    predictions = np.asarray(predictions)
+    confidence = np.where(predictions == 1, probabilities, 1.0 - probabilities)
+    risk_levels = np.asarray(RISK_LEVELS, dtype=object)[get_risk_codes(probabilities)]
+    if risk_factors is None:
+        risk_factors = [[]] * len(probabilities)
+    # tolist() converts whole columns to Python scalars in C
+    return [
+        {
+            "churn_prediction": pred,
+            "churn_probability": prob,
+            "risk_level": risk,
+            "confidence": conf,
+            "top_risk_factors": factors
+        }
+        for pred, prob, risk, conf, factors in zip(
+            predictions.astype(np.int64).tolist(), probabilities.tolist(), risk_levels.tolist(),
+            confidence.tolist(), risk_factors
+        )
+    ]
+
+
+def encode_batch_response(probabilities: np.ndarray, predictions: np.ndarray, risk_factors=None,
+                          processing_time_ms: float = 0.0) -> bytes:
+    """BatchPredictionResponse as JSON bytes."""
+    return orjson.dumps({
+        "predictions": prediction_rows(probabilities, predictions, risk_factors),
+        "total_customers": len(probabilities),
+        "high_risk_count": int((get_risk_codes(np.asarray(probabilities)) == HIGH_RISK_CODE).sum()),
+        "processing_time_ms": processing_time_ms
+    }, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+def encode_columnar_response(probabilities: np.ndarray, predictions: np.ndarray,
+                             processing_time_ms: float = 0.0) -> bytes:
+    """ColumnarBatchResponse as JSON bytes; orjson writes the arrays without per-element Python objects."""
+    risk_codes = get_risk_codes(np.asarray(probabilities))
+    return orjson.dumps({
+        "churn_probability": np.ascontiguousarray(probabilities, dtype=np.float64),
+        "churn_prediction": np.ascontiguousarray(predictions, dtype=np.int64),
+        "risk_code": np.ascontiguousarray(risk_codes, dtype=np.int64),
+        "risk_levels": RISK_LEVELS,
+        "total_customers": len(probabilities),
+        "high_risk_count": int((risk_codes == HIGH_RISK_CODE).sum()),
+        "processing_time_ms": processing_time_ms
+    }, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+def json_row_id(row_id):
+    """Missing ids (NaN from pandas) become null; NaN is not valid JSON."""
+    if isinstance(row_id, float) and math.isnan(row_id):
+        return None
+    return row_id
+
+
+def encode_ndjson_rows(row_ids, probabilities: np.ndarray, predictions: np.ndarray, risk_levels) -> bytes:
+    """One JSON object per line: row_id, churn_probability, churn_prediction, risk_level."""
+    return b"".join(
+        orjson.dumps({
+            "row_id": json_row_id(row_id),
+            "churn_probability": prob,
+            "churn_prediction": pred,
+            "risk_level": risk
+        }, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_SERIALIZE_NUMPY)
+        for row_id, prob, pred, risk in zip(
+            row_ids, np.asarray(probabilities, dtype=np.float64).tolist(),
+            np.asarray(predictions).astype(np.int64).tolist(), list(risk_levels)
+        )
+    )
@@ -1,25 +1,191 @@
-import pandas as pd
-from ucimlrepo import fetch_ucirepo
+"""
+UCI dataset loading through a local snapshot store.
+
+Fetched datasets are saved as versioned Parquet snapshots under
+`data/snapshots/uci-<id>/`, named by a hash of their contents, with a
+manifest recording each snapshot's file checksum. Training reads from the
+store (optionally memory-mapped) and only hits the network when asked to
+fetch, so offline and CI runs are fast and reproducible.
+
+    python -m backend.src.data_loader --fetch      # download and snapshot
+    python -m backend.src.data_loader --list
+"""
+import argparse
+import hashlib
+import json
 import logging
+import os
+import time
+
+import pandas as pd
+import pyarrow.parquet as pq
 
 logger = logging.getLogger(__name__)
 
-def load_data(uci_id: int):
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_SNAPSHOT_DIR = os.path.join(REPO_ROOT, "data", "snapshots")
+TARGET_COLUMN = "Churn"
+
+
+def fetch_uci(uci_id: int):
     """
     Fetches the dataset from UCI repository.
     """
+    from ucimlrepo import fetch_ucirepo
+
     logger.info(f"🚀 Fetching UCI dataset ID {uci_id}...")
     try:
         dataset = fetch_ucirepo(id=uci_id)
         X = dataset.data.features
         y = dataset.data.targets
-        
+
         # Flatten y if it's a dataframe
         if isinstance(y, pd.DataFrame):
             y = y.iloc[:, 0]
-            
-        logger.info(f"✅ Dataset loaded: {X.shape[0]} rows, {X.shape[1]} features")
+
+        logger.info(f"✅ Dataset fetched: {X.shape[0]} rows, {X.shape[1]} features")
         return X, y
     except Exception as e:
         logger.error(f"❌ Error fetching dataset: {e}")
         raise e
+
+
+def content_hash(df: pd.DataFrame) -> str:
+    """sha256 over column names, dtypes and row hashes; independent of the Parquet writer version."""
+    digest = hashlib.sha256(json.dumps([[c, str(t)] for c, t in df.dtypes.items()]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def resolve_snapshot_dir(path: str) -> str:
+    """Relative snapshot dirs (as in config.yaml) are relative to the repo root, not the cwd."""
+    return path if os.path.isabs(path) else os.path.join(REPO_ROOT, path)
+
+
+class DatasetStore:
+    """Versioned, checksummed Parquet snapshots of one UCI dataset."""
+
+    def __init__(self, uci_id: int, root: str = DEFAULT_SNAPSHOT_DIR):
+        self.uci_id = uci_id
+        self.directory = os.path.join(root, f"uci-{uci_id}")
+        self.manifest_path = os.path.join(self.directory, "manifest.json")
+
+    def manifest(self) -> dict:
+        if not os.path.exists(self.manifest_path):
+            return {"latest": None, "snapshots": {}}
+        with open(self.manifest_path) as f:
+            return json.load(f)
+
+    def _write_manifest(self, manifest: dict):
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def save(self, X: pd.DataFrame, y: pd.Series, source: str = "ucimlrepo") -> dict:
+        """Snapshot X and y (target as the last column); an identical dataset reuses its snapshot."""
+        target = y.name or TARGET_COLUMN
+        df = X.reset_index(drop=True).assign(**{target: y.reset_index(drop=True)})
+        digest = content_hash(df)
+        version = digest[:16]
+
+        manifest = self.manifest()
+        if version not in manifest["snapshots"]:
+            os.makedirs(self.directory, exist_ok=True)
+            filename = f"{version}.parquet"
+            path = os.path.join(self.directory, filename)
+            tmp_path = path + ".tmp"
+            df.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, path)
+            manifest["snapshots"][version] = {
+                "file": filename,
+                "sha256": file_sha256(path),
+                "content_hash": digest,
+                "rows": len(df),
+                "features": X.shape[1],
+                "target": target,
+                "source": source,
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S")
+            }
+            logger.info(f"💾 Saved snapshot {version} ({len(df)} rows) to {path}")
+        manifest["latest"] = version
+        self._write_manifest(manifest)
+        return dict(manifest["snapshots"][version], version=version)
+
+    def info(self, version: str = "latest") -> dict:
+        manifest = self.manifest()
+        if version == "latest":
+            version = manifest["latest"]
+        if version is None or version not in manifest["snapshots"]:
+            raise FileNotFoundError(
+                f"No snapshot '{version}' for UCI dataset {self.uci_id} in {self.directory}; "
+                "fetch it first (python -m backend.src.data_loader --fetch)"
+            )
+        return dict(manifest["snapshots"][version], version=version)
+
+    def load(self, version: str = "latest", memory_map: bool = True, verify: bool = True):
+        """(X, y, info) from a snapshot; `verify` checks the file checksum before reading."""
+        info = self.info(version)
+        path = os.path.join(self.directory, info["file"])
+        if verify and file_sha256(path) != info["sha256"]:
+            raise ValueError(f"Checksum mismatch for snapshot {info['version']} ({path}); re-fetch the dataset")
+        df = pq.read_table(path, memory_map=memory_map).to_pandas()
+        y = df.pop(info["target"])
+        return df, y, info
+
+
+def load_snapshot(uci_id: int, snapshot_dir: str = DEFAULT_SNAPSHOT_DIR, version: str = "latest",
+                  fetch: bool = False, memory_map: bool = True):
+    """
+    (X, y, snapshot info) from the local store. With `fetch` the dataset is
+    downloaded first and stored as a new snapshot (or matched to an existing one).
+    """
+    store = DatasetStore(uci_id, snapshot_dir)
+    if fetch:
+        X, y = fetch_uci(uci_id)
+        version = store.save(X, y)["version"]
+    X, y, info = store.load(version, memory_map=memory_map)
+    logger.info(f"✅ Dataset loaded from snapshot {info['version']}: {X.shape[0]} rows, {X.shape[1]} features")
+    return X, y, info
+
+
+def load_data(uci_id: int, snapshot_dir: str = DEFAULT_SNAPSHOT_DIR, version: str = "latest",
+              fetch: bool = False, memory_map: bool = True):
+    """
+    Loads the dataset from the local snapshot store (see load_snapshot).
+    """
+    X, y, _ = load_snapshot(uci_id, snapshot_dir, version, fetch, memory_map)
+    return X, y
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage local UCI dataset snapshots.")
+    parser.add_argument("--uci-id", type=int, default=563)
+    parser.add_argument("--snapshot-dir", default=DEFAULT_SNAPSHOT_DIR)
+    parser.add_argument("--fetch", action="store_true", help="Download the dataset and store a snapshot")
+    parser.add_argument("--list", action="store_true", help="List stored snapshots")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    store = DatasetStore(args.uci_id, args.snapshot_dir)
+    if args.fetch:
+        X, y = fetch_uci(args.uci_id)
+        info = store.save(X, y)
+        print(f"✅ Snapshot {info['version']} ({info['rows']} rows, sha256 {info['sha256']})")
+    if args.list or not args.fetch:
+        manifest = store.manifest()
+        for version, info in manifest["snapshots"].items():
+            marker = "*" if version == manifest["latest"] else " "
+            print(f"{marker} {version}  {info['rows']:>7} rows  {info['created']}  sha256 {info['sha256']}")
+
+
+if __name__ == "__main__":
+    main()
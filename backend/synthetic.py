@@ -0,0 +1,26 @@
+"""Synthetic raw customers with the UCI schema, for benchmarks and tests."""
+import numpy as np
+import pandas as pd
+
+from backend.feature_plan import RAW_COLUMNS
+
+
+def synthetic_frame(n: int, seed: int = 0) -> pd.DataFrame:
+    """Raw customers with the UCI column names and realistic value ranges."""
+    rng = np.random.default_rng(seed)
+    age_group = rng.integers(1, 6, n)
+    return pd.DataFrame({
+        "Call  Failure": rng.integers(0, 37, n),
+        "Complains": (rng.random(n) < 0.08).astype(np.int64),
+        "Subscription  Length": rng.integers(3, 48, n),
+        "Charge  Amount": rng.integers(0, 10, n),
+        "Seconds of Use": rng.gamma(1.5, 3000, n).astype(np.int64),
+        "Frequency of use": rng.integers(0, 256, n),
+        "Frequency of SMS": rng.integers(0, 523, n),
+        "Distinct Called Numbers": rng.integers(0, 98, n),
+        "Age Group": age_group,
+        "Tariff Plan": rng.integers(1, 3, n),
+        "Status": rng.integers(1, 3, n),
+        "Age": 15 + 10 * age_group + rng.integers(0, 10, n),
+        "Customer Value": np.round(rng.gamma(1.2, 400, n), 2),
+    })[RAW_COLUMNS]
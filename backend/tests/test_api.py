@@ -54,6 +54,7 @@ class TestRootEndpoints:
         assert data["status"] == "ok"
         assert "model_name" in data
         assert "model_version" in data
+        assert data["worker"]["pid"] > 0
 
 class TestPredictionEndpoint:
     def test_valid_prediction(self, client):
@@ -64,6 +65,14 @@ class TestPredictionEndpoint:
         assert "risk_level" in data
         assert 0.0 <= data["churn_probability"] <= 1.0
 
+    def test_label_uses_optimal_threshold(self, client):
+        from backend.main import get_decision_threshold
+        response = client.post("/predict", json=high_risk_customer)
+        assert response.status_code == 200
+        data = response.json()
+        expected = int(data["churn_probability"] >= get_decision_threshold())
+        assert data["churn_prediction"] == expected
+
     def test_invalid_age(self, client):
         invalid_data = valid_customer.copy()
         invalid_data["Age"] = 150  # Max is 120
@@ -85,6 +94,39 @@ class TestBatchPrediction:
         assert data["total_customers"] == 2
         assert len(data["predictions"]) == 2
 
+    def test_batch_explanations_opt_in(self, client):
+        batch_data = {"customers": [valid_customer, high_risk_customer]}
+        plain = client.post("/predict/batch", json=batch_data).json()
+        assert all(p["top_risk_factors"] == [] for p in plain["predictions"])
+        
+        explained = client.post("/predict/batch", json=dict(batch_data, explain=True, top_k=5)).json()
+        single = client.post("/predict", json=high_risk_customer).json()
+        for p in explained["predictions"]:
+            impacts = [abs(f["impact"]) for f in p["top_risk_factors"]]
+            assert len(impacts) == 5
+            assert impacts == sorted(impacts, reverse=True)
+        assert explained["predictions"][1]["top_risk_factors"][:3] == single["top_risk_factors"]
+
+    def test_fast_encoding_matches_pydantic(self, client):
+        import json
+        import numpy as np
+        from backend.main import build_prediction_responses
+        from backend.models import BatchPredictionResponse
+        from backend.serialization import encode_batch_response
+
+        probabilities = np.array([0.0, 0.12345678901, 0.4, 0.69999999, 0.7, 0.93, 1.0])
+        predictions = (probabilities >= 0.5).astype(np.int64)
+        factors = [[{"feature": "Complains", "impact": 0.25, "value": 1.0}]] * len(probabilities)
+        for risk_factors in (None, factors):
+            rows, high_risk_count = build_prediction_responses(probabilities, predictions, risk_factors)
+            expected = BatchPredictionResponse(
+                predictions=rows, total_customers=len(rows),
+                high_risk_count=high_risk_count, processing_time_ms=1.5
+            ).model_dump(mode="json")
+            fast = encode_batch_response(probabilities, predictions, risk_factors, 1.5)
+            assert json.loads(fast) == expected
+            assert list(json.loads(fast)["predictions"][0]) == list(expected["predictions"][0])
+
     def test_empty_batch(self, client):
         response = client.post("/predict/batch", json={"customers": []})
         assert response.status_code == 422
@@ -115,6 +157,216 @@ class TestBatchPrediction:
         assert len(data["predictions"]) == 2
         assert "processing_time_ms" in data
 
+class TestColumnarBatch:
+    def _columns(self, rows):
+        return {field: [row[field] for row in rows] for field in valid_customer}
+
+    def test_matches_row_batch(self, client):
+        rows = [valid_customer, high_risk_customer, valid_customer]
+        batch = client.post("/predict/batch", json={"customers": rows}).json()
+        response = client.post("/predict/batch/columnar", json=self._columns(rows))
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_customers"] == 3
+        assert data["high_risk_count"] == batch["high_risk_count"]
+        for i, expected in enumerate(batch["predictions"]):
+            assert data["churn_probability"][i] == pytest.approx(expected["churn_probability"])
+            assert data["churn_prediction"][i] == expected["churn_prediction"]
+            assert data["risk_levels"][data["risk_code"][i]] == expected["risk_level"]
+
+    def test_large_batch(self, client):
+        response = client.post("/predict/batch/columnar", json=self._columns([valid_customer] * 20000))
+        assert response.status_code == 200
+        assert len(response.json()["churn_probability"]) == 20000
+
+    def test_stacking_and_encoding_run_off_the_event_loop(self, client, monkeypatch):
+        import threading
+        import backend.main as main
+        from backend.models import ColumnarBatchResponse
+        threads = []
+        for name in ("score_columnar", "encode_columnar_response"):
+            def record(*args, _fn=getattr(main, name)):
+                threads.append(threading.current_thread())
+                return _fn(*args)
+            monkeypatch.setattr(main, name, record)
+        response = client.post("/predict/batch/columnar", json=self._columns([valid_customer, high_risk_customer]))
+        assert response.status_code == 200
+        assert len(threads) == 2
+        assert all(t.name.startswith("inference") for t in threads)
+        ColumnarBatchResponse.model_validate_json(response.content)
+
+    def test_vectorized_range_checks(self, client):
+        rows = [valid_customer, dict(valid_customer, Age=150), dict(valid_customer, Tariff_Plan=1.5)]
+        response = client.post("/predict/batch/columnar", json=self._columns(rows))
+        assert response.status_code == 422
+        errors = {(e["loc"][1], e["type"]): e for e in response.json()["detail"]}
+        assert errors[("Age", "above_max")]["loc"][2] == 1
+        assert errors[("Tariff_Plan", "not_integer")]["loc"][2] == 2
+
+    def test_ragged_columns_rejected(self, client):
+        columns = self._columns([valid_customer, valid_customer])
+        columns["Age"] = [30]
+        assert client.post("/predict/batch/columnar", json=columns).status_code == 422
+
+class TestArrowBatch:
+    def _post(self, client, table, fmt="arrow", query=""):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        sink = pa.BufferOutputStream()
+        if fmt == "parquet":
+            pq.write_table(table, sink)
+            content_type = "application/vnd.apache.parquet"
+        else:
+            with pa.ipc.new_stream(sink, table.schema) as writer:
+                writer.write_table(table)
+            content_type = "application/vnd.apache.arrow.stream"
+        return client.post(f"/predict/batch/arrow{query}", content=sink.getvalue().to_pybytes(),
+                           headers={"content-type": content_type})
+
+    def test_parquet_in_arrow_out_matches_batch(self, client):
+        import pyarrow as pa
+        from backend.feature_plan import COLUMN_MAPPING
+        rows = [valid_customer, high_risk_customer]
+        batch = client.post("/predict/batch", json={"customers": rows}).json()["predictions"]
+        # Dataset column names are accepted as well as API field names
+        table = pa.Table.from_pylist([{COLUMN_MAPPING[k]: v for k, v in row.items()} for row in rows])
+        response = self._post(client, table, "parquet", "?format=arrow")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/vnd.apache.arrow.stream"
+        result = pa.ipc.open_stream(response.content).read_all().to_pylist()
+        for row, expected in zip(result, batch):
+            assert row["churn_probability"] == pytest.approx(expected["churn_probability"])
+            assert row["churn_prediction"] == expected["churn_prediction"]
+            assert row["risk_level"] == expected["risk_level"]
+
+    def test_arrow_in_parquet_out_with_ids(self, client):
+        import io
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        table = pa.Table.from_pylist([dict(valid_customer, customer_id="a"), dict(valid_customer, customer_id="b")])
+        response = self._post(client, table, "arrow", "?format=parquet&id_column=customer_id")
+        assert response.status_code == 200
+        result = pq.read_table(io.BytesIO(response.content))
+        assert result.column("row_id").to_pylist() == ["a", "b"]
+
+    def test_nulls_and_ranges_rejected(self, client):
+        import pyarrow as pa
+        table = pa.Table.from_pylist([valid_customer, dict(valid_customer, Age=None)])
+        response = self._post(client, table)
+        assert response.status_code == 422
+        assert response.json()["detail"][0]["loc"] == ["body", "Age", 1]
+
+    def test_unsupported_content_type(self, client):
+        response = client.post("/predict/batch/arrow", content=b"x", headers={"content-type": "text/csv"})
+        assert response.status_code == 415
+
+class TestStreamingCSV:
+    def _upload(self, rows):
+        import io
+        import pandas as pd
+        csv_buffer = io.BytesIO()
+        pd.DataFrame(rows).to_csv(csv_buffer, index=False)
+        csv_buffer.seek(0)
+        return {"file": ("test.csv", csv_buffer, "text/csv")}
+
+    def test_stream_ndjson_matches_batch(self, client):
+        import json
+        rows = [valid_customer, high_risk_customer, valid_customer]
+        batch = client.post("/predict/batch", json={"customers": rows}).json()["predictions"]
+        
+        response = client.post("/predict/batch/csv/stream?chunk_size=2", files=self._upload(rows))
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [line["row_id"] for line in lines] == [0, 1, 2]
+        for line, expected in zip(lines, batch):
+            assert line["churn_probability"] == pytest.approx(expected["churn_probability"])
+            assert line["churn_prediction"] == expected["churn_prediction"]
+            assert line["risk_level"] == expected["risk_level"]
+
+    def test_stream_csv_with_id_column(self, client):
+        import io
+        import pandas as pd
+        rows = [dict(valid_customer, customer_id="a"), dict(high_risk_customer, customer_id="b")]
+        response = client.post(
+            "/predict/batch/csv/stream?format=csv&chunk_size=1&id_column=customer_id",
+            files=self._upload(rows)
+        )
+        assert response.status_code == 200
+        result = pd.read_csv(io.StringIO(response.text))
+        assert result["row_id"].tolist() == ["a", "b"]
+        assert list(result.columns) == ["row_id", "churn_probability", "churn_prediction", "risk_level"]
+
+    def test_stream_ndjson_missing_ids_are_null(self, client):
+        import json
+
+        def reject(constant):
+            raise ValueError(f"invalid JSON constant {constant}")
+
+        rows = [dict(valid_customer, customer_id=7), dict(high_risk_customer, customer_id=None)]
+        response = client.post("/predict/batch/csv/stream?id_column=customer_id", files=self._upload(rows))
+        assert response.status_code == 200
+        lines = [json.loads(line, parse_constant=reject) for line in response.text.splitlines()]
+        assert [line["row_id"] for line in lines] == [7, None]
+
+    def test_stream_rejects_unknown_format(self, client):
+        response = client.post("/predict/batch/csv/stream?format=xml", files=self._upload([valid_customer]))
+        assert response.status_code == 400
+
+class TestHotReload:
+    def test_install_bundle_swaps_version(self, client):
+        import backend.main as main
+        from backend.model_reload import ModelBundle
+        current = main.active_bundle
+        replacement = ModelBundle(
+            current.model, current.feature_names, current.metadata,
+            source="local", version="hot-v2", explainer=current.explainer
+        )
+        try:
+            main.install_bundle(replacement)
+            assert client.get("/health").json()["model_version"] == "hot-v2"
+            assert client.get("/model/info").json()["model_version"] == "hot-v2"
+            assert client.post("/predict", json=valid_customer).status_code == 200
+            assert main.prediction_cache.model_version == "hot-v2"
+        finally:
+            main.install_bundle(current)
+
+    def test_registry_model_ahead_of_bundle(self, client, monkeypatch):
+        import backend.main as main
+        from backend.model_reload import ModelBundle
+        active = main.active_bundle
+        current = ModelBundle(getattr(active.model, "fallback", None) or active.model, active.feature_names, active.metadata,
+                              source="mlflow", version="7")
+        calls = []
+        monkeypatch.setattr(main, "artifact_bundle_path", "backend/churn_bundle.pkl")
+        monkeypatch.setattr(main, "load_model_from_mlflow", lambda: current)
+        monkeypatch.setattr(main, "load_model_from_bundle", lambda path: calls.append(path))
+        assert main.load_model_bundle() is current
+        assert calls == []
+        # The configured bundle is only the fallback when the registry has no model
+        monkeypatch.setattr(main, "load_model_from_mlflow", lambda: None)
+        main.load_model_bundle()
+        assert calls == ["backend/churn_bundle.pkl"]
+
+    def test_watcher_reloads_on_new_signature(self):
+        import asyncio
+        from backend.model_reload import ModelWatcher
+        installed = []
+        signatures = iter(["v1", "v2"])
+        
+        class FakeBundle:
+            source, version = "local", "v2"
+            
+            def warm_up(self, rows):
+                self.warmed = rows
+        
+        watcher = ModelWatcher(lambda: next(signatures), FakeBundle, installed.append, warmup_rows=8)
+        watcher.signature = "v1"
+        assert asyncio.run(watcher.check()) is False
+        assert asyncio.run(watcher.check()) is True
+        assert installed[0].warmed == 8
+        assert watcher.stats()["reloads"] == 1
+
 class TestModelInfo:
     def test_model_info(self, client):
         response = client.get("/model/info")
@@ -140,6 +392,154 @@ class TestPerformance:
             response = client.post("/predict", json=valid_customer)
             assert response.status_code == 200
 
+class TestMicroBatching:
+    def test_concurrent_predictions_are_batched(self, client):
+        from concurrent.futures import ThreadPoolExecutor
+        # Distinct payloads so the prediction cache doesn't answer them
+        payloads = [dict(high_risk_customer, Customer_Value=1000.0 + i) for i in range(32)]
+        expected = client.post(
+            "/predict/batch", json={"customers": [payloads[1]], "explain": True}
+        ).json()["predictions"][0]
+        before = client.get("/monitoring").json()["batching"]
+        
+        import backend.main as main
+        batcher = main.micro_batcher
+        max_wait_ms, batcher.max_wait_ms = batcher.max_wait_ms, 50.0  # wide window: coalescing must not hinge on thread timing
+        try:
+            with ThreadPoolExecutor(max_workers=16) as pool:
+                responses = list(pool.map(lambda p: client.post("/predict", json=p), payloads))
+        finally:
+            batcher.max_wait_ms = max_wait_ms
+        
+        assert all(r.status_code == 200 for r in responses)
+        assert responses[1].json() == expected
+        after = client.get("/monitoring").json()["batching"]
+        assert after["rows"] - before["rows"] == len(payloads)
+        # Requests were actually coalesced, not run one per batch
+        assert after["batches"] - before["batches"] < len(payloads)
+        assert after["queue_depth"] == 0
+
+class TestBackpressure:
+    def test_saturated_executor_returns_429(self, client):
+        import backend.main as main
+        executor = main.inference_executor
+        executor.in_flight += executor.capacity
+        try:
+            response = client.post("/predict", json=dict(valid_customer, Customer_Value=4242.0))
+            assert response.status_code == 429
+            assert "Retry-After" in response.headers
+            # The event loop itself stays free for health checks
+            assert client.get("/health").status_code == 200
+        finally:
+            executor.in_flight -= executor.capacity
+
+    def test_cancelled_caller_keeps_slot_until_job_finishes(self):
+        import asyncio
+        import threading
+        from backend.executor import ExecutorSaturated, InferenceExecutor
+
+        async def scenario():
+            executor = InferenceExecutor(max_workers=1, max_queue_size=0)
+            release = threading.Event()
+            request = asyncio.create_task(executor.run(release.wait))
+            await asyncio.sleep(0.05)
+            request.cancel()  # client disconnect; the job keeps running on the pool
+            await asyncio.sleep(0.05)
+            assert executor.in_flight == 1
+            with pytest.raises(ExecutorSaturated):
+                await executor.run(lambda: None)
+            assert not await executor.wait_for_capacity(0.05)
+
+            release.set()
+            assert await executor.wait_for_capacity(1.0)
+            assert executor.in_flight == 0
+            await asyncio.to_thread(executor.shutdown)
+
+        asyncio.run(scenario())
+
+class TestPredictionCache:
+    def test_repeated_prediction_hits_cache(self, client):
+        payload = dict(valid_customer, Customer_Value=123.45)
+        first = client.post("/predict", json=payload).json()
+        before = client.get("/monitoring").json()["cache"]
+        
+        # Same customer with an int sent as float is the same feature vector
+        second = client.post("/predict", json=dict(payload, Age=30.0)).json()
+        after = client.get("/monitoring").json()["cache"]
+        
+        assert second == first
+        assert after["hits"] == before["hits"] + 1
+        assert after["misses"] == before["misses"]
+
+    def test_model_change_invalidates(self, client):
+        import backend.main as main
+        cache = main.prediction_cache
+        client.post("/predict", json=valid_customer)
+        assert cache.size() > 0
+        version = cache.model_version
+        try:
+            cache.set_model_version("next-version")
+            assert cache.size() == 0
+        finally:
+            cache.set_model_version(version)
+
+class TestDriftMonitoring:
+    def test_scored_rows_feed_drift_window(self, client):
+        from backend import main
+        from backend.drift import build_reference_sketches
+        from backend.models import CustomerData
+        
+        customers = [CustomerData(**{**valid_customer, "Customer_Value": 100.0 + i}) for i in range(50)]
+        import pandas as pd
+        bundle = main.active_bundle
+        features = pd.DataFrame(bundle.feature_plan.transform(customers), columns=bundle.feature_names)
+        reference = build_reference_sketches(features)
+        monitor = main.get_monitoring_service()
+        monitor.set_reference(reference)
+        
+        response = client.post("/predict/batch", json={"customers": [valid_customer] * 10})
+        assert response.status_code == 200
+        drift = client.get("/monitoring").json()["drift_status"]
+        assert drift["window_rows"] == 10
+        assert drift["status"] == "insufficient_data"
+        monitor.set_reference(main.model_metadata.get("reference_sketches"))
+
+class TestDataQuality:
+    def test_csv_violations_reported(self, client):
+        import io
+        import pandas as pd
+        from backend import main
+        
+        quality = main.get_monitoring_service().data_quality
+        quality.process_pending()
+        before = quality.stats()["violations"].get("Age", {}).get("above_max", 0)
+        
+        csv_buffer = io.BytesIO()
+        pd.DataFrame([dict(valid_customer, Age=150), valid_customer]).to_csv(csv_buffer, index=False)
+        csv_buffer.seek(0)
+        response = client.post("/predict/batch/csv", files={"file": ("test.csv", csv_buffer, "text/csv")})
+        assert response.status_code == 200
+        
+        quality.process_pending()
+        data_quality = client.get("/monitoring").json()["data_quality"]
+        assert data_quality["status"] == "warning"
+        assert data_quality["violations"]["Age"]["above_max"] == before + 1
+
+class TestMetrics:
+    def test_stage_histograms_exposed(self, client):
+        client.post("/predict", json=dict(valid_customer, Customer_Value=321.0))
+        client.post("/predict/batch", json={"customers": [valid_customer] * 3})
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        body = response.text
+        for stage in ("validation", "preprocess", "predict", "explain", "serialize"):
+            assert f'stage="{stage}"' in body
+        assert 'churn_request_latency_seconds_count{endpoint="/predict/batch",method="POST",status="200"}' in body
+        assert 'churn_batch_size_rows_count{path="batch"}' in body
+        assert "churn_executor_in_flight" in body
+        assert "churn_model_info{" in body
+
 class TestDataValidation:
     def test_complains_validation(self, client):
         invalid_data = valid_customer.copy()
@@ -0,0 +1,74 @@
+import mmap
+import pickle
+
+import numpy as np
+import pytest
+import shap
+
+from backend.artifact_bundle import export_bundle, load_bundle
+from backend.explainability import ExplainerService
+from backend.tests.test_tree_engine import synthetic_data
+
+
+@pytest.fixture(scope="module")
+def trained():
+    import lightgbm as lgb
+    X, y = synthetic_data(1000)
+    model = lgb.LGBMClassifier(n_estimators=30, verbosity=-1).fit(X, y)
+    return model, X, shap.TreeExplainer(model)
+
+
+def test_mapped_bundle_round_trip(tmp_path, trained):
+    model, X, explainer = trained
+    path = str(tmp_path / "bundle.pkl")
+    export_bundle(model, X.columns, {"optimal_threshold": 0.35, "run_id": "abc"}, explainer, path)
+
+    payload = load_bundle(path)
+    assert payload["threshold"] == 0.35
+    assert payload["feature_names"] == X.columns.tolist()
+    np.testing.assert_array_equal(payload["model"].predict_proba(X), model.predict_proba(X))
+
+    loaded = payload["shap_explainer"]()
+    # Tree arrays are read-only views into the shared mapping, not private copies
+    thresholds = loaded.model.thresholds
+    assert not thresholds.flags.writeable
+    base = thresholds
+    while isinstance(base, np.ndarray):
+        base = base.base
+    assert isinstance(base.obj, mmap.mmap)
+
+    service = ExplainerService(payload=payload["shap_explainer"], lazy=True)
+    assert not service.loaded
+    reference = ExplainerService(payload=pickle.dumps(explainer))
+    np.testing.assert_array_equal(service._positive_class_shap(X[:20]), reference._positive_class_shap(X[:20]))
+
+
+def test_bundle_tree_arrays_are_mapped(tmp_path, trained):
+    from backend.model_reload import ModelBundle
+
+    model, X, _ = trained
+    path = str(tmp_path / "bundle.pkl")
+    export_bundle(model, X.columns, None, None, path)
+    payload = load_bundle(path)
+
+    bundle = ModelBundle(payload["model"], payload["feature_names"], None, "bundle", "v",
+                         tree_model=payload["tree_model"])
+    bundle.use_scorer("array", array_max_rows=64)
+    engine = bundle.model
+    for array in (engine.feature, engine.threshold, engine.children, engine.leaf_value, engine.cat_table):
+        base = array
+        while isinstance(base, np.ndarray):
+            base = base.base
+        assert isinstance(base.obj, mmap.mmap)
+    assert engine.booster_ is payload["model"].booster_ and engine.max_rows == 64
+    np.testing.assert_array_equal(engine.predict_proba(X[:64]), model.predict_proba(X[:64]))
+    np.testing.assert_array_equal(engine.predict_proba(X), model.predict_proba(X))
+
+
+def test_bundle_without_explainer(tmp_path, trained):
+    model, X, _ = trained
+    path = str(tmp_path / "bundle.pkl")
+    export_bundle(model, X.columns, None, None, path)
+    payload = load_bundle(path)
+    assert payload["shap_explainer"] is None
+    assert payload["threshold"] == 0.5
@@ -0,0 +1,34 @@
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.main import app
+from backend.tests.test_api import valid_customer, high_risk_customer
+from batch_score import score_file
+
+
+@pytest.fixture(scope="module")
+def api_predictions():
+    rows = [valid_customer, high_risk_customer] * 3
+    with TestClient(app) as client:
+        return client.post("/predict/batch", json={"customers": rows}).json()["predictions"]
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".csv"])
+def test_scores_match_api(tmp_path, api_predictions, suffix):
+    df = pd.DataFrame([valid_customer, high_risk_customer] * 3)
+    input_path = str(tmp_path / f"customers{suffix}")
+    output_path = str(tmp_path / "scores.parquet")
+    if suffix == ".parquet":
+        df.to_parquet(input_path, row_group_size=2)
+    else:
+        df.to_csv(input_path, index=False)
+
+    stats = score_file(input_path, output_path, workers=2, chunk_size=2)
+
+    assert stats["rows"] == len(df)
+    result = pd.read_parquet(output_path)
+    assert result["row_id"].tolist() == list(range(len(df)))
+    assert result["churn_probability"].tolist() == pytest.approx([p["churn_probability"] for p in api_predictions])
+    assert result["churn_prediction"].tolist() == [p["churn_prediction"] for p in api_predictions]
+    assert result["risk_level"].tolist() == [p["risk_level"] for p in api_predictions]
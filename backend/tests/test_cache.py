@@ -0,0 +1,66 @@
+import time
+
+from backend.cache import MemoryPredictionCache, SQLitePredictionCache, cache_key
+from backend.models import CustomerData, PredictionResponse
+from backend.tests.test_api import valid_customer
+
+response = PredictionResponse(churn_prediction=0, churn_probability=0.1, risk_level="Low", confidence=0.9)
+
+
+def test_key_depends_on_model_version():
+    customer = CustomerData(**valid_customer)
+    assert cache_key(customer, "1") == cache_key(CustomerData(**valid_customer), "1")
+    assert cache_key(customer, "1") != cache_key(customer, "2")
+
+
+def test_memory_lru_eviction_and_ttl():
+    cache = MemoryPredictionCache(max_entries=2, ttl_seconds=0.05)
+    cache.set("a", response)
+    cache.set("b", response)
+    assert cache.get("a") is response
+    cache.set("c", response)  # evicts "b", the least recently used
+    assert cache.get("b") is None
+    assert cache.evictions == 1
+    time.sleep(0.06)
+    assert cache.get("a") is None
+    assert cache.expirations == 1
+
+
+def test_sqlite_cache_is_shared(tmp_path):
+    path = str(tmp_path / "cache.db")
+    worker_1 = SQLitePredictionCache(path)
+    worker_2 = SQLitePredictionCache(path)
+    worker_1.set_model_version("1")
+    worker_2.set_model_version("1")
+
+    worker_1.set("a", response)
+    assert worker_2.get("a") == response
+
+    worker_2.set_model_version("2")
+    assert worker_1.get("a") is None
+
+
+def test_sqlite_hits_dont_write_and_lock_errors_are_skipped(tmp_path):
+    import sqlite3
+
+    path = str(tmp_path / "cache.db")
+    cache = SQLitePredictionCache(path)
+    cache._conn.execute("PRAGMA busy_timeout = 10")
+    cache.set_model_version("1")
+    cache.set("a", response)
+    inserted_at = cache._conn.execute("SELECT last_access FROM predictions").fetchone()[0]
+
+    # Another worker holds the write lock: hits still read, inserts are skipped
+    other = sqlite3.connect(path, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")
+    assert cache.get("a") == response
+    cache.set("b", response)
+    assert cache.errors == 1
+    other.execute("ROLLBACK")
+
+    assert cache.get("b") is None
+    cache.set("b", response)
+    assert cache.get("b") == response
+    # The hit on "a" is written with the next successful insert
+    accessed = cache._conn.execute("SELECT last_access FROM predictions WHERE key = 'a'").fetchone()[0]
+    assert accessed > inserted_at
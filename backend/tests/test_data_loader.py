@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.src.data_loader import DatasetStore, load_data
+
+
+@pytest.fixture
+def dataset():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame({"Call  Failure": rng.integers(0, 37, 50), "Customer Value": rng.gamma(1.2, 400, 50)})
+    return X, pd.Series(rng.integers(0, 2, 50), name="Churn")
+
+
+def test_snapshot_round_trip(tmp_path, dataset):
+    X, y = dataset
+    store = DatasetStore(563, str(tmp_path))
+    info = store.save(X, y)
+
+    loaded_X, loaded_y = load_data(563, snapshot_dir=str(tmp_path))
+    pd.testing.assert_frame_equal(loaded_X, X)
+    pd.testing.assert_series_equal(loaded_y, y)
+
+    # Same content -> same version, no second file
+    assert store.save(X.copy(), y.copy())["version"] == info["version"]
+    assert len(store.manifest()["snapshots"]) == 1
+
+    newer = store.save(X.iloc[:40], y.iloc[:40])
+    assert store.info()["version"] == newer["version"]
+    assert len(store.load(info["version"])[0]) == 50
+
+
+def test_corrupt_and_missing_snapshots(tmp_path, dataset):
+    X, y = dataset
+    with pytest.raises(FileNotFoundError, match="fetch it first"):
+        load_data(563, snapshot_dir=str(tmp_path))
+
+    store = DatasetStore(563, str(tmp_path))
+    info = store.save(X, y)
+    with open(tmp_path / "uci-563" / info["file"], "ab") as f:
+        f.write(b"tampered")
+    with pytest.raises(ValueError, match="Checksum mismatch"):
+        store.load()
@@ -0,0 +1,41 @@
+import numpy as np
+
+from backend.data_quality import DataQualityMonitor, QualityRules
+from backend.feature_plan import RAW_COLUMNS, raw_row
+from backend.models import CustomerData
+from backend.tests.test_api import valid_customer
+
+GOOD_ROW = raw_row(CustomerData(**valid_customer))[0]
+
+
+def test_rules_count_each_violation_once():
+    block = np.tile(GOOD_ROW, (4, 1))
+    age, status, charge = (RAW_COLUMNS.index(c) for c in ("Age", "Status", "Charge  Amount"))
+    block[0, age] = np.nan
+    block[1, age] = 150
+    block[2, status] = 1.5
+    block[2, charge] = -1
+    violations, rows_with_issues = QualityRules().check(block)
+    assert violations["missing"][age] == 1
+    assert violations["above_max"][age] == 1
+    assert violations["not_integer"][status] == 1
+    assert violations["below_min"][charge] == 1
+    assert rows_with_issues == 3
+
+
+def test_ring_buffer_wraps_and_drops_oldest():
+    monitor = DataQualityMonitor(buffer_rows=8)
+    monitor.enqueue(np.tile(GOOD_ROW, (5, 1)))
+    assert monitor.process_pending() == 5
+    # Wraps around the end of the buffer, then overflows it by 2 rows
+    monitor.enqueue(np.tile(GOOD_ROW, (6, 1)))
+    bad = GOOD_ROW.copy()
+    bad[RAW_COLUMNS.index("Age")] = 150
+    monitor.enqueue(np.tile(bad, (4, 1)))
+    assert monitor.dropped_rows == 2
+    assert monitor.process_pending() == 8
+    stats = monitor.stats()
+    assert stats["rows_checked"] == 13
+    assert stats["rows_with_issues"] == 4
+    assert stats["violations"]["Age"]["above_max"] == 4
+    assert stats["status"] == "warning"
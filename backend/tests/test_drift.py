@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+from backend.drift import RollingSketch, build_reference_sketches
+
+
+def make_frame(n, shift=0.0, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "Seconds of Use": rng.gamma(2.0, 2000.0, n) * (1 + shift),
+        "Complains": rng.binomial(1, 0.08 + shift / 2, n),
+        "Age": rng.integers(15, 60, n) + 10 * shift
+    })
+
+
+def test_reference_sketch_bins():
+    reference = build_reference_sketches(make_frame(5000), n_bins=10)
+    assert reference["n_rows"] == 5000
+    assert len(reference["features"]["Seconds of Use"]["counts"]) == 10
+    # Binary feature collapses to its distinct values
+    assert len(reference["features"]["Complains"]["counts"]) <= 3
+    assert all(sum(f["counts"]) == 5000 for f in reference["features"].values())
+
+
+def test_no_drift_on_same_distribution():
+    sketch = RollingSketch(build_reference_sketches(make_frame(20000)))
+    for seed in range(1, 5):
+        sketch.update(make_frame(1000, seed=seed))
+    report = sketch.compare(min_rows=500)
+    assert report["status"] == "ok"
+    assert report["window_rows"] == 4000
+    assert all(f["psi"] < 0.05 for f in report["features"].values())
+
+
+def test_shifted_traffic_is_flagged():
+    sketch = RollingSketch(build_reference_sketches(make_frame(20000)))
+    sketch.update(make_frame(2000, shift=0.5, seed=1).to_numpy())
+    report = sketch.compare(min_rows=500)
+    assert report["drift_detected"]
+    assert "Seconds of Use" in report["drifted_features"]
+    assert report["features"]["Seconds of Use"]["ks"] > report["ks_critical"]
+
+
+def test_missing_values_are_not_drift():
+    reference = make_frame(20000)
+    reference.loc[::10, "Age"] = np.nan
+    sketch = RollingSketch(build_reference_sketches(reference))
+    live = make_frame(4000, seed=1)
+    live.loc[::3, "Age"] = np.nan  # e.g. Age_Bin outside the binned range
+    sketch.update(live)
+    report = sketch.compare(min_rows=500)
+    assert report["features"]["Age"]["psi"] < 0.05
+    assert report["status"] == "ok"
+
+
+def test_window_memory_is_bounded():
+    sketch = RollingSketch(build_reference_sketches(make_frame(5000)), window_buckets=3, bucket_rows=100)
+    for seed in range(20):
+        sketch.update(make_frame(100, seed=seed))
+    _, window_rows = sketch.window()
+    assert window_rows == 300
+    assert sketch.rows_seen == 2000
+    assert sketch.compare(min_rows=1000)["status"] == "insufficient_data"
+
+
+def test_large_batch_spreads_over_buckets():
+    sketch = RollingSketch(build_reference_sketches(make_frame(5000)), window_buckets=4, bucket_rows=100)
+    sketch.update(make_frame(150, seed=1))
+    sketch.update(make_frame(1000, shift=0.5, seed=2))
+    # Filled bucket by bucket, never past bucket_rows; the window holds only its newest rows
+    assert sketch._rows.tolist() == [100, 50, 100, 100]
+    assert sketch.rows_seen == 1150
+    assert sketch.compare(min_rows=300)["drift_detected"]
+
+    # The same amount of normal traffic fully replaces it
+    sketch.update(make_frame(1000, seed=3))
+    assert sketch.window()[1] == 350
+    assert sketch.compare(min_rows=300)["status"] == "ok"
@@ -0,0 +1,93 @@
+import pickle
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+import shap
+
+from backend.artifact_bundle import BoosterModel
+from backend.explainability import ExplainerService, NativeExplainerService
+from backend.tests.test_tree_engine import synthetic_data
+
+
+@pytest.fixture(scope="module")
+def trained():
+    import lightgbm as lgb
+    X, y = synthetic_data(2000)
+    model = lgb.LGBMClassifier(n_estimators=80, num_leaves=31, verbosity=-1).fit(X, y)
+    return model, X.fillna(0.5)
+
+
+class TestNativeExplainer:
+    def test_matches_shap_tree_explainer(self, trained):
+        model, X = trained
+        native = NativeExplainerService(model.booster_)
+        reference = ExplainerService(payload=pickle.dumps(shap.TreeExplainer(model)))
+
+        np.testing.assert_allclose(
+            native._positive_class_shap(X), reference._positive_class_shap(X), rtol=1e-9, atol=1e-12
+        )
+        names = X.columns.tolist()
+        expected = reference.get_batch_explanations(X[:50], top_k=3, feature_names=names)
+        actual = native.get_batch_explanations(X[:50], top_k=3, feature_names=names)
+        for got, want in zip(actual, expected):
+            assert [f["feature"] for f in got] == [f["feature"] for f in want]
+            assert [f["impact"] for f in got] == pytest.approx([f["impact"] for f in want])
+
+    def test_score_and_explain_one_pass(self, trained):
+        model, X = trained
+        native = NativeExplainerService(model.booster_)
+        probabilities, factors = native.score_and_explain(X.to_numpy(np.float32), top_k=2, feature_names=list(X.columns))
+        np.testing.assert_allclose(probabilities, model.predict_proba(X)[:, 1], rtol=0, atol=1e-12)
+        assert len(factors) == len(X)
+        assert all(len(row) == 2 and set(row[0]) == {"feature", "impact"} for row in factors)
+
+    def test_predict_and_batch_agree_at_threshold(self, trained):
+        from backend.main import score, score_explained
+        from backend.model_reload import ModelBundle
+
+        model, X = trained
+        bundle = ModelBundle(model, list(X.columns), {"optimal_threshold": 0.3}, source="test", version="t")
+        bundle.use_explainer("native")
+        bundle.use_scorer("array")
+        features = X.to_numpy(np.float32)
+        expected, expected_predictions = score(features, bundle)
+        # /predict scores and explains in one contribution pass; /predict/batch walks the trees
+        probabilities, predictions, _ = score_explained(features, bundle, top_k=2)
+        np.testing.assert_allclose(probabilities, expected, rtol=0, atol=1e-12)
+        assert np.abs(expected - 0.3).min() > 1e-12
+        np.testing.assert_array_equal(predictions, expected_predictions)
+
+    def test_sigmoid_from_bundle_and_params(self, trained, tmp_path):
+        import lightgbm as lgb
+        from backend.artifact_bundle import export_bundle, load_bundle
+        from backend.model_reload import ModelBundle
+
+        _, X = trained
+        y = (X.iloc[:, 0] > X.iloc[:, 0].median()).astype(int)
+        booster = lgb.train({"objective": "binary", "sigmoid": 2.0, "verbosity": -1}, lgb.Dataset(X, y), 10)
+        path = str(tmp_path / "bundle.pkl")
+        export_bundle(booster, X.columns, None, None, path)
+        payload = load_bundle(path)
+        # Booster(model_str=...) keeps no params; the bundle's tree arrays carry the sigmoid
+        from_bundle = ModelBundle(payload["model"], list(X.columns), None, "bundle", "b", tree_model=payload["tree_model"])
+        from_params = ModelBundle(BoosterModel(booster), list(X.columns), None, "local", "l")
+        for bundle in (from_bundle, from_params):
+            bundle.use_explainer("native")
+            assert bundle.explainer.sigmoid == 2.0
+            probabilities, _ = bundle.explainer.score_and_explain(X[:50], feature_names=list(X.columns))
+            np.testing.assert_allclose(probabilities, booster.predict(X[:50]), rtol=0, atol=1e-12)
+
+    def test_native_path_never_imports_shap(self, trained, tmp_path):
+        model, X = trained
+        model_path = tmp_path / "model.txt"
+        model.booster_.save_model(str(model_path))
+        script = (
+            "import sys, numpy as np, lightgbm as lgb\n"
+            "from backend.explainability import NativeExplainerService\n"
+            f"service = NativeExplainerService(lgb.Booster(model_file={str(model_path)!r}))\n"
+            "service.score_and_explain(np.zeros((2, 4)), feature_names=list('abcd'))\n"
+            "assert 'shap' not in sys.modules\n"
+        )
+        subprocess.run([sys.executable, "-c", script], check=True)
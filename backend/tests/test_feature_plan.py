@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from backend.feature_plan import COLUMN_MAPPING, FeaturePlan
+from backend.models import CustomerData
+from training.feature_engineering import preprocess_data
+
+
+@pytest.fixture(scope="module")
+def uci_features(tmp_path_factory):
+    from backend.src.data_loader import load_data
+    try:
+        X, _ = load_data(563)
+    except FileNotFoundError:
+        # No local snapshot: fetch into a temporary store, never into the working tree
+        try:
+            X, _ = load_data(563, snapshot_dir=str(tmp_path_factory.mktemp("snapshots")), fetch=True)
+        except Exception as e:
+            pytest.skip(f"UCI dataset unavailable: no local snapshot and the fetch failed ({e})")
+    return X
+
+
+@pytest.fixture(scope="module")
+def expected(uci_features):
+    processed = preprocess_data(uci_features)
+    return processed.columns.tolist(), processed.astype(np.float32).to_numpy()
+
+
+def to_customers(X):
+    reverse = {v: k for k, v in COLUMN_MAPPING.items()}
+    records = X.rename(columns=reverse).to_dict(orient="records")
+    return [CustomerData(**r) for r in records]
+
+
+class TestFeaturePlanParity:
+    def test_matches_preprocess_data(self, uci_features, expected):
+        names, matrix = expected
+        plan = FeaturePlan(names)
+        result = plan.transform(to_customers(uci_features))
+        assert result.dtype == np.float32
+        assert result.shape == matrix.shape
+        np.testing.assert_allclose(result, matrix, rtol=1e-6)
+
+    def test_single_row(self, uci_features, expected):
+        names, matrix = expected
+        plan = FeaturePlan(names)
+        customer = to_customers(uci_features.iloc[[0]])[0]
+        np.testing.assert_allclose(plan.transform_one(customer), matrix[[0]], rtol=1e-6)
+
+    def test_matches_preprocess_data_synthetic(self):
+        # Runs without the UCI download; covers every Age_Bin edge and the out-of-range ages
+        import pandas as pd
+        rng = np.random.default_rng(0)
+        n = 200
+        raw = pd.DataFrame({col: rng.integers(1, 50, n) for col in COLUMN_MAPPING.values()})
+        raw["Complains"] = rng.integers(0, 2, n)
+        raw["Subscription  Length"] = rng.integers(0, 48, n)
+        raw["Seconds of Use"] = rng.integers(0, 20000, n)
+        raw["Age Group"] = rng.integers(1, 6, n)
+        raw["Tariff Plan"] = rng.integers(1, 3, n)
+        raw["Status"] = rng.integers(1, 3, n)
+        raw["Charge  Amount"] = rng.integers(0, 10, n)
+        raw["Customer Value"] = rng.uniform(0, 2000, n)
+        raw.loc[:11, "Age"] = [0, 1, 18, 19, 30, 31, 45, 46, 60, 61, 100, 120]
+        
+        processed = preprocess_data(raw)
+        plan = FeaturePlan(processed.columns.tolist())
+        result = plan.transform(to_customers(raw))
+        np.testing.assert_allclose(result, processed.astype(np.float32).to_numpy(), rtol=1e-6)
+
+    def test_unknown_feature_zero_filled(self):
+        plan = FeaturePlan(["Age", "Not_A_Feature"])
+        row = plan.transform_raw(np.ones((1, len(COLUMN_MAPPING))))
+        assert row.tolist() == [[1.0, 0.0]]
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.synthetic import synthetic_frame
+from training.feature_engineering import preprocess_data
+from training.out_of_core import Reservoir, hash_split, key_hashes, source_cutoffs, stratified_cutoffs, train_out_of_core
+from training.tuning import build_binned_dataset
+
+
+@pytest.fixture(scope="module")
+def parquet_dir(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("chunks")
+    df = synthetic_frame(3000, seed=4)
+    df["Churn"] = (np.random.default_rng(0).random(len(df)) < 0.15 + 0.4 * (df["Complains"] > 0)).astype(int)
+    for i in range(3):
+        df.iloc[i * 1000:(i + 1) * 1000].to_parquet(directory / f"part-{i}.parquet", index=False)
+    return str(directory), df
+
+
+def test_matches_in_memory_fit(parquet_dir):
+    from train import train_final_model
+
+    source, df = parquet_dir
+    params = {"n_estimators": 30, "num_leaves": 15, "random_state": 1}
+    # Chunks smaller than a file; a bin sample covering every row gives the in-memory bins
+    result = train_out_of_core(source, params, batch_rows=400, bin_sample_rows=10_000, reservoir_rows=500)
+
+    is_test = hash_split(np.arange(len(df), dtype=np.uint64), df["Churn"], 0.2, seed=42)
+    X = preprocess_data(df.drop(columns="Churn"))
+    expected = train_final_model(build_binned_dataset(X[~is_test], df["Churn"][~is_test]), params)
+
+    np.testing.assert_array_equal(result["y_test"], df["Churn"][is_test])
+    np.testing.assert_array_equal(result["test_scores"], expected.predict_proba(X[is_test])[:, 1])
+    assert result["layout"].feature_names == X.columns.tolist()
+    assert result["train_sample"].shape == (500, X.shape[1])
+    assert set(result["peak_rss_mb"]) == {"split", "dataset", "train", "score"}
+
+
+def test_hash_split_is_stable_and_stratified(parquet_dir):
+    keys = np.arange(200_001, dtype=np.uint64)
+    y = (np.random.default_rng(1).random(len(keys)) < 0.1).astype(np.int8)
+    is_test = hash_split(keys, y, 0.2, seed=7)
+    # Exactly the stratified share of every class
+    for label in (0, 1):
+        assert is_test[y == label].sum() == round(0.2 * (y == label).sum())
+    # Chunking doesn't move rows between sides once the cutoffs are ranked over all rows
+    cutoffs = stratified_cutoffs(key_hashes(keys, seed=7), y, 0.2)
+    parts = zip(np.array_split(keys, 7), np.array_split(y, 7))
+    np.testing.assert_array_equal(np.concatenate([hash_split(k, part_y, 0.2, 7, cutoffs) for k, part_y in parts]), is_test)
+    assert not np.array_equal(hash_split(keys, y, 0.2, seed=8), is_test)
+    # String ids work as keys too
+    ids = pd.Series(keys).astype(str).to_numpy()
+    assert hash_split(ids, y, 0.2).sum() == is_test.sum()
+    # The out-of-core split is exact per class across files and chunks
+    source, df = parquet_dir
+    ranked = source_cutoffs(source, "Churn", test_size=0.2, batch_rows=400)
+    np.testing.assert_array_equal(
+        hash_split(np.arange(len(df), dtype=np.uint64), df["Churn"], 0.2, cutoffs=ranked),
+        hash_split(np.arange(len(df), dtype=np.uint64), df["Churn"], 0.2),
+    )
+
+
+def test_reservoir_is_bounded_and_uniform():
+    reservoir = Reservoir(1000, 1, seed=0)
+    for start in range(0, 100_000, 3000):
+        reservoir.add(np.arange(start, min(start + 3000, 100_000), dtype=np.float64)[:, None])
+    sample = reservoir.sample()[:, 0]
+    assert len(sample) == 1000 and len(np.unique(sample)) == 1000
+    assert sample.mean() == pytest.approx(50_000, rel=0.1)
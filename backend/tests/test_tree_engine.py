@@ -0,0 +1,78 @@
+import os
+
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.artifact_bundle import BoosterModel
+from backend.scoring import load_local_artifacts
+from backend.tree_engine import ArrayTreeModel
+
+
+def synthetic_data(n, seed=0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame({
+        "num": rng.normal(0, 1, n),
+        "with_nan": np.where(rng.random(n) < 0.2, np.nan, rng.gamma(2.0, 1.0, n)),
+        "zeros": np.where(rng.random(n) < 0.3, 0.0, rng.normal(0, 2, n)),
+        "cat": rng.integers(0, 12, n).astype(float),
+    })
+    logit = X["num"] + np.nan_to_num(X["with_nan"], nan=3.0) - 2 + (X["cat"] % 3 == 0) * 1.5 - 0.5 * X["zeros"]
+    y = (rng.random(n) < 1 / (1 + np.exp(-logit))).astype(int)
+    return X, y
+
+
+def edge_rows(X):
+    """Rows hitting NaN, zero, negative, unseen and huge categorical values."""
+    rows = X.iloc[:8].to_numpy().copy()
+    rows[0, :] = np.nan
+    rows[1, 2] = 0.0
+    rows[2, 2] = 1e-40
+    rows[3, 3] = -1.0
+    rows[4, 3] = 40.0
+    rows[5, 3] = 3.7
+    rows[6, 3] = 1e12
+    return np.vstack([rows, X.to_numpy()])
+
+
+@pytest.fixture(scope="module", params=[{}, {"zero_as_missing": True}], ids=["nan_missing", "zero_missing"])
+def model(request):
+    X, y = synthetic_data(3000)
+    return lgb.LGBMClassifier(
+        n_estimators=60, num_leaves=31, min_child_samples=5, max_cat_to_onehot=2, verbosity=-1,
+        **request.param
+    ).fit(X, y, categorical_feature=["cat"])
+
+
+class TestArrayTreeModel:
+    def test_bit_exact_parity(self, model):
+        engine = ArrayTreeModel.from_model(model)
+        assert engine.cat_table.shape[0] > 0  # the model has categorical splits to check
+        X = edge_rows(synthetic_data(500, seed=1)[0])
+        for rows in (X[:1], X[:7], X):
+            np.testing.assert_array_equal(engine.predict_proba(rows), model.predict_proba(rows))
+
+    def test_booster_adapter_and_dataframe_input(self, model):
+        engine = ArrayTreeModel.from_model(BoosterModel(model.booster_))
+        X = synthetic_data(200, seed=2)[0]
+        np.testing.assert_array_equal(engine.predict_proba(X), model.predict_proba(X))
+
+    def test_large_batches_fall_back(self, model):
+        engine = ArrayTreeModel.from_model(model, max_rows=4)
+        X = synthetic_data(50, seed=3)[0].to_numpy()
+        np.testing.assert_array_equal(engine.predict_proba(X), model.predict_proba(X))
+        np.testing.assert_array_equal(engine.predict_proba(X[:3]), model.predict_proba(X[:3]))
+
+    def test_served_model_parity(self):
+        artifacts = load_local_artifacts(os.path.join(os.path.dirname(__file__), ".."))
+        if artifacts is None:
+            pytest.skip("No trained model in backend/")
+        from backend.feature_plan import FeaturePlan
+        from backend.synthetic import synthetic_frame
+
+        served = artifacts["model"]
+        features = FeaturePlan(artifacts["feature_names"]).transform_raw(synthetic_frame(2000).to_numpy(np.float64))
+        engine = ArrayTreeModel.from_model(served)
+        np.testing.assert_array_equal(engine.predict_proba(features), served.predict_proba(features))
+        np.testing.assert_array_equal(engine.predict_proba(features[:1]), served.predict_proba(features[:1]))
@@ -0,0 +1,98 @@
+import numpy as np
+import optuna
+import pandas as pd
+import pytest
+from sklearn.datasets import make_classification
+
+from training.tuning import make_folds, optimize_hyperparameters
+
+
+@pytest.fixture(scope="module")
+def data():
+    X, y = make_classification(n_samples=400, n_features=6, weights=[0.8], random_state=0)
+    return pd.DataFrame(X, columns=[f"f{i}" for i in range(6)]), pd.Series(y)
+
+
+def test_study_resumes_and_runs_in_parallel(tmp_path, data):
+    X, y = data
+    storage = f"sqlite:///{tmp_path / 'study.db'}"
+    settings = dict(storage=storage, study_name="test", n_splits=3, early_stopping_rounds=5)
+
+    params = optimize_hyperparameters(X, y, n_trials=2, n_jobs=1, **settings)
+    best = optuna.load_study(study_name="test", storage=storage).best_trial
+    # The final model gets the early-stopped round count, not the sampled upper bound
+    assert params["n_estimators"] == best.user_attrs["best_n_estimators"] <= best.params["n_estimators"]
+
+    # Re-running the study only adds the missing trials, spread over two worker processes
+    optimize_hyperparameters(X, y, n_trials=4, n_jobs=2, **settings)
+    study = optuna.load_study(study_name="test", storage=storage)
+    assert len(study.trials) == 4
+    assert all(t.intermediate_values for t in study.trials)
+
+
+def test_study_rejects_other_data(tmp_path, data):
+    X, y = data
+    settings = dict(storage=f"sqlite:///{tmp_path / 'study.db'}", study_name="test", n_splits=3)
+    optimize_hyperparameters(X, y, n_trials=1, n_jobs=1, **settings)
+    with pytest.raises(ValueError, match="different training data"):
+        optimize_hyperparameters(X.iloc[:300], y.iloc[:300], n_trials=2, n_jobs=1, **settings)
+
+
+def test_final_fit_on_binned_dataset_matches_classifier(data):
+    import lightgbm as lgb
+    from train import train_final_model
+    from training.tuning import build_binned_dataset
+
+    X, y = data
+    params = {"n_estimators": 40, "num_leaves": 15, "min_child_samples": 7, "colsample_bytree": 0.8, "random_state": 1}
+    expected = lgb.LGBMClassifier(verbosity=-1, **params).fit(X, y).predict_proba(X)
+    dataset = build_binned_dataset(X, y)
+    np.testing.assert_array_equal(train_final_model(dataset, params).predict_proba(X), expected)
+
+
+def test_saved_bins_are_reused_and_fit_like_the_classifier(tmp_path, data):
+    import lightgbm as lgb
+    from train import train_final_model
+    from training.tuning import load_binned_dataset, save_binned_dataset
+
+    X, y = data
+    X = X.assign(band=pd.cut(X["f0"], 4, labels=["a", "b", "c", "d"]))
+    path, build_s = save_binned_dataset(X, y, str(tmp_path))
+    assert build_s > 0
+    # Same rows: the file is reused, not re-binned
+    assert save_binned_dataset(X, y, str(tmp_path)) == (path, 0.0)
+    assert save_binned_dataset(X.iloc[:300], y.iloc[:300], str(tmp_path))[0] != path
+
+    loaded = load_binned_dataset(path, X)
+    assert (loaded.num_data(), loaded.num_feature()) == X.shape
+    np.testing.assert_array_equal(loaded.get_label(), y)
+    params = {"n_estimators": 30, "num_leaves": 15, "random_state": 1}
+    expected = lgb.LGBMClassifier(verbosity=-1, **params).fit(X, y).predict_proba(X)
+    np.testing.assert_array_equal(train_final_model(loaded, params).predict_proba(X), expected)
+
+
+def test_local_model_artifact_is_a_plain_booster(tmp_path, data):
+    import joblib
+    import lightgbm as lgb
+    from backend.scoring import load_local_artifacts
+
+    X, y = data
+    booster = lgb.train({"objective": "binary", "verbosity": -1}, lgb.Dataset(X, y), num_boost_round=5)
+    joblib.dump(booster, tmp_path / "churn_model.pkl")
+    joblib.dump(list(X.columns), tmp_path / "feature_names.pkl")
+    joblib.dump({}, tmp_path / "model_metadata.pkl")
+    model = load_local_artifacts(str(tmp_path))["model"]
+    assert model.booster_ is not None
+    np.testing.assert_array_equal(model.predict_proba(X)[:, 1], booster.predict(X))
+
+
+def test_early_stopping_never_sees_validation_rows(data):
+    _, y = data
+    folds = make_folds(y, n_splits=4, seed=0, stopping_fraction=0.2)
+    valid_rows = np.concatenate([valid for _, _, valid in folds])
+    assert sorted(valid_rows) == list(range(len(y)))
+    for fit, stop, valid in folds:
+        assert not set(stop) & set(valid) and not set(fit) & set(valid) and not set(fit) & set(stop)
+        assert len(fit) + len(stop) + len(valid) == len(y)
+        # The stopping slice keeps the class balance
+        assert np.asarray(y)[stop].mean() == pytest.approx(np.asarray(y).mean(), abs=0.05)
@@ -0,0 +1,264 @@
+"""
+Array-backed evaluator for the served LightGBM ensemble.
+
+At load time the booster's text dump is flattened into NumPy arrays (split
+feature, threshold, child and leaf value per node, all trees concatenated),
+and prediction walks every (row, tree) pair one level per step with a few
+vectorized gathers. Small batches skip the sklearn/LightGBM wrapper and
+its per-call thread setup.
+
+Results are bit-identical to `predict_proba`: split decisions follow
+LightGBM's Tree::NumericalDecision / CategoricalDecision, leaf values are
+summed in tree order (cumsum is sequential, unlike sum) and the sigmoid uses
+the C library exp, exactly like the booster.
+
+Select it with `serving.scorer: array` in config.yaml. The serving bundle
+stores the flattened model (backend/artifact_bundle.py), so workers get its
+arrays as views into the shared mapping instead of rebuilding them.
+"""
+import copy
+import json
+import math
+
+import numpy as np
+
+# LightGBM's kZeroThreshold: |x| <= 1e-35f counts as zero (and is read as 0.0)
+ZERO_THRESHOLD = float(np.float32(1e-35))
+CATEGORICAL_MASK = 1
+DEFAULT_LEFT_MASK = 2
+MISSING_NONE, MISSING_ZERO, MISSING_NAN = 0, 1, 2
+# Rows walked at once; bounds the (rows, trees) node matrices for big batches
+CHUNK_ROWS = 2048
+
+
+def _parse_trees(model_str: str):
+    """Header key/values and one dict of arrays per `Tree=` block of a LightGBM text model."""
+    header, trees, current = {}, [], None
+    for line in model_str.splitlines():
+        if line.startswith("Tree="):
+            current = {}
+            trees.append(current)
+        elif line.startswith("end of trees"):
+            current = None
+        elif line.startswith("pandas_categorical:"):
+            header["pandas_categorical"] = json.loads(line.split(":", 1)[1])
+        elif "=" in line:
+            key, _, value = line.partition("=")
+            (current if current is not None else header)[key] = value
+    return header, trees
+
+
+def objective_sigmoid(objective: str) -> float:
+    """Sigmoid scale of a binary objective as written in a model header ("binary sigmoid:1")."""
+    sigmoid = [p.split(":")[1] for p in objective.split() if p.startswith("sigmoid:")]
+    return float(sigmoid[0]) if sigmoid else 1.0
+
+
+def raw_to_proba(raw_scores: np.ndarray, sigmoid: float) -> np.ndarray:
+    """Churn probabilities from raw log-odds, with the C library exp the booster uses."""
+    scale = -sigmoid
+    return np.fromiter((1.0 / (1.0 + math.exp(scale * s)) for s in raw_scores.tolist()), dtype=np.float64)
+
+
+def _values(tree: dict, key: str, dtype):
+    text = tree.get(key, "")
+    return np.array(text.split(), dtype=dtype) if text else np.empty(0, dtype=dtype)
+
+
+class ArrayTreeModel:
+    """predict_proba for a binary LightGBM model from flat node arrays."""
+
+    def __init__(self, model_str: str, booster=None, fallback=None, max_rows: int = None):
+        header, trees = _parse_trees(model_str)
+        if int(header.get("num_class", 1)) != 1 or not header.get("objective", "").startswith("binary"):
+            raise ValueError(f"Only binary models are supported, got objective '{header.get('objective')}'")
+        if any(int(tree.get("is_linear", 0)) for tree in trees):
+            raise ValueError("Linear trees are not supported")
+
+        self.sigmoid = objective_sigmoid(header["objective"])
+        self.booster_ = booster
+        # Past `max_rows` LightGBM's multithreaded predictor wins; `fallback` scores those batches
+        self.fallback = fallback
+        self.max_rows = max_rows if fallback is not None else None
+        self.n_features_in_ = int(header["max_feature_idx"]) + 1
+        self.n_trees = len(trees)
+        self.pandas_categorical = header.get("pandas_categorical")
+        self._build(trees)
+
+    @classmethod
+    def from_model(cls, model, max_rows: int = None):
+        """
+        From an LGBMClassifier or a BoosterModel adapter; with `max_rows`,
+        larger batches are passed on to the original model.
+        """
+        return cls(model.booster_.model_to_string()).bind(model, max_rows)
+
+    def bind(self, model, max_rows: int = None):
+        """A copy sharing this model's arrays, with `model`'s booster and fallback attached."""
+        bound = copy.copy(self)
+        bound.booster_ = model.booster_
+        bound.fallback = model
+        bound.max_rows = max_rows
+        return bound
+
+    def __getstate__(self):
+        # Only the arrays are pickled (out of band in a bundle); bind() reattaches the booster
+        return {k: v for k, v in self.__dict__.items() if k not in ("booster_", "fallback", "max_rows")}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state, booster_=None, fallback=None, max_rows=None)
+
+    def _build(self, trees):
+        """
+        One node table for all trees. Internal nodes come first in each tree's
+        block, then its leaves; a leaf's children point back to itself, so
+        walking every (row, tree) pair for `depth` steps needs no active mask.
+        """
+        feature, threshold, left, right, leaf_value = [], [], [], [], []
+        decision, cat_slot = [], []
+        cat_bitsets = []
+        roots = []
+        offset = 0
+        depth = 0
+        for tree in trees:
+            n_leaves = int(tree["num_leaves"])
+            n_internal = n_leaves - 1
+            leaves = offset + n_internal + np.arange(n_leaves)
+            roots.append(offset if n_internal else leaves[0])
+
+            def resolve(children):
+                # LightGBM encodes leaf j as ~j
+                children = children.astype(np.int64)
+                return np.where(children >= 0, offset + children, offset + n_internal + ~children)
+
+            split_feature = _values(tree, "split_feature", np.int64)
+            tree_threshold = _values(tree, "threshold", np.float64)
+            tree_decision = _values(tree, "decision_type", np.int64)
+            tree_left = resolve(_values(tree, "left_child", np.int64))
+            tree_right = resolve(_values(tree, "right_child", np.int64))
+
+            # Categorical splits store an index into cat_boundaries/cat_threshold as their threshold
+            tree_cat_slot = np.full(n_internal, -1, dtype=np.int64)
+            if int(tree.get("num_cat", 0)):
+                boundaries = _values(tree, "cat_boundaries", np.int64)
+                words = _values(tree, "cat_threshold", np.uint32)
+                for node in np.flatnonzero(tree_decision & CATEGORICAL_MASK):
+                    cat_idx = int(tree_threshold[node])
+                    tree_cat_slot[node] = len(cat_bitsets)
+                    cat_bitsets.append(words[boundaries[cat_idx]:boundaries[cat_idx + 1]])
+
+            feature += [split_feature, np.zeros(n_leaves, dtype=np.int64)]
+            threshold += [tree_threshold, np.zeros(n_leaves)]
+            left += [tree_left, leaves]
+            right += [tree_right, leaves]
+            decision += [tree_decision, np.zeros(n_leaves, dtype=np.int64)]
+            cat_slot += [tree_cat_slot, np.full(n_leaves, -1, dtype=np.int64)]
+            leaf_value += [np.zeros(n_internal), _values(tree, "leaf_value", np.float64)]
+            depth = max(depth, self._tree_depth(tree_left, tree_right, offset, n_internal))
+            offset += n_internal + n_leaves
+
+        self.feature = np.concatenate(feature)
+        self.threshold = np.concatenate(threshold)
+        # children[2 * node + go_right]
+        self.children = np.column_stack([np.concatenate(left), np.concatenate(right)]).ravel()
+        self.leaf_value = np.concatenate(leaf_value)
+        self.roots = np.asarray(roots, dtype=np.int64)
+        self.depth = depth
+
+        decision = np.concatenate(decision)
+        self.cat_slot = np.concatenate(cat_slot)
+        self.missing_type = (decision >> 2) & 3
+        self.default_left = (decision & DEFAULT_LEFT_MASK) > 0
+        # Nodes where a plain `x <= threshold` is not the whole decision
+        self.special = (self.cat_slot >= 0) | (self.missing_type != MISSING_NONE)
+        self.has_special = bool(self.special.any())
+
+        # Categorical bitsets as a dense (slot, category) lookup table
+        width = max((32 * len(bits) for bits in cat_bitsets), default=0)
+        self.cat_table = np.zeros((len(cat_bitsets), width), dtype=bool)
+        for slot, bits in enumerate(cat_bitsets):
+            unpacked = ((bits[:, None] >> np.arange(32, dtype=np.uint32)) & 1).astype(bool).ravel()
+            self.cat_table[slot, :len(unpacked)] = unpacked
+
+    @staticmethod
+    def _tree_depth(left, right, offset, n_internal):
+        depth, level = 0, [offset] if n_internal else []
+        while level:
+            depth += 1
+            level = [c for node in level for c in (left[node - offset], right[node - offset])
+                     if c < offset + n_internal]
+        return depth
+
+    def _as_matrix(self, X) -> np.ndarray:
+        if hasattr(X, "dtypes"):
+            X = X.copy()
+            for i, name in enumerate(c for c in X.columns if str(X[c].dtype) == "category"):
+                # Map pandas categories to the codes used at training time, as LightGBM does
+                categories = self.pandas_categorical[i] if self.pandas_categorical else None
+                column = X[name].cat.set_categories(categories) if categories is not None else X[name]
+                X[name] = column.cat.codes.astype(np.float64).where(column.cat.codes >= 0, np.nan)
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X[None, :]
+        # LightGBM reads |x| <= kZeroThreshold as an exact zero
+        return np.where(np.abs(X) <= ZERO_THRESHOLD, 0.0, X)
+
+    def _special_decision(self, nodes, values):
+        """go_right for categorical and missing-aware splits (Tree::CategoricalDecision / NumericalDecision)."""
+        is_nan = np.isnan(values)
+
+        # Numerical: NaN is read as 0 unless the split learned a NaN direction
+        missing = self.missing_type[nodes]
+        numeric = np.where(is_nan & (missing != MISSING_NAN), 0.0, values)
+        is_missing = (
+            ((missing == MISSING_ZERO) & (numeric > -ZERO_THRESHOLD) & (numeric <= ZERO_THRESHOLD))
+            | ((missing == MISSING_NAN) & is_nan)
+        )
+        go_right = np.where(is_missing, ~self.default_left[nodes], ~(numeric <= self.threshold[nodes]))
+
+        slots = self.cat_slot[nodes]
+        categorical = slots >= 0
+        if categorical.any():
+            cat_values = values[categorical]
+            # static_cast<int> truncates; NaN and negative categories go right
+            valid = ~np.isnan(cat_values) & (cat_values >= 0) & (cat_values < self.cat_table.shape[1])
+            codes = np.where(valid, cat_values, 0).astype(np.int64)
+            in_set = valid & self.cat_table[slots[categorical], codes]
+            go_right[categorical] = ~in_set
+        return go_right
+
+    def leaf_indices(self, X) -> np.ndarray:
+        """(n_rows, n_trees) global node index of the leaf each row reaches in each tree."""
+        X = self._as_matrix(X)
+        n_rows = X.shape[0]
+        flat = X.ravel()
+        row_base = (np.arange(n_rows, dtype=np.int64) * X.shape[1])[:, None]
+        nodes = np.repeat(self.roots[None, :], n_rows, axis=0)
+        # Plain splits read NaN as 0.0; only inputs with NaN need the slow path for them
+        has_nan = bool(np.isnan(flat).any())
+        for _ in range(self.depth):
+            values = flat[row_base + self.feature[nodes]]
+            go_right = ~(values <= self.threshold[nodes])
+            if self.has_special or has_nan:
+                special = self.special[nodes] | np.isnan(values) if has_nan else self.special[nodes]
+                if special.any():
+                    go_right[special] = self._special_decision(nodes[special], values[special])
+            nodes = self.children[2 * nodes + go_right]
+        return nodes
+
+    def raw_score(self, X) -> np.ndarray:
+        X = self._as_matrix(X)
+        scores = np.zeros(X.shape[0])
+        if not self.n_trees:
+            return scores
+        for start in range(0, X.shape[0], CHUNK_ROWS):
+            contributions = self.leaf_value[self.leaf_indices(X[start:start + CHUNK_ROWS])]
+            # Sequential left-to-right sum, the order the booster accumulates trees in
+            scores[start:start + CHUNK_ROWS] = np.cumsum(contributions, axis=1)[:, -1]
+        return scores
+
+    def predict_proba(self, X) -> np.ndarray:
+        if self.max_rows is not None and len(X) > self.max_rows:
+            return self.fallback.predict_proba(X)
+        p = raw_to_proba(self.raw_score(X), self.sigmoid)
+        return np.column_stack([1.0 - p, p])
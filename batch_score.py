@@ -0,0 +1,149 @@
+"""
+Offline bulk scoring for the full subscriber base.
+
+Reads CSV or Parquet in chunks (Parquet: one task per row group), scores them
+on a process pool where every worker loads the model once, and writes
+row_id / churn_probability / churn_prediction / risk_level to Parquet.
+Scores match the API: same artifacts, feature plan and decision threshold.
+
+Usage:
+    python batch_score.py subscribers.parquet scores.parquet --workers 8
+"""
+import argparse
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from backend.feature_plan import COLUMN_MAPPING, build_feature_plan
+from backend.scoring import ARTIFACTS_DIR, load_local_artifacts, decision_threshold, predict_scores, get_risk_levels
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+logger = logging.getLogger("batch_score")
+
+OUTPUT_SCHEMA = pa.schema([
+    ("row_id", pa.int64()),
+    ("churn_probability", pa.float64()),
+    ("churn_prediction", pa.int8()),
+    ("risk_level", pa.string())
+])
+
+# Per-process state, filled once by _init_worker
+_worker = {}
+
+
+def _init_worker(artifacts_dir: str):
+    artifacts = load_local_artifacts(artifacts_dir)
+    if artifacts is None:
+        raise RuntimeError(f"No model found in {artifacts_dir}; run train.py first")
+    _worker["model"] = artifacts["model"]
+    _worker["plan"] = build_feature_plan(artifacts["feature_names"])
+    _worker["threshold"] = decision_threshold(artifacts["metadata"])
+
+
+def score_frame(df: pd.DataFrame, first_row: int, id_column=None) -> pa.Table:
+    """Score one chunk in the current worker and return it as an Arrow table."""
+    if id_column is not None:
+        row_ids = df[id_column].to_numpy()
+    else:
+        row_ids = pd.RangeIndex(first_row, first_row + len(df)).to_numpy()
+
+    features = _worker["plan"].transform_frame(df.rename(columns=COLUMN_MAPPING))
+    probabilities, predictions = predict_scores(_worker["model"], features, _worker["threshold"])
+
+    schema = OUTPUT_SCHEMA
+    if id_column is not None:
+        schema = schema.set(0, pa.field("row_id", pa.array(row_ids).type))
+    return pa.table({
+        "row_id": row_ids,
+        "churn_probability": probabilities,
+        "churn_prediction": predictions.astype("int8"),
+        "risk_level": get_risk_levels(probabilities)
+    }, schema=schema)
+
+
+def _score_row_group(path: str, row_group: int, first_row: int, id_column=None) -> pa.Table:
+    # Each worker reads its own row group, so only results cross process boundaries
+    df = pq.ParquetFile(path).read_row_group(row_group).to_pandas()
+    return score_frame(df, first_row, id_column)
+
+
+def _iter_tasks(input_path: str, chunk_size: int, id_column=None):
+    """Yield (fn, args) tasks in output order."""
+    if input_path.endswith(".parquet"):
+        metadata = pq.ParquetFile(input_path).metadata
+        first_row = 0
+        for i in range(metadata.num_row_groups):
+            yield _score_row_group, (input_path, i, first_row, id_column)
+            first_row += metadata.row_group(i).num_rows
+    elif input_path.endswith(".csv"):
+        first_row = 0
+        for chunk in pd.read_csv(input_path, chunksize=chunk_size):
+            yield score_frame, (chunk, first_row, id_column)
+            first_row += len(chunk)
+    else:
+        raise ValueError("Input must be a .csv or .parquet file")
+
+
+def score_file(input_path: str, output_path: str, workers: int = None, chunk_size: int = 100000,
+               artifacts_dir: str = ARTIFACTS_DIR, id_column: str = None) -> dict:
+    """Score `input_path` into `output_path` and return throughput stats."""
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    rows = 0
+    writer = None
+    # Bound the number of chunks held in memory while keeping every worker busy
+    pending = deque()
+    max_pending = workers * 2
+
+    def write(table):
+        nonlocal writer, rows
+        if writer is None:
+            writer = pq.ParquetWriter(output_path, table.schema)
+        writer.write_table(table)
+        rows += table.num_rows
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(artifacts_dir,)) as pool:
+            for fn, args in _iter_tasks(input_path, chunk_size, id_column):
+                pending.append(pool.submit(fn, *args))
+                if len(pending) >= max_pending:
+                    write(pending.popleft().result())
+            while pending:
+                write(pending.popleft().result())
+    finally:
+        if writer is not None:
+            writer.close()
+
+    elapsed = time.perf_counter() - start
+    stats = {
+        "rows": rows,
+        "seconds": elapsed,
+        "rows_per_second": rows / elapsed if elapsed > 0 else 0.0,
+        "workers": workers
+    }
+    logger.info(f"✅ Scored {rows} rows in {elapsed:.2f}s ({stats['rows_per_second']:,.0f} rows/s, {workers} workers)")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a CSV or Parquet file of customers offline.")
+    parser.add_argument("input", help="Input .csv or .parquet file (API field names or UCI column names)")
+    parser.add_argument("output", help="Output .parquet file")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=100000, help="Rows per CSV chunk")
+    parser.add_argument("--artifacts-dir", default=ARTIFACTS_DIR, help="Directory with churn_model.pkl etc.")
+    parser.add_argument("--id-column", default=None, help="Input column written as row_id (default: row number)")
+    args = parser.parse_args()
+
+    score_file(args.input, args.output, workers=args.workers, chunk_size=args.chunk_size,
+               artifacts_dir=args.artifacts_dir, id_column=args.id_column)
+
+
+if __name__ == "__main__":
+    main()
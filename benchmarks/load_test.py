@@ -0,0 +1,267 @@
+"""
+Load test for the prediction API.
+
+Starts uvicorn locally (or targets --url), drives /predict, /predict/batch and
+/predict/batch/csv with a weighted mix at a fixed concurrency, and reports
+p50/p95/p99 latency, throughput and error counts per endpoint.
+
+Usage:
+    python benchmarks/load_test.py --concurrency 32 --duration 30 \\
+        --mix predict=8,batch=1,csv=1 --output results/load.json
+    python benchmarks/load_test.py --compare results/load.json   # flag p95 regressions
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENDPOINTS = {
+    "predict": "/predict",
+    "batch": "/predict/batch",
+    "csv": "/predict/batch/csv",
+}
+
+
+def random_customers(n: int, rng: np.random.Generator) -> list:
+    """Valid CustomerData payloads spread over the UCI Iranian churn ranges."""
+    age_group = rng.integers(1, 6, n)
+    return [
+        {
+            "Call_Failure": int(rng.integers(0, 37)),
+            "Complains": int(rng.random() < 0.08),
+            "Subscription_Length": int(rng.integers(3, 48)),
+            "Charge_Amount": int(rng.integers(0, 10)),
+            "Seconds_of_Use": int(rng.gamma(1.5, 3000)),
+            "Frequency_of_use": int(rng.integers(0, 256)),
+            "Frequency_of_SMS": int(rng.integers(0, 523)),
+            "Distinct_Called_Numbers": int(rng.integers(0, 98)),
+            "Age_Group": int(age_group[i]),
+            "Tariff_Plan": int(rng.integers(1, 3)),
+            "Status": int(rng.integers(1, 3)),
+            "Age": int(15 + 10 * age_group[i] + rng.integers(0, 10)),
+            "Customer_Value": round(float(rng.gamma(1.2, 400)), 2),
+        }
+        for i in range(n)
+    ]
+
+
+class PayloadFactory:
+    """Pre-generated request bodies so payload construction stays out of the measurements."""
+
+    def __init__(self, batch_size: int, csv_rows: int, repeat_ratio: float, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        self.customers = random_customers(5000, rng)
+        # Small hot set: repeated payloads exercise the prediction cache like real traffic would
+        self.hot = self.customers[:20]
+        self.repeat_ratio = repeat_ratio
+        self.batches = [
+            {"customers": random_customers(batch_size, rng)} for _ in range(20)
+        ]
+        self.csv_files = []
+        for _ in range(5):
+            buffer = io.BytesIO()
+            pd.DataFrame(random_customers(csv_rows, rng)).to_csv(buffer, index=False)
+            self.csv_files.append(buffer.getvalue())
+
+    def request(self, kind: str) -> dict:
+        if kind == "predict":
+            pool = self.hot if random.random() < self.repeat_ratio else self.customers
+            return {"json": random.choice(pool)}
+        if kind == "batch":
+            return {"json": random.choice(self.batches)}
+        return {"files": {"file": ("load.csv", random.choice(self.csv_files), "text/csv")}}
+
+
+def parse_mix(spec: str) -> dict:
+    mix = {}
+    for part in spec.split(","):
+        kind, _, weight = part.partition("=")
+        if kind not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint '{kind}' in mix; use {list(ENDPOINTS)}")
+        mix[kind] = float(weight or 1)
+    return mix
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port: int, workers: int, timeout: float = 120.0) -> subprocess.Popen:
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [REPO_ROOT, os.environ.get("PYTHONPATH")])))
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=REPO_ROOT, env=env
+    )
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("uvicorn exited during startup")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1.0).status_code == 200:
+                return proc
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    proc.terminate()
+    raise RuntimeError(f"API not healthy after {timeout}s")
+
+
+async def run_load(url: str, mix: dict, factory: PayloadFactory, concurrency: int,
+                   duration: float, warmup: float) -> dict:
+    kinds, weights = list(mix), list(mix.values())
+    samples = {kind: [] for kind in kinds}
+    statuses = {kind: {} for kind in kinds}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=url, timeout=60.0, limits=limits) as client:
+        measure_from = time.perf_counter() + warmup
+        stop_at = measure_from + duration
+
+        async def user():
+            while True:
+                now = time.perf_counter()
+                if now >= stop_at:
+                    return
+                kind = random.choices(kinds, weights)[0]
+                start = time.perf_counter()
+                try:
+                    response = await client.post(ENDPOINTS[kind], **factory.request(kind))
+                    status = response.status_code
+                except httpx.HTTPError as e:
+                    status = type(e).__name__
+                elapsed = time.perf_counter() - start
+                if start >= measure_from:
+                    statuses[kind][status] = statuses[kind].get(status, 0) + 1
+                    if status == 200:
+                        samples[kind].append(elapsed)
+
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+
+    return summarize(samples, statuses, duration)
+
+
+def summarize(samples: dict, statuses: dict, duration: float) -> dict:
+    report = {}
+    for kind, latencies in samples.items():
+        ms = np.asarray(latencies) * 1000
+        total = sum(statuses[kind].values())
+        report[kind] = {
+            "requests": total,
+            "ok": len(latencies),
+            "errors": total - len(latencies),
+            "status_counts": {str(k): v for k, v in statuses[kind].items()},
+            "throughput_rps": len(latencies) / duration,
+            **({
+                "p50_ms": float(np.percentile(ms, 50)),
+                "p95_ms": float(np.percentile(ms, 95)),
+                "p99_ms": float(np.percentile(ms, 99)),
+                "mean_ms": float(ms.mean()),
+                "max_ms": float(ms.max())
+            } if len(ms) else {})
+        }
+    return report
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def compare(report: dict, baseline_path: str, tolerance: float) -> list:
+    """Endpoints whose p95 grew more than `tolerance` (fraction) over the baseline run."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)["endpoints"]
+    regressions = []
+    for kind, stats in report.items():
+        old = baseline.get(kind, {}).get("p95_ms")
+        new = stats.get("p95_ms")
+        if old and new:
+            change = new / old - 1
+            print(f"{kind:>8}: p95 {old:.1f}ms -> {new:.1f}ms ({change:+.0%})")
+            if change > tolerance:
+                regressions.append(kind)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test /predict, /predict/batch and /predict/batch/csv.")
+    parser.add_argument("--url", default=None, help="Target a running API instead of starting uvicorn")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers when starting the server")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients")
+    parser.add_argument("--duration", type=float, default=20.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Unmeasured seconds before measuring")
+    parser.add_argument("--mix", default="predict=8,batch=1,csv=1", help="Weighted endpoint mix")
+    parser.add_argument("--batch-size", type=int, default=100, help="Customers per /predict/batch request")
+    parser.add_argument("--csv-rows", type=int, default=1000, help="Rows per uploaded CSV")
+    parser.add_argument("--repeat-ratio", type=float, default=0.2, help="Share of /predict calls reusing hot payloads")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="Write the JSON report here")
+    parser.add_argument("--compare", default=None, help="Baseline JSON report to compare p95 against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed p95 growth before failing --compare")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    mix = parse_mix(args.mix)
+    factory = PayloadFactory(args.batch_size, args.csv_rows, args.repeat_ratio, args.seed)
+
+    server = None
+    url = args.url
+    if url is None:
+        port = free_port()
+        server = start_server(port, args.workers)
+        url = f"http://127.0.0.1:{port}"
+
+    try:
+        endpoints = asyncio.run(run_load(url, mix, factory, args.concurrency, args.duration, args.warmup))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    for kind, stats in endpoints.items():
+        latency = (f"p50 {stats['p50_ms']:.1f}ms | p95 {stats['p95_ms']:.1f}ms | p99 {stats['p99_ms']:.1f}ms"
+                   if "p50_ms" in stats else "no successful requests")
+        print(f"{kind:>8}: {stats['throughput_rps']:.1f} req/s | {latency} | errors {stats['errors']} "
+              f"{stats['status_counts']}")
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        "endpoints": endpoints
+    }
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        regressions = compare(endpoints, args.compare, args.tolerance)
+        if regressions:
+            print(f"❌ p95 regression over {args.tolerance:.0%}: {regressions}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
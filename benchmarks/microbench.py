@@ -0,0 +1,221 @@
+"""
+Microbenchmarks for the feature engineering, inference and SHAP hot paths.
+
+Times each stage on synthetic data with the UCI Iranian churn schema for
+batch sizes from 1 to 1M rows, records peak Python-heap memory (tracemalloc:
+NumPy and pandas buffers, not LightGBM's native allocations) and compares
+against a stored baseline.
+
+Baselines record the hardware and repeat settings they were measured with.
+--compare warns when the hardware differs and only flags a case when even
+its fastest run is slower than the baseline median by more than the
+tolerance and by more than an absolute noise floor, so scheduler jitter on
+sub-millisecond cases doesn't read as a regression.
+
+Stages:
+    preprocess_data    training/feature_engineering.preprocess_data on a DataFrame
+    feature_engineer   backend/src FeatureEngineer.transform (fitted with config.yaml)
+    feature_plan       compiled NumPy FeaturePlan.transform_raw used by the API
+    predict_proba      LightGBM scoring of the feature matrix
+    array_predict      the same scoring with backend/tree_engine.py (serving.scorer.engine: array)
+    shap               ExplainerService explanations (capped by --max-shap-rows)
+
+Usage:
+    python benchmarks/microbench.py --save-baseline benchmarks/baselines/microbench.json
+    python benchmarks/microbench.py --compare benchmarks/baselines/microbench.json
+"""
+import argparse
+import json
+import os
+import pickle
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import yaml
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from backend.explainability import ExplainerService  # noqa: E402
+from backend.feature_plan import FeaturePlan  # noqa: E402
+from backend.scoring import load_local_artifacts  # noqa: E402
+from backend.synthetic import synthetic_frame  # noqa: E402
+from backend.tree_engine import ArrayTreeModel  # noqa: E402
+from backend.src.feature_engineering import FeatureEngineer  # noqa: E402
+from training.feature_engineering import preprocess_data  # noqa: E402
+
+DEFAULT_SIZES = [1, 10, 100, 1000, 10000, 100000, 1000000]
+STAGES = ["preprocess_data", "feature_engineer", "feature_plan", "predict_proba", "array_predict", "shap"]
+
+
+def load_or_train_model(artifacts_dir: str):
+    """The trained artifacts if present, otherwise a small model fitted on synthetic data."""
+    artifacts = load_local_artifacts(artifacts_dir)
+    explainer_path = os.path.join(artifacts_dir, "shap_explainer.pkl")
+    if artifacts is not None and os.path.exists(explainer_path):
+        return artifacts["model"], artifacts["feature_names"], ExplainerService(explainer_path), "artifacts"
+
+    import shap
+    from lightgbm import LGBMClassifier
+    X = preprocess_data(synthetic_frame(20000, seed=1))
+    logit = 1.5 * X["Complains"] - 0.02 * X["Subscription  Length"] - 0.0002 * X["Seconds of Use"]
+    y = (np.random.default_rng(1).random(len(X)) < 1 / (1 + np.exp(-logit))).astype(int)
+    model = LGBMClassifier(n_estimators=200, num_leaves=31, verbosity=-1).fit(X, y)
+    explainer = ExplainerService(payload=pickle.dumps(shap.TreeExplainer(model)))
+    return model, X.columns.tolist(), explainer, "synthetic"
+
+
+def build_cases(model, feature_names, explainer, config):
+    plan = FeaturePlan(feature_names)
+    fitted_fe = FeatureEngineer(config).fit(synthetic_frame(5000, seed=2))
+
+    def shap_case(features):
+        if len(features) == 1:
+            return explainer.get_explanation(features, feature_names=feature_names)
+        return explainer.get_batch_explanations(features, feature_names=feature_names)
+
+    # Each case: (prepare(frame) -> input, run(input))
+    return {
+        "preprocess_data": (lambda df: df, preprocess_data),
+        "feature_engineer": (lambda df: df, fitted_fe.transform),
+        "feature_plan": (lambda df: df.to_numpy(dtype=np.float64), plan.transform_raw),
+        "predict_proba": (lambda df: plan.transform_raw(df.to_numpy(dtype=np.float64)), model.predict_proba),
+        "array_predict": (lambda df: plan.transform_raw(df.to_numpy(dtype=np.float64)),
+                          ArrayTreeModel.from_model(model).predict_proba),
+        "shap": (lambda df: plan.transform_raw(df.to_numpy(dtype=np.float64)), shap_case),
+    }
+
+
+def measure(run, data, repeat: int, max_seconds: float):
+    run(data)  # warm-up: first-call allocations and lazy loading
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run(data)
+        timings.append(time.perf_counter() - start)
+        if sum(timings) > max_seconds:
+            break
+
+    tracemalloc.start()
+    run(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return timings, peak
+
+
+def run_suite(stages, sizes, repeat, max_seconds, max_shap_rows, artifacts_dir, config):
+    model, feature_names, explainer, model_kind = load_or_train_model(artifacts_dir)
+    cases = build_cases(model, feature_names, explainer, config)
+    results = []
+    for n in sizes:
+        frame = synthetic_frame(n, seed=n)
+        for stage in stages:
+            if stage == "shap" and n > max_shap_rows:
+                continue
+            prepare, run = cases[stage]
+            timings, peak = measure(run, prepare(frame), repeat, max_seconds)
+            median = statistics.median(timings)
+            results.append({
+                "stage": stage,
+                "rows": n,
+                "median_s": median,
+                "min_s": min(timings),
+                "rows_per_s": n / median if median > 0 else None,
+                "peak_mb": peak / 2**20,
+                "repeats": len(timings)
+            })
+            print(f"{stage:>16} {n:>8} rows: {median * 1000:10.3f} ms median | "
+                  f"{n / median:14,.0f} rows/s | peak {peak / 2**20:8.1f} MB")
+    return results, model_kind
+
+
+def hardware() -> dict:
+    """CPU model and count, machine and OS, so baselines from different hosts aren't compared blindly."""
+    cpu_model = platform.processor()
+    try:
+        with open("/proc/cpuinfo") as f:
+            cpu_model = next(line.split(":", 1)[1].strip() for line in f if line.startswith("model name"))
+    except (OSError, StopIteration):
+        pass
+    return {
+        "cpu_model": cpu_model,
+        "cpu_count": os.cpu_count(),
+        "machine": platform.machine(),
+        "system": platform.platform()
+    }
+
+
+def compare(results, baseline_path, tolerance, noise_floor_s, current_hardware=None):
+    """
+    Print time ratios against the baseline; return the cases whose fastest run
+    is slower than the baseline median by more than `tolerance` and `noise_floor_s`.
+    """
+    with open(baseline_path) as f:
+        stored = json.load(f)
+    if current_hardware and stored.get("hardware") != current_hardware:
+        print(f"⚠️ Baseline measured on {stored.get('hardware')}, this run on {current_hardware}; "
+              "timings are not comparable across hosts")
+    baseline = {(r["stage"], r["rows"]): r for r in stored["results"]}
+    regressions = []
+    for r in results:
+        old = baseline.get((r["stage"], r["rows"]))
+        if old is None:
+            continue
+        ratio = r["median_s"] / old["median_s"]
+        mem = r["peak_mb"] - old["peak_mb"]
+        slower = r["min_s"] - old["median_s"]
+        flag = " ❌" if slower > tolerance * old["median_s"] and slower > noise_floor_s else ""
+        print(f"{r['stage']:>16} {r['rows']:>8}: time x{ratio:5.2f} | peak {mem:+8.1f} MB{flag}")
+        if flag:
+            regressions.append((r["stage"], r["rows"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmarks for preprocessing, scoring and SHAP.")
+    parser.add_argument("--stages", nargs="+", default=STAGES, choices=STAGES)
+    parser.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=7, help="Timed runs per case")
+    parser.add_argument("--max-seconds", type=float, default=3.0, help="Stop repeating a case after this long")
+    parser.add_argument("--max-shap-rows", type=int, default=10000, help="Skip SHAP for larger batches")
+    parser.add_argument("--artifacts-dir", default=os.path.join(REPO_ROOT, "backend"))
+    parser.add_argument("--config", default=os.path.join(REPO_ROOT, "backend", "config.yaml"))
+    parser.add_argument("--output", default=None, help="Write the JSON results here")
+    parser.add_argument("--save-baseline", default=None, help="Store these results as the baseline")
+    parser.add_argument("--compare", default=None, help="Baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown before --compare fails")
+    parser.add_argument("--noise-floor-ms", type=float, default=0.5,
+                        help="Slowdowns smaller than this never fail --compare")
+    args = parser.parse_args()
+
+    with open(args.config) as f:
+        config = yaml.safe_load(f) or {}
+
+    results, model_kind = run_suite(args.stages, sorted(args.sizes), args.repeat, args.max_seconds,
+                                    args.max_shap_rows, args.artifacts_dir, config)
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "hardware": hardware(),
+        "settings": {"repeat": args.repeat, "max_seconds": args.max_seconds},
+        "model": model_kind,
+        "results": results
+    }
+    for path in filter(None, [args.output, args.save_baseline]):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance, args.noise_floor_ms / 1000, report["hardware"])
+        if regressions:
+            print(f"❌ Slower than baseline by more than {args.tolerance:.0%}: {regressions}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
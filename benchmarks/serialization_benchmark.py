@@ -0,0 +1,107 @@
+"""
+Batch response serialization benchmark.
+
+Compares the Pydantic path (one PredictionResponse per row, a
+BatchPredictionResponse around them, JSON dump) with the orjson fast path in
+backend/serialization.py that encodes straight from the score arrays. Both
+produce the same JSON document; the benchmark checks that before timing.
+
+Usage:
+    python benchmarks/serialization_benchmark.py --sizes 100 1000 10000 100000
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from backend.models import BatchPredictionResponse, PredictionResponse  # noqa: E402
+from backend.scoring import get_risk_level  # noqa: E402
+from backend.serialization import encode_batch_response  # noqa: E402
+
+DEFAULT_SIZES = [100, 1000, 10000, 100000]
+FEATURES = ["Complains", "Status", "Seconds of Use", "Frequency of use", "Subscription  Length"]
+
+
+def synthetic_scores(n: int, explain: bool, top_k: int = 3, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    probabilities = rng.beta(0.6, 2.0, n)
+    predictions = (probabilities >= 0.5).astype(np.int64)
+    risk_factors = None
+    if explain:
+        impacts = rng.normal(0, 0.3, (n, top_k))
+        risk_factors = [
+            [{"feature": FEATURES[k], "impact": float(impact), "value": float(k)} for k, impact in enumerate(row)]
+            for row in impacts
+        ]
+    return probabilities, predictions, risk_factors
+
+
+def pydantic_encode(probabilities, predictions, risk_factors=None, processing_time_ms=0.0) -> bytes:
+    """The per-row model path the batch endpoints used before the fast encoder."""
+    if risk_factors is None:
+        risk_factors = [[] for _ in range(len(probabilities))]
+    rows = []
+    high_risk_count = 0
+    for pred, prob, factors in zip(predictions, probabilities, risk_factors):
+        risk = get_risk_level(prob)
+        high_risk_count += risk == "High"
+        rows.append(PredictionResponse(
+            churn_prediction=int(pred),
+            churn_probability=float(prob),
+            risk_level=risk,
+            confidence=float(prob if pred == 1 else 1 - prob),
+            top_risk_factors=factors
+        ))
+    response = BatchPredictionResponse(
+        predictions=rows, total_customers=len(rows),
+        high_risk_count=high_risk_count, processing_time_ms=processing_time_ms
+    )
+    return json.dumps(response.model_dump(mode="json")).encode()
+
+
+def measure(fn, args, repeat: int, max_seconds: float) -> float:
+    fn(*args)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - start)
+        if sum(timings) > max_seconds:
+            break
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pydantic vs orjson batch response encoding.")
+    parser.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--max-seconds", type=float, default=5.0, help="Stop repeating a case after this long")
+    parser.add_argument("--output", default=None, help="Write the JSON results here")
+    args = parser.parse_args()
+
+    results = []
+    for n in sorted(args.sizes):
+        for explain in (False, True):
+            scores = synthetic_scores(n, explain)
+            assert json.loads(pydantic_encode(*scores)) == json.loads(encode_batch_response(*scores))
+            slow = measure(pydantic_encode, scores, args.repeat, args.max_seconds)
+            fast = measure(encode_batch_response, scores, args.repeat, args.max_seconds)
+            results.append({"rows": n, "explain": explain, "pydantic_s": slow, "fast_s": fast, "speedup": slow / fast})
+            print(f"{n:>8} rows explain={explain!s:<5}: pydantic {slow * 1000:9.2f} ms | "
+                  f"fast {fast * 1000:8.2f} ms | x{slow / fast:5.1f}")
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump({"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
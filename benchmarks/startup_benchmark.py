@@ -0,0 +1,92 @@
+"""
+Worker cold-start benchmark: import time and model load time, measured
+separately, for each way the API can load its model.
+
+Every sample runs in a fresh interpreter so nothing is cached between runs.
+
+Usage:
+    python benchmarks/startup_benchmark.py --repeat 5 --output startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LOADERS = {
+    "bundle": "main.load_model_from_bundle({bundle_path!r})",
+    "local": "main.load_model_from_local()",
+    "mlflow": "main.load_model_from_mlflow()",
+}
+
+PROBE = """
+import json, resource, sys, time
+t0 = time.perf_counter()
+import backend.main as main
+t1 = time.perf_counter()
+bundle = {loader}
+t2 = time.perf_counter()
+if bundle is not None:
+    bundle.warm_up(1)
+t3 = time.perf_counter()
+print(json.dumps({{
+    "import_s": t1 - t0,
+    "load_s": t2 - t1,
+    "first_predict_s": t3 - t2,
+    "loaded": bundle is not None,
+    "heavy_modules": [m for m in ("mlflow", "shap", "scipy") if m in sys.modules],
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+}}))
+"""
+
+
+def run_probe(mode: str, bundle_path: str) -> dict:
+    code = PROBE.format(loader=LOADERS[mode].format(bundle_path=bundle_path))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [REPO_ROOT, os.environ.get("PYTHONPATH")])))
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def benchmark(modes, repeat: int, bundle_path: str) -> dict:
+    report = {}
+    for mode in modes:
+        samples = [run_probe(mode, bundle_path) for _ in range(repeat)]
+        report[mode] = {
+            "loaded": all(s["loaded"] for s in samples),
+            "heavy_modules": samples[-1]["heavy_modules"],
+            **{
+                f"{key}_median": statistics.median(s[key] for s in samples)
+                for key in ("import_s", "load_s", "first_predict_s", "max_rss_mb")
+            }
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure API import and model load time per loading mode.")
+    parser.add_argument("--modes", nargs="+", default=list(LOADERS), choices=list(LOADERS))
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh interpreters per mode")
+    parser.add_argument("--bundle-path", default="backend/churn_bundle.pkl")
+    parser.add_argument("--output", default=None, help="Write the JSON report here")
+    args = parser.parse_args()
+
+    report = benchmark(args.modes, args.repeat, args.bundle_path)
+    for mode, stats in report.items():
+        print(
+            f"{mode:>7}: import {stats['import_s_median']:.2f}s | load {stats['load_s_median']:.2f}s | "
+            f"first predict {stats['first_predict_s_median'] * 1000:.0f}ms | "
+            f"rss {stats['max_rss_mb_median']:.0f}MB | loaded={stats['loaded']} | heavy={stats['heavy_modules']}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+import argparse
 import pandas as pd
 import numpy as np
 import joblib
@@ -5,19 +6,69 @@ import os
 import mlflow
 import mlflow.lightgbm
 import shap
-from ucimlrepo import fetch_ucirepo
-from lightgbm import LGBMClassifier
+import yaml
+import lightgbm as lgb
 from sklearn.model_selection import train_test_split
 
+from backend.src.data_loader import DEFAULT_SNAPSHOT_DIR, load_snapshot, resolve_snapshot_dir
 from training.feature_engineering import preprocess_data
-from training.tuning import optimize_hyperparameters
-from training.evaluation import evaluate_model, find_optimal_threshold
+from training.tuning import load_binned_dataset, optimize_hyperparameters, save_binned_dataset
+from training.evaluation import evaluate_model, evaluate_scores, find_optimal_threshold, threshold_from_scores
+from training.out_of_core import train_out_of_core
+from backend.artifact_bundle import BoosterModel, export_bundle
+from backend.drift import build_reference_sketches
 
 # MLflow Configuration
 MLFLOW_EXPERIMENT_NAME = "churn_prediction_lightgbm"
 MLFLOW_MODEL_NAME = "ChurnPredictionModel"
+CONFIG_PATH = "backend/config.yaml"
+
+def load_config():
+    with open(CONFIG_PATH) as f:
+        return yaml.safe_load(f) or {}
+
+def save_artifacts(model, feature_names, explainer, metadata):
+    # 6. Save Local Artifacts (fallback)
+    print("💾 Saving local artifacts to backend/...")
+    os.makedirs('backend', exist_ok=True)
+    
+    # Plain lightgbm.Booster; load_local_artifacts adds predict_proba
+    joblib.dump(model.booster_, 'backend/churn_model.pkl')
+    joblib.dump(feature_names, 'backend/feature_names.pkl')
+    joblib.dump(explainer, 'backend/shap_explainer.pkl')
+    joblib.dump(metadata, 'backend/model_metadata.pkl')
+    
+    # Single-file serving bundle (booster text + feature names + threshold + explainer)
+    export_bundle(model, feature_names, metadata, explainer, 'backend/churn_bundle.pkl')
+    
+    # 7. Log artifacts to MLflow
+    mlflow.log_artifact('backend/churn_model.pkl')
+    mlflow.log_artifact('backend/feature_names.pkl')
+    mlflow.log_artifact('backend/shap_explainer.pkl')
+    mlflow.log_artifact('backend/model_metadata.pkl')
+    mlflow.log_artifact('backend/churn_bundle.pkl')
+    mlflow.log_dict(metadata['reference_sketches'], 'reference_sketches.json')
+    
+    # 8. Register Model in MLflow Model Registry
+    print("📝 Registering model in MLflow Model Registry...")
+    
+    # Log the LightGBM model with MLflow
+    mlflow.lightgbm.log_model(
+        model.booster_, 
+        artifact_path="model",
+        registered_model_name=MLFLOW_MODEL_NAME
+    )
+
+def train_final_model(train_set, params):
+    """Same model LGBMClassifier(**params).fit would give, trained on the already binned set."""
+    params = dict(params, objective="binary", verbosity=-1)
+    num_boost_round = params.pop("n_estimators", 100)
+    return BoosterModel(lgb.train(params, train_set, num_boost_round=num_boost_round))
+
+def train_model(fetch_data=False, snapshot="latest"):
+    config = load_config()
+    data_config = config.get("data", {})
 
-def train_model():
     # Set up MLflow
     mlflow.set_tracking_uri("file:./mlruns")
     mlflow.set_experiment(MLFLOW_EXPERIMENT_NAME)
@@ -26,14 +77,14 @@ def train_model():
         run_id = run.info.run_id
         print(f"🚀 MLflow Run ID: {run_id}")
         
-        print("📦 Fetching UCI Iranian Churn dataset...")
-        iranian_churn = fetch_ucirepo(id=563)
-        
-        X = iranian_churn.data.features
-        y = iranian_churn.data.targets
-        
-        if isinstance(y, pd.DataFrame):
-            y = y.iloc[:, 0]
+        print("📦 Loading UCI Iranian Churn dataset snapshot...")
+        X, y, snapshot_info = load_snapshot(
+            data_config.get("uci_id", 563),
+            snapshot_dir=resolve_snapshot_dir(data_config.get("snapshot_dir", DEFAULT_SNAPSHOT_DIR)),
+            version=snapshot,
+            fetch=fetch_data
+        )
+        print(f"✅ Snapshot {snapshot_info['version']} (sha256 {snapshot_info['sha256'][:12]}...)")
 
         dataset_size = X.shape[0]
         print(f"✅ Dataset loaded: {dataset_size} rows, {X.shape[1]} features")
@@ -41,6 +92,8 @@ def train_model():
         # Log dataset info
         mlflow.log_param("dataset_size", dataset_size)
         mlflow.log_param("original_features", X.shape[1])
+        mlflow.log_param("dataset_snapshot", snapshot_info["version"])
+        mlflow.set_tag("dataset_sha256", snapshot_info["sha256"])
         
         # 1. Feature Engineering
         print("🛠️ Applying feature engineering...")
@@ -55,15 +108,29 @@ def train_model():
         mlflow.log_param("train_size", len(X_train))
         mlflow.log_param("test_size", len(X_test))
         
+        # Bin the training set once (or reuse the bins of an earlier run on the same rows);
+        # tuning folds and the final fit load them from this file
+        binned_path, binning_s = save_binned_dataset(X_train, y_train, 'backend')
+        print(f"⏱️ Binned training set {'reused' if binning_s == 0.0 else f'built in {binning_s:.2f}s'}: {binned_path}")
+        mlflow.log_param("binned_dataset", os.path.basename(binned_path))
+        mlflow.log_metric("binning_build_s", binning_s)
+
         # 2. Hyperparameter Tuning
         print("🔍 Optimizing hyperparameters with Optuna...")
-        best_params = optimize_hyperparameters(X_train, y_train, n_trials=20)
+        training_config = config.get("training", {})
+        tuning_config = training_config.get("tuning", {})
+        best_params = optimize_hyperparameters(
+            X_train, y_train,
+            early_stopping_rounds=training_config.get("early_stopping_rounds", 50),
+            dataset=binned_path,
+            **tuning_config
+        )
         mlflow.log_params(best_params)
+        mlflow.log_param("optuna_study", tuning_config.get("study_name", "churn_lightgbm"))
         
         # 3. Train Final Model
         print("🏋️ Training final model...")
-        model = LGBMClassifier(**best_params)
-        model.fit(X_train, y_train)
+        model = train_final_model(load_binned_dataset(binned_path, X_train), best_params)
         
         # 4. Evaluation
         print("📊 Evaluating model...")
@@ -79,15 +146,10 @@ def train_model():
         
         # 5. Explainability (SHAP)
         print("🧠 Generating SHAP explainer...")
-        explainer = shap.TreeExplainer(model)
-        
-        # 6. Save Local Artifacts (fallback)
-        print("💾 Saving local artifacts to backend/...")
-        os.makedirs('backend', exist_ok=True)
+        explainer = shap.TreeExplainer(model.booster_)
         
-        joblib.dump(model, 'backend/churn_model.pkl')
-        joblib.dump(X_processed.columns.tolist(), 'backend/feature_names.pkl')
-        joblib.dump(explainer, 'backend/shap_explainer.pkl')
+        # Per-feature training histograms the API compares live traffic against
+        reference_sketches = build_reference_sketches(X_train)
         
         metadata = {
             'metrics': metrics,
@@ -95,26 +157,12 @@ def train_model():
             'optimal_threshold': best_threshold,
             'feature_count': len(X_processed.columns),
             'model_type': 'LightGBM',
-            'run_id': run_id
+            'run_id': run_id,
+            'reference_sketches': reference_sketches
         }
-        joblib.dump(metadata, 'backend/model_metadata.pkl')
         
-        # 7. Log artifacts to MLflow
-        mlflow.log_artifact('backend/churn_model.pkl')
-        mlflow.log_artifact('backend/feature_names.pkl')
-        mlflow.log_artifact('backend/shap_explainer.pkl')
-        mlflow.log_artifact('backend/model_metadata.pkl')
-        
-        # 8. Register Model in MLflow Model Registry
-        print("📝 Registering model in MLflow Model Registry...")
-        model_uri = f"runs:/{run_id}/model"
-        
-        # Log the LightGBM model with MLflow
-        mlflow.lightgbm.log_model(
-            model, 
-            artifact_path="model",
-            registered_model_name=MLFLOW_MODEL_NAME
-        )
+        # 6-8. Save local artifacts, log them and register the model
+        save_artifacts(model, X_processed.columns.tolist(), explainer, metadata)
         
         print(f"✅ Model registered as '{MLFLOW_MODEL_NAME}'")
         print(f"✅ MLflow Run ID: {run_id}")
@@ -124,5 +172,87 @@ def train_model():
         print(f"   2. Promote model to 'Production' stage in the UI")
         print("   3. Restart FastAPI to load the production model")
 
+def train_model_out_of_core(source):
+    """
+    Train on a Parquet file or directory too large for memory (see
+    training/out_of_core.py). Uses the fixed params in
+    training.out_of_core; peak RSS per phase is printed and logged.
+    """
+    config = load_config()
+    ooc_config = dict(config.get("training", {}).get("out_of_core", {}))
+    params = ooc_config.pop("params", {})
+    memory_budget_mb = ooc_config.pop("memory_budget_mb", None)
+
+    mlflow.set_tracking_uri("file:./mlruns")
+    mlflow.set_experiment(MLFLOW_EXPERIMENT_NAME)
+
+    with mlflow.start_run() as run:
+        run_id = run.info.run_id
+        print(f"🚀 MLflow Run ID: {run_id}")
+        print(f"🌊 Streaming {source} in chunks of {ooc_config.get('batch_rows', 100000)} rows...")
+        mlflow.log_param("dataset_source", source)
+        mlflow.log_param("out_of_core", True)
+        mlflow.log_params({f"ooc_{key}": value for key, value in ooc_config.items()})
+
+        result = train_out_of_core(
+            source, params, target=config.get("data", {}).get("target_column", "Churn"), **ooc_config
+        )
+        model = BoosterModel(result["booster"])
+        feature_names = result["layout"].feature_names
+        split = result["split"]
+        print(f"✅ Split: {split['train_rows']} train / {split['test_rows']} test rows")
+        mlflow.log_params({"train_size": split["train_rows"], "test_size": split["test_rows"]})
+        mlflow.log_param("processed_features", len(feature_names))
+        mlflow.log_metrics({key: value for key, value in split.items() if key.startswith("test_fraction")})
+        mlflow.log_params(params)
+
+        peaks = result["peak_rss_mb"]
+        for phase, peak in peaks.items():
+            print(f"🧮 Peak RSS during {phase}: {peak:.0f} MB ({result['timings'][f'{phase}_s']:.1f} s)")
+            mlflow.log_metric(f"peak_rss_mb_{phase}", peak)
+        mlflow.log_metric("peak_rss_mb", max(peaks.values()))
+        if memory_budget_mb and max(peaks.values()) > memory_budget_mb:
+            print(f"⚠️ Peak RSS {max(peaks.values()):.0f} MB exceeded the {memory_budget_mb} MB budget; "
+                  "lower batch_rows or bin_sample_rows")
+
+        print("📊 Evaluating model...")
+        y_test, scores = result["y_test"], result["test_scores"]
+        best_threshold = threshold_from_scores(y_test, scores)
+        mlflow.log_param("optimal_threshold", best_threshold)
+        metrics = evaluate_scores(y_test, scores, threshold=best_threshold)
+        mlflow.log_metric("accuracy", metrics["accuracy"])
+        mlflow.log_metric("roc_auc", metrics["roc_auc"])
+        mlflow.log_metric("f1_score", metrics["f1"])
+
+        print("🧠 Generating SHAP explainer...")
+        explainer = shap.TreeExplainer(model.booster_)
+
+        # Drift reference from the reservoir sample of training rows
+        reference_sketches = build_reference_sketches(result["train_sample"])
+        metadata = {
+            'metrics': metrics,
+            'best_params': params,
+            'optimal_threshold': best_threshold,
+            'feature_count': len(feature_names),
+            'model_type': 'LightGBM',
+            'run_id': run_id,
+            'reference_sketches': reference_sketches,
+            'peak_rss_mb': peaks
+        }
+        save_artifacts(model, feature_names, explainer, metadata)
+
+        print(f"✅ Model registered as '{MLFLOW_MODEL_NAME}'")
+        print(f"✅ MLflow Run ID: {run_id}")
+
 if __name__ == "__main__":
-    train_model()
+    parser = argparse.ArgumentParser(description="Train the churn model from a local dataset snapshot.")
+    parser.add_argument("--fetch-data", action="store_true",
+                        help="Download the UCI dataset and snapshot it before training")
+    parser.add_argument("--snapshot", default="latest", help="Snapshot version to train on")
+    parser.add_argument("--out-of-core", metavar="PARQUET",
+                        help="Stream a Parquet file or directory too large for memory instead of a snapshot")
+    args = parser.parse_args()
+    if args.out_of_core:
+        train_model_out_of_core(args.out_of_core)
+    else:
+        train_model(fetch_data=args.fetch_data, snapshot=args.snapshot)
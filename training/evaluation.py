@@ -9,7 +9,13 @@ def evaluate_model(model, X_test, y_test, threshold=0.5):
     """
     Comprehensive model evaluation.
     """
-    y_pred_proba = model.predict_proba(X_test)[:, 1]
+    return evaluate_scores(y_test, model.predict_proba(X_test)[:, 1], threshold)
+
+def evaluate_scores(y_test, y_pred_proba, threshold=0.5):
+    """
+    evaluate_model for churn probabilities that were already computed
+    (out-of-core training scores its test split in batches).
+    """
     y_pred = (y_pred_proba >= threshold).astype(int)
     
     # Metrics
@@ -44,7 +50,12 @@ def find_optimal_threshold(model, X_test, y_test):
     """
     Find the threshold that maximizes F1 score.
     """
-    y_pred_proba = model.predict_proba(X_test)[:, 1]
+    return threshold_from_scores(y_test, model.predict_proba(X_test)[:, 1])
+
+def threshold_from_scores(y_test, y_pred_proba):
+    """
+    find_optimal_threshold for precomputed churn probabilities.
+    """
     precisions, recalls, thresholds = precision_recall_curve(y_test, y_pred_proba)
     
     f1_scores = 2 * (precisions * recalls) / (precisions + recalls + 1e-10)
@@ -0,0 +1,355 @@
+"""
+Out-of-core training for datasets larger than RAM.
+
+A first pass reads only the label (and id) columns to rank every row's key
+hash within its class; the per-class cutoffs make the split exactly
+stratified. The main streaming pass reads the Parquet source in `batch_rows`
+chunks, runs each chunk through preprocess_data, and splits its rows with
+those cutoffs. Both sides are appended as float64 rows to spill files on
+disk. Only labels, the first pass's key hashes (8 bytes per row, freed once
+the cutoffs are known) and a bounded reservoir sample for the drift reference
+stay in memory.
+
+LightGBM then builds its Dataset from a `lightgbm.Sequence` over the train
+spill file. Bin boundaries come from `bin_sample_rows` randomly read rows,
+after which rows are pushed one batch at a time, so the resident cost is the
+binned matrix (one byte per value at max_bin 255) plus a single batch. Test
+rows are scored in batches the same way.
+
+    python train.py --out-of-core data/cdr_aggregates/   # file or directory of Parquet files
+"""
+import glob
+import os
+import tempfile
+import time
+
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from training.feature_engineering import preprocess_data
+from training.tuning import DATASET_PARAMS
+
+
+def peak_rss_mb(reset: bool = False) -> float:
+    """
+    Peak resident memory of this process in MB. With `reset` the kernel's
+    high-water mark is cleared afterwards (Linux), so the next call reports
+    the peak of the next phase only.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            peak = next(int(line.split()[1]) for line in f if line.startswith("VmHWM:")) / 1024
+    except (OSError, StopIteration, ValueError):
+        import resource
+        import sys
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (2**20 if sys.platform == "darwin" else 1024)
+    if reset:
+        try:
+            with open("/proc/self/clear_refs", "w") as f:
+                f.write("5")
+        except OSError:
+            pass
+    return peak
+
+
+def parquet_files(source: str) -> list:
+    if os.path.isdir(source):
+        return sorted(glob.glob(os.path.join(source, "**", "*.parquet"), recursive=True))
+    return [source]
+
+
+def iter_chunks(source: str, batch_rows: int, columns: list = None):
+    """
+    DataFrames of at most `batch_rows` rows from a Parquet file or a directory
+    of Parquet files (read in sorted path order). Files are read one at a
+    time; a dataset scanner's readahead holds several batches at once.
+    """
+    for path in parquet_files(source):
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_rows, columns=columns):
+            if batch.num_rows:
+                yield batch.to_pandas()
+
+
+def key_hashes(keys, seed: int = 42) -> np.ndarray:
+    """Seeded 64-bit hash of each row's key."""
+    # hash_array ignores hash_key for numeric keys, so the seed salts a second round
+    salt = pd.util.hash_array(np.array([seed], dtype=np.uint64))[0]
+    return pd.util.hash_array(pd.util.hash_array(np.asarray(keys)) ^ salt)
+
+
+def stratified_cutoffs(hashes: np.ndarray, y: np.ndarray, test_size: float) -> dict:
+    """
+    Per-class hash cutoffs: the round(test_size * n) rows of each class with
+    the smallest hashes fall below their class's cutoff. None sends the whole
+    class to test.
+    """
+    cutoffs = {}
+    for label in np.unique(y):
+        class_hashes = hashes[y == label]
+        n_test = int(round(test_size * len(class_hashes)))
+        cutoffs[label] = np.partition(class_hashes, n_test)[n_test] if n_test < len(class_hashes) else None
+    return cutoffs
+
+
+def hash_split(keys, y, test_size: float, seed: int = 42, cutoffs: dict = None) -> np.ndarray:
+    """
+    Boolean test mask, stratified by label: within each class, the rows whose
+    seeded key hash ranks in the lowest `test_size` go to test. A row's side
+    depends only on its key and its class's cutoff, never on chunking or file
+    order. The cutoffs are ranked over these rows unless given (as
+    split_to_disk does with cutoffs ranked over the whole source).
+    """
+    hashes = key_hashes(keys, seed)
+    y = np.asarray(y)
+    if cutoffs is None:
+        cutoffs = stratified_cutoffs(hashes, y, test_size)
+    is_test = np.zeros(len(hashes), dtype=bool)
+    for label, cutoff in cutoffs.items():
+        in_class = y == label
+        is_test[in_class] = True if cutoff is None else hashes[in_class] < cutoff
+    return is_test
+
+
+def source_cutoffs(source: str, target: str, id_column: str = None, test_size: float = 0.2,
+                   seed: int = 42, batch_rows: int = 100_000) -> dict:
+    """First pass: stratified_cutoffs over every row of `source`, reading only the label and id columns."""
+    hashes, labels = [], []
+    offset = 0
+    columns = [target, id_column] if id_column else [target]
+    for chunk in iter_chunks(source, batch_rows, columns):
+        keys = chunk[id_column].to_numpy() if id_column else np.arange(offset, offset + len(chunk), dtype=np.uint64)
+        offset += len(chunk)
+        hashes.append(key_hashes(keys, seed))
+        labels.append(chunk[target].to_numpy(dtype=np.int8))
+    if not hashes:
+        raise ValueError(f"No rows found in {source}")
+    return stratified_cutoffs(np.concatenate(hashes), np.concatenate(labels), test_size)
+
+
+class SpillFile:
+    """Append-only file of float64 rows with a fixed column count."""
+
+    def __init__(self, path: str, n_columns: int):
+        self.path = path
+        self.n_columns = n_columns
+        self.n_rows = 0
+        self._file = open(path, "wb")
+
+    def append(self, rows: np.ndarray):
+        rows = np.ascontiguousarray(rows, dtype=np.float64)
+        self._file.write(rows.tobytes())
+        self.n_rows += rows.shape[0]
+
+    def close(self):
+        self._file.close()
+
+
+class SpillSequence(lgb.Sequence):
+    """
+    Random and range access to a closed SpillFile with positioned reads. Not
+    a memory map: file pages read for one batch don't add to the process RSS.
+    """
+
+    def __init__(self, spill: SpillFile, batch_size: int):
+        self.path = spill.path
+        self.n_rows = spill.n_rows
+        self.n_columns = spill.n_columns
+        self.row_bytes = 8 * spill.n_columns
+        self.batch_size = batch_size
+        self._fd = os.open(self.path, os.O_RDONLY)
+
+    def __len__(self):
+        return self.n_rows
+
+    def _read(self, start: int, stop: int) -> np.ndarray:
+        data = os.pread(self._fd, (stop - start) * self.row_bytes, start * self.row_bytes)
+        return np.frombuffer(data, dtype=np.float64).reshape(-1, self.n_columns)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            start, stop, step = idx.indices(self.n_rows)
+            rows = self._read(start, stop)
+            return rows if step == 1 else rows[::step]
+        if isinstance(idx, (list, np.ndarray)):
+            return np.stack([self._read(i, i + 1)[0] for i in idx])
+        if idx < 0:
+            idx += self.n_rows
+        return self._read(idx, idx + 1)[0]
+
+    def batches(self):
+        for start in range(0, self.n_rows, self.batch_size):
+            yield self[start:start + self.batch_size]
+
+    def close(self):
+        os.close(self._fd)
+
+
+class FeatureLayout:
+    """
+    Column order and categorical encoding fixed by the first processed chunk.
+    Pandas categoricals become their codes (NaN when unknown), as LightGBM
+    encodes them; like LightGBM, only unordered ones (not pd.cut bins) are
+    declared categorical features. The categories are stored on the booster.
+    """
+
+    def __init__(self, frame: pd.DataFrame):
+        self.feature_names = frame.columns.tolist()
+        categorical = [c for c in self.feature_names if isinstance(frame[c].dtype, pd.CategoricalDtype)]
+        self.category_indices = [self.feature_names.index(c) for c in categorical]
+        self.categorical_indices = [self.feature_names.index(c) for c in categorical if not frame[c].cat.ordered]
+        self.pandas_categorical = [frame[c].cat.categories.tolist() for c in categorical]
+
+    def matrix(self, frame: pd.DataFrame) -> np.ndarray:
+        if frame.columns.tolist() != self.feature_names:
+            raise ValueError("Chunk columns differ from the first chunk's; the Parquet files must share a schema")
+        out = np.empty((len(frame), len(self.feature_names)), dtype=np.float64)
+        categorical = dict(zip(self.category_indices, self.pandas_categorical))
+        for i, name in enumerate(self.feature_names):
+            column = frame[name]
+            if i in categorical:
+                codes = column.cat.set_categories(categorical[i]).cat.codes.to_numpy()
+                out[:, i] = np.where(codes >= 0, codes, np.nan)
+            else:
+                out[:, i] = column.to_numpy(dtype=np.float64, na_value=np.nan)
+        return out
+
+
+class Reservoir:
+    """Uniform sample of at most `size` rows of a stream (Algorithm R, vectorized per chunk)."""
+
+    def __init__(self, size: int, n_columns: int, seed: int = 42):
+        self.rows = np.empty((size, n_columns), dtype=np.float64)
+        self.size = size
+        self.seen = 0
+        self.rng = np.random.default_rng(seed)
+
+    def add(self, rows: np.ndarray):
+        take = max(0, min(self.size - self.seen, len(rows)))
+        self.rows[self.seen:self.seen + take] = rows[:take]
+        rest = rows[take:]
+        if len(rest):
+            # Row number i (1-based) replaces a random slot with probability size / i
+            positions = self.seen + take + np.arange(1, len(rest) + 1)
+            slots = (self.rng.random(len(rest)) * positions).astype(np.int64)
+            keep = slots < self.size
+            self.rows[slots[keep]] = rest[keep]
+        self.seen += len(rows)
+
+    def sample(self) -> np.ndarray:
+        return self.rows[:min(self.seen, self.size)]
+
+
+def split_to_disk(source: str, spill_dir: str, target: str, id_column: str = None, test_size: float = 0.2,
+                  seed: int = 42, batch_rows: int = 100_000, reservoir_rows: int = 100_000):
+    """
+    Streaming pass: feature-engineer every chunk and spill its train and test
+    rows, split with the per-class cutoffs of source_cutoffs. Returns
+    (layout, train spill, test spill, y_train, y_test, reservoir).
+    """
+    cutoffs = source_cutoffs(source, target, id_column, test_size, seed, batch_rows)
+    layout = train = test = reservoir = None
+    y_train, y_test = [], []
+    offset = 0
+    for chunk in iter_chunks(source, batch_rows):
+        y = chunk.pop(target).to_numpy(dtype=np.int8)
+        keys = chunk.pop(id_column).to_numpy() if id_column else np.arange(offset, offset + len(chunk), dtype=np.uint64)
+        offset += len(chunk)
+
+        features = preprocess_data(chunk)
+        if layout is None:
+            layout = FeatureLayout(features)
+            n_columns = len(layout.feature_names)
+            train = SpillFile(os.path.join(spill_dir, "train.f64"), n_columns)
+            test = SpillFile(os.path.join(spill_dir, "test.f64"), n_columns)
+            reservoir = Reservoir(reservoir_rows, n_columns, seed)
+        rows = layout.matrix(features)
+        del chunk, features
+
+        is_test = hash_split(keys, y, test_size, seed, cutoffs)
+        train.append(rows[~is_test])
+        test.append(rows[is_test])
+        reservoir.add(rows[~is_test])
+        y_train.append(y[~is_test])
+        y_test.append(y[is_test])
+
+    if layout is None:
+        raise ValueError(f"No rows found in {source}")
+    train.close()
+    test.close()
+    return layout, train, test, np.concatenate(y_train), np.concatenate(y_test), reservoir
+
+
+def split_report(y_train: np.ndarray, y_test: np.ndarray) -> dict:
+    """Realized test fraction overall and per class."""
+    report = {"train_rows": int(len(y_train)), "test_rows": int(len(y_test))}
+    for label in np.union1d(y_train, y_test):
+        n_train, n_test = int((y_train == label).sum()), int((y_test == label).sum())
+        report[f"test_fraction_class_{label}"] = n_test / max(n_train + n_test, 1)
+    return report
+
+
+def train_out_of_core(source: str, params: dict, target: str = "Churn", id_column: str = None,
+                      test_size: float = 0.2, seed: int = 42, batch_rows: int = 100_000,
+                      bin_sample_rows: int = 200_000, reservoir_rows: int = 100_000, spill_dir: str = None):
+    """
+    Train a LightGBM booster on `source` without loading it into memory.
+
+    Returns a dict with the booster, the feature layout, test labels and
+    scores, a reservoir sample of processed training rows (DataFrame), the
+    split report and the peak RSS in MB of each phase.
+    """
+    peaks = {}
+    timings = {}
+    peak_rss_mb(reset=True)
+    with tempfile.TemporaryDirectory(prefix="ooc_spill_", dir=spill_dir) as tmp_dir:
+        started = time.perf_counter()
+        layout, train, test, y_train, y_test, reservoir = split_to_disk(
+            source, tmp_dir, target, id_column, test_size, seed, batch_rows, reservoir_rows
+        )
+        timings["split_s"] = time.perf_counter() - started
+        peaks["split"] = peak_rss_mb(reset=True)
+
+        started = time.perf_counter()
+        train_rows = SpillSequence(train, batch_rows)
+        dataset = lgb.Dataset(
+            [train_rows], label=y_train.astype(np.float32),
+            feature_name=layout.feature_names, categorical_feature=layout.categorical_indices,
+            params=dict(DATASET_PARAMS, bin_construct_sample_cnt=bin_sample_rows, data_random_seed=seed)
+        ).construct()
+        train_rows.close()
+        timings["dataset_s"] = time.perf_counter() - started
+        peaks["dataset"] = peak_rss_mb(reset=True)
+
+        started = time.perf_counter()
+        params = dict(params, objective="binary", verbosity=-1)
+        num_boost_round = params.pop("n_estimators", 100)
+        booster = lgb.train(
+            params, dataset, num_boost_round=num_boost_round, categorical_feature=layout.categorical_indices
+        )
+        # Lets DataFrame inputs with the pandas categories predict like an in-memory fit
+        booster.pandas_categorical = layout.pandas_categorical or None
+        del dataset
+        timings["train_s"] = time.perf_counter() - started
+        peaks["train"] = peak_rss_mb(reset=True)
+
+        started = time.perf_counter()
+        test_rows = SpillSequence(test, batch_rows)
+        scores = np.concatenate([booster.predict(rows) for rows in test_rows.batches()] or [np.empty(0)])
+        test_rows.close()
+        timings["score_s"] = time.perf_counter() - started
+        peaks["score"] = peak_rss_mb(reset=True)
+
+    sample = pd.DataFrame(reservoir.sample(), columns=layout.feature_names)
+    return {
+        "booster": booster,
+        "layout": layout,
+        "y_test": y_test,
+        "test_scores": scores,
+        "train_sample": sample,
+        "split": split_report(y_train, y_test),
+        "peak_rss_mb": peaks,
+        "timings": timings
+    }